@@ -14,6 +14,18 @@ IMAGE_API_URL = os.getenv('IMAGE_API_URL', 'http://81.68.170.234/api/index.php')
 IMAGE_API_TOKEN = os.getenv('IMAGE_API_TOKEN', '1c17b11693cb5ec63859b091c5b9c1b2')
 IMAGE_TARGET_WIDTH = int(os.getenv('IMAGE_TARGET_WIDTH', '800'))
 IMAGE_TARGET_HEIGHT = int(os.getenv('IMAGE_TARGET_HEIGHT', '400'))
+# 处理后图片的输出格式（png=无损PNG, webp, jpeg），WebP / JPEG 体积更小、上传更快
+IMAGE_OUTPUT_FORMAT = os.getenv('IMAGE_OUTPUT_FORMAT', 'png').lower()
+# WebP / JPEG 输出质量（1-100）
+IMAGE_OUTPUT_QUALITY = int(os.getenv('IMAGE_OUTPUT_QUALITY', '90'))
+# 图片下载线程数
+IMAGE_DOWNLOAD_WORKERS = int(os.getenv('IMAGE_DOWNLOAD_WORKERS', '8'))
+# 图片缩放进程数（0表示在上传线程内缩放，不启动进程池）
+IMAGE_RESIZE_WORKERS = int(os.getenv('IMAGE_RESIZE_WORKERS', str(min(4, os.cpu_count() or 1))))
+# 图片上传线程数（上传速率另受 IMAGE_UPLOAD_RATE 限制）
+IMAGE_UPLOAD_WORKERS = int(os.getenv('IMAGE_UPLOAD_WORKERS', '4'))
+# 图片处理各阶段之间的队列容量（限制内存中同时存在的图片数）
+IMAGE_PIPELINE_QUEUE_SIZE = int(os.getenv('IMAGE_PIPELINE_QUEUE_SIZE', '32'))
 
 # ==================== OpenAI 配置 ====================
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
@@ -48,6 +60,11 @@ OUTPUT_FAILED_JSON = OUTPUT_DIR / os.getenv('OUTPUT_FAILED_FILE', 'failed_produc
 # 多页爬取输出文件模板（会根据产品类型动态生成）
 OUTPUT_MULTIPAGE_TEMPLATE = 'products_multi_page_{product_type}.csv'
 
+# 是否使用 SQLite 产品存储（爬取结果分批写入数据库，翻译和图片处理只更新有变化的行，CSV 由数据库导出）
+PRODUCT_STORE_ENABLED = os.getenv('PRODUCT_STORE_ENABLED', 'true').lower() == 'true'
+# 产品数据库文件
+PRODUCT_STORE_DB = OUTPUT_DIR / os.getenv('PRODUCT_STORE_FILE', 'products.db')
+
 # CSV字段名配置
 CSV_FIELDNAMES_BASIC = ['brand', 'name', 'price', 'image', 'url']
 CSV_FIELDNAMES_COMPLETE = [
@@ -92,9 +109,22 @@ PAGE_LOAD_TIMEOUT = int(os.getenv('PAGE_LOAD_TIMEOUT', '60'))
 SCRIPT_TIMEOUT = int(os.getenv('SCRIPT_TIMEOUT', '60'))
 # 页面等待时间（秒）
 PAGE_WAIT_TIME = int(os.getenv('PAGE_WAIT_TIME', '3'))
+# 页面就绪等待上限（秒），就绪后立即继续，不会固定等满
+PAGE_READY_TIMEOUT = int(os.getenv('PAGE_READY_TIMEOUT', '10'))
 # Cookie处理超时（秒）
 COOKIE_TIMEOUT = int(os.getenv('COOKIE_TIMEOUT', '5'))
 
+# 详情页抓取引擎: http = 直接请求HTML（失败时回退到Selenium）, selenium = 始终使用浏览器
+DETAIL_FETCH_ENGINE = os.getenv('DETAIL_FETCH_ENGINE', 'http').lower()
+# 列表页翻页引擎: http = 直接并发请求 ?page=N（失败时回退到浏览器翻页）, selenium = 浏览器点击翻页
+LISTING_FETCH_ENGINE = os.getenv('LISTING_FETCH_ENGINE', 'http').lower()
+# 直接翻页时的并发请求数
+LISTING_PAGE_WORKERS = int(os.getenv('LISTING_PAGE_WORKERS', '8'))
+# HTTP 请求超时（秒）
+HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', '30'))
+# HTTP 连接池最大连接数
+HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', '20'))
+
 # Cookie弹窗选择器
 COOKIE_SELECTORS = [
     "//button[contains(text(), 'Yes I Accept')]",
@@ -102,6 +132,34 @@ COOKIE_SELECTORS = [
     "//button[@id='onetrust-accept-btn-handler']",
 ]
 
+# ==================== 页面缓存配置 ====================
+# 是否缓存抓取到的详情页 / 列表页 HTML（重复运行时直接读取，不再请求）
+PAGE_CACHE_ENABLED = os.getenv('PAGE_CACHE_ENABLED', 'true').lower() == 'true'
+# 页面缓存目录（相对路径以项目根目录为基准）
+PAGE_CACHE_DIR = PROJECT_ROOT / os.getenv('PAGE_CACHE_DIR', 'data/cache/pages')
+# 缓存有效期（小时），过期后使用 ETag / Last-Modified 发送条件请求，0表示永不过期
+PAGE_CACHE_TTL_HOURS = float(os.getenv('PAGE_CACHE_TTL_HOURS', '24'))
+# 缓存总大小上限（MB），超过后淘汰最早抓取的页面，0表示不限制
+PAGE_CACHE_MAX_MB = float(os.getenv('PAGE_CACHE_MAX_MB', '500'))
+
+# 是否缓存下载的原图（过期后发送条件请求，未变化时复用上次处理和上传的结果）
+IMAGE_CACHE_ENABLED = os.getenv('IMAGE_CACHE_ENABLED', 'true').lower() == 'true'
+# 图片缓存目录（相对路径以项目根目录为基准）
+IMAGE_CACHE_DIR = PROJECT_ROOT / os.getenv('IMAGE_CACHE_DIR', 'data/cache/images')
+# 图片缓存有效期（小时），有效期内不发送请求，0表示永不过期
+IMAGE_CACHE_TTL_HOURS = float(os.getenv('IMAGE_CACHE_TTL_HOURS', '24'))
+# 图片缓存总大小上限（MB），0表示不限制
+IMAGE_CACHE_MAX_MB = float(os.getenv('IMAGE_CACHE_MAX_MB', '1000'))
+
+# 是否记录图床上传结果（原图URL → 图床URL、原图内容哈希 → 图床URL，跨CSV和多次运行复用）
+IMAGE_REGISTRY_ENABLED = os.getenv('IMAGE_REGISTRY_ENABLED', 'true').lower() == 'true'
+# 上传记录数据库文件（相对路径以项目根目录为基准）
+IMAGE_REGISTRY_FILE = PROJECT_ROOT / os.getenv('IMAGE_REGISTRY_FILE', 'data/state/image_registry.db')
+# 原图URL记录有效期（小时），有效期内不再下载原图；过期后下载并按内容哈希复用，0表示永不过期
+IMAGE_REGISTRY_TTL_HOURS = float(os.getenv('IMAGE_REGISTRY_TTL_HOURS', '168'))
+# 感知哈希去重阈值：原图文件名相同且处理后图片的 dHash（64位）汉明距离不超过该值时视为同一张图片，复用已上传的URL，-1表示不去重
+IMAGE_PHASH_MAX_DISTANCE = int(os.getenv('IMAGE_PHASH_MAX_DISTANCE', '4'))
+
 # ==================== 并行爬取配置 ====================
 # 默认并发线程数
 DEFAULT_MAX_WORKERS = int(os.getenv('PARALLEL_MAX_WORKERS', '3'))
@@ -114,6 +172,48 @@ REQUEST_DELAY_MIN = int(os.getenv('REQUEST_DELAY_MIN', '2'))
 REQUEST_DELAY_MAX = int(os.getenv('REQUEST_DELAY_MAX', '4'))
 # 批次写入大小
 BATCH_SIZE = int(os.getenv('BATCH_SIZE', '100'))
+# 单个浏览器最多处理的页面数，超过后回收重建（0表示不限制）
+DRIVER_MAX_PAGES = int(os.getenv('DRIVER_MAX_PAGES', '100'))
+# 单个浏览器进程树的内存上限（MB），超过后回收重建（0表示不检查）
+DRIVER_MAX_MEMORY_MB = float(os.getenv('DRIVER_MAX_MEMORY_MB', '1500'))
+# 详情页解析进程数（>0 时抓取线程只获取HTML，解析在独立进程中进行；0表示在抓取线程内解析）
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', '0'))
+# 结果写入队列容量（队列满时爬取线程等待写入线程）
+SINK_QUEUE_SIZE = int(os.getenv('SINK_QUEUE_SIZE', '1000'))
+# 结果写入最长间隔（秒），未满 BATCH_SIZE 时也按此间隔刷新到磁盘
+SINK_FLUSH_INTERVAL = float(os.getenv('SINK_FLUSH_INTERVAL', '5'))
+# 是否自适应调整并发数和请求间隔（根据延迟、错误率和 429/5xx 响应，AIMD 规则）
+ADAPTIVE_CONCURRENCY = os.getenv('ADAPTIVE_CONCURRENCY', 'false').lower() == 'true'
+# 自适应并发上限（以 PARALLEL_MAX_WORKERS 为初始值，运行中在 1 到该值之间调整）
+ADAPTIVE_MAX_WORKERS = int(os.getenv('ADAPTIVE_MAX_WORKERS', str(MAX_WORKERS_LIMIT)))
+# 自适应请求间隔下限（秒），以 REQUEST_DELAY_MIN 为初始值
+ADAPTIVE_MIN_DELAY = float(os.getenv('ADAPTIVE_MIN_DELAY', '0.5'))
+# 每多少个请求评估一次并调整
+ADAPTIVE_WINDOW = int(os.getenv('ADAPTIVE_WINDOW', '20'))
+
+# ==================== 异步爬取配置 ====================
+# 异步模式最大并发请求数
+ASYNC_MAX_CONCURRENCY = int(os.getenv('ASYNC_MAX_CONCURRENCY', '100'))
+# 异步模式单主机每秒最大请求数（0表示不限速）
+ASYNC_PER_HOST_RATE = float(os.getenv('ASYNC_PER_HOST_RATE', '10'))
+
+# ==================== 限速配置（令牌桶） ====================
+# 并行模式单主机每秒最多请求数（0表示不限速，只受线程数和请求延迟控制）
+SCRAPER_RATE_PER_HOST = float(os.getenv('SCRAPER_RATE_PER_HOST', '0'))
+# 并行模式单主机允许的突发请求数
+SCRAPER_BURST = int(os.getenv('SCRAPER_BURST', '1'))
+# 翻译 API 每秒最多请求数（所有翻译线程共享，0表示不限速）
+TRANSLATE_RATE = float(os.getenv('TRANSLATE_RATE', '5'))
+# 翻译 API 允许的突发请求数
+TRANSLATE_BURST = int(os.getenv('TRANSLATE_BURST', '5'))
+# 每次翻译请求合并的原文 token 预算（估算值，超出预算的长文本拆分后翻译）
+TRANSLATE_BATCH_TOKENS = int(os.getenv('TRANSLATE_BATCH_TOKENS', '1500'))
+# 每次翻译请求最多合并的文本条数（1表示每条文本单独请求）
+TRANSLATE_BATCH_ITEMS = int(os.getenv('TRANSLATE_BATCH_ITEMS', '40'))
+# 图床每秒最多上传数（0表示不限速）
+IMAGE_UPLOAD_RATE = float(os.getenv('IMAGE_UPLOAD_RATE', '2'))
+# 图床允许的突发上传数
+IMAGE_UPLOAD_BURST = int(os.getenv('IMAGE_UPLOAD_BURST', '1'))
 
 # ==================== 多页爬取配置 ====================
 # 默认最大爬取页数（None表示不限制）
@@ -123,6 +223,16 @@ ENABLE_RESUME = os.getenv('ENABLE_RESUME', 'true').lower() == 'true'
 # 断点续传时是否自动继续（仅在非交互式模式下生效）
 AUTO_RESUME = os.getenv('AUTO_RESUME', 'true').lower() == 'true'
 
+# ==================== 增量爬取配置 ====================
+# 是否启用增量爬取（只爬取新产品、列表数据有变化或详情已过期的产品，其余复用上次的详情）
+INCREMENTAL_SCRAPE = os.getenv('INCREMENTAL_SCRAPE', 'false').lower() == 'true'
+# 增量状态文件（相对路径以项目根目录为基准）
+SCRAPE_STATE_FILE = PROJECT_ROOT / os.getenv('SCRAPE_STATE_FILE', 'data/state/scrape_state.json')
+# 详情有效期（小时），超过后即使列表数据未变化也重新爬取，0表示永不过期
+SCRAPE_STATE_MAX_AGE_HOURS = float(os.getenv('SCRAPE_STATE_MAX_AGE_HOURS', '168'))
+# 详情爬取断点文件（ENABLE_RESUME=true 时，并行模式中断后再次运行跳过已写出的产品）
+DETAIL_CHECKPOINT_FILE = PROJECT_ROOT / os.getenv('DETAIL_CHECKPOINT_FILE', 'data/state/detail_checkpoint.jsonl')
+
 # ==================== 交互式选项配置（支持非交互式运行） ====================
 # 是否启用交互式模式（false时使用下面的默认配置）
 INTERACTIVE_MODE = os.getenv('INTERACTIVE_MODE', 'true').lower() == 'true'
@@ -143,7 +253,7 @@ else:
     MAX_PRODUCTS_TO_SCRAPE = None
 
 # 详情页爬取模式
-# 1 = 顺序模式, 2 = 并行模式
+# 1 = 顺序模式, 2 = 并行模式, 3 = 异步模式（HTTP高并发，不启动浏览器）
 DETAIL_SCRAPE_MODE = int(os.getenv('DETAIL_SCRAPE_MODE', '2'))
 
 # 是否运行翻译
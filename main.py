@@ -7,14 +7,30 @@ from webdriver_manager.chrome import ChromeDriverManager
 import time
 import csv
 import os
-import json
-import re
-from bs4 import BeautifulSoup
+from functools import partial
+from threading import Lock
 from typing import Dict, List, Any, Optional
 from utils.translate import translate_main
 from scripts.process_csv_images import image_post_precessor
-from utils.multi_page_scraper import scrape_all_pages
+from utils.multi_page_scraper import scrape_all_pages, scrape_all_pages_direct
 from utils.parallel_scraper import scrape_details_parallel
+from utils.async_scraper import scrape_details_async
+from utils.http_fetcher import get_http_fetcher
+from utils.html_text import html_to_text
+from utils.layout_locator import LAYOUT_ID, extract_layout_text, load_resolved_data, loads as load_json
+from utils.listing_extractor import extract_listing_products
+from utils.page_cache import get_page_cache
+from utils.detail_checkpoint import DetailCheckpoint
+from utils.product_store import open_product_store
+from utils.result_sink import CsvSink, ProductStoreSink
+from utils.scrape_state import load_scrape_state
+from utils.page_ready import (
+    log_readiness_summary,
+    wait_for_clickable,
+    wait_for_invisibility,
+    wait_for_layout,
+    wait_for_ready_state,
+)
 from utils.logger import setup_logger, get_logger
 import logging
 import config
@@ -26,18 +42,14 @@ def handle_cookie_popup(driver, timeout=None):
     if timeout is None:
         timeout = config.COOKIE_TIMEOUT
     try:
-        # 使用配置文件中的 Cookie 选择器
-        selectors = config.COOKIE_SELECTORS
-
-        for selector in selectors:
-            try:
-                button = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable((By.XPATH, selector)))
-                button.click()
-                print("✓ 已接受 Cookie")
-                time.sleep(1)
-                return True
-            except:
-                continue
+        # 将所有候选选择器合并为一个 XPath，只等待一次
+        button = wait_for_clickable(driver, " | ".join(config.COOKIE_SELECTORS), timeout)
+        if button is not None:
+            button.click()
+            print("✓ 已接受 Cookie")
+            # 等待弹窗关闭，而不是固定休眠
+            wait_for_invisibility(driver, button)
+            return True
 
         print("→ 未发现 Cookie 弹窗")
         return False
@@ -46,13 +58,34 @@ def handle_cookie_popup(driver, timeout=None):
         return False
 
 
-def scrape_product_list(driver, url):
-    """爬取产品列表页面的基本信息"""
+def cache_page(url: str, html_content: str):
+    """将浏览器获取的页面写入页面缓存（仅缓存包含 __LAYOUT__ 数据的完整页面）"""
+    cache = get_page_cache()
+    if cache is not None and html_content and LAYOUT_ID in html_content:
+        cache.put(url, html_content)
+
+
+def scrape_product_list(driver, url, use_cache=True):
+    """
+    爬取产品列表页面的基本信息
+
+    use_cache=True 时优先解析页面缓存中的HTML，命中则不打开浏览器；
+    浏览器翻页模式需要 driver 停留在该页面上，应传入 use_cache=False。
+    """
+    cache = get_page_cache() if use_cache else None
+    if cache is not None:
+        cached_html = cache.get(url)
+        if cached_html is not None:
+            products = extract_listing_products(cached_html)
+            if products:
+                print(f"\n✓ 列表页缓存命中: {url}（{len(products)} 个产品）")
+                return products
+
     print(f"\n正在访问列表页: {url}")
     driver.get(url)
 
-    # 等待页面加载
-    time.sleep(3)
+    # 等待文档解析完成（不等待图片等资源）
+    wait_for_ready_state(driver, "interactive", timeout=config.PAGE_READY_TIMEOUT)
 
     # 处理 Cookie 弹窗
     handle_cookie_popup(driver)
@@ -67,93 +100,126 @@ def scrape_product_list(driver, url):
         print("✗ 未找到产品卡片")
         return []
 
-    # 找到所有产品卡片
-    product_cards = driver.find_elements(By.CSS_SELECTOR, '[data-test="product-card"]')
-    print(f"✓ 找到 {len(product_cards)} 个产品")
+    # 一次性读取页面源码并解析，避免每个卡片多次 WebDriver 调用
+    page_source = driver.page_source
+    products = extract_listing_products(page_source)
+    print(f"✓ 找到 {len(products)} 个产品")
+    if products:
+        cache_page(url, page_source)
 
-    products = []
-
-    for idx, card in enumerate(product_cards, 1):
-        try:
-            # 提取基本信息
-            product = {}
-
-            # 产品链接
-            product["url"] = card.get_attribute("href")
-
-            # 产品品牌
-            try:
-                brand_element = card.find_element(By.CSS_SELECTOR, '[data-test="product-card-brand-name"]')
-                product["brand"] = brand_element.text.strip()
-            except:
-                product["brand"] = ""
-
-            # 产品名称
-            try:
-                title_element = card.find_element(By.CSS_SELECTOR, '[data-test="product-card-title"]')
-                product["name"] = title_element.text.strip()
-            except:
-                product["name"] = ""
-
-            # 产品价格
-            try:
-                price_element = card.find_element(By.CSS_SELECTOR, '[data-test="product-card-price"]')
-                product["price"] = price_element.text.strip()
-            except:
-                product["price"] = ""
-
-            # 产品图片
-            try:
-                image_element = card.find_element(By.CSS_SELECTOR, '[data-test="product-image"]')
-                product["image"] = image_element.get_attribute("src")
-            except:
-                product["image"] = ""
-
-            products.append(product)
-            print(f"  [{idx}] {product['brand']} - {product['name'][:50]}...")
-
-        except Exception as e:
-            print(f"  ✗ 产品 {idx} 提取失败: {e}")
-            continue
+    for idx, product in enumerate(products, 1):
+        print(f"  [{idx}] {product['brand']} - {product['name'][:50]}...")
 
     return products
 
 
-def find_product_uuid(widgets: List[Dict]) -> Optional[str]:
-    """递归查找产品数据的UUID"""
-    for widget in widgets:
-        if widget.get("name") == "accordions":
-            refs = widget.get("resolveParamRefs", {})
-            for key, uuid in refs.items():
-                if "pdp_product_data" in key:
-                    return uuid
+def scrape_listing_pages(driver, list_url: str, max_pages: Optional[int] = None) -> List[Dict]:
+    """
+    爬取多个列表页
+
+    LISTING_FETCH_ENGINE=http 时直接并发请求 ?page=N 并解析页面内嵌的 JSON，
+    个别分页请求失败时用浏览器打开该分页补爬，无法获取第1页或补爬后仍有分页缺失时
+    回退到浏览器点击翻页。
+    """
+    if config.LISTING_FETCH_ENGINE == "http":
+        products = scrape_all_pages_direct(
+            base_url=list_url,
+            max_pages=max_pages,
+            max_workers=config.LISTING_PAGE_WORKERS,
+            fallback_page_func=partial(scrape_product_list, driver)
+        )
+        if products is not None:
+            return products
+        print("→ 直接分页请求失败，回退到浏览器翻页")
+
+    return scrape_all_pages(
+        driver=driver,
+        base_url=list_url,
+        # 点击翻页依赖浏览器停留在当前页，不能读取缓存
+        scrape_single_page_func=partial(scrape_product_list, use_cache=False),
+        max_pages=max_pages,
+        enable_resume=config.ENABLE_RESUME
+    )
+
+
+# 上次找到产品UUID的 widget 路径（各详情页结构相同，下次可直接按路径查找）
+_product_uuid_path: Optional[List[int]] = None
+_product_uuid_path_lock = Lock()
+
+
+def _product_ref_uuid(widget: Dict) -> Optional[str]:
+    """从 accordions widget 的引用中取出产品数据UUID"""
+    if widget.get("name") == "accordions":
+        refs = widget.get("resolveParamRefs", {})
+        for key, uuid in refs.items():
+            if "pdp_product_data" in key:
+                return uuid
+    return None
+
+
+def _find_product_uuid_path(widgets: List[Dict], path: List[int]):
+    """递归查找产品数据的UUID，返回 (UUID, widget 路径)"""
+    for index, widget in enumerate(widgets):
+        uuid = _product_ref_uuid(widget)
+        if uuid:
+            return uuid, path + [index]
         if "children" in widget and widget["children"]:
-            uuid = find_product_uuid(widget["children"])
+            result = _find_product_uuid_path(widget["children"], path + [index])
+            if result:
+                return result
+    return None
+
+
+def find_product_uuid(widgets: List[Dict]) -> Optional[str]:
+    """查找产品数据的UUID（优先按缓存的 widget 路径查找，失败时递归查找；多个爬取线程共用缓存的路径）"""
+    global _product_uuid_path
+
+    with _product_uuid_path_lock:
+        cached_path = _product_uuid_path
+
+    if cached_path:
+        try:
+            widget = {"children": widgets}
+            for index in cached_path:
+                widget = widget["children"][index]
+            uuid = _product_ref_uuid(widget)
             if uuid:
                 return uuid
-    return None
+        except (IndexError, KeyError, TypeError):
+            pass
+
+    result = _find_product_uuid_path(widgets, [])
+    if not result:
+        return None
+    with _product_uuid_path_lock:
+        _product_uuid_path = result[1]
+    return result[0]
 
 
 def clean_html(html_text: str) -> str:
     """清理HTML标签，返回纯文本"""
     if not html_text:
         return ""
-    soup = BeautifulSoup(html_text, "html.parser")
-    return soup.get_text(strip=True, separator=" ")
+    return html_to_text(html_text, separator=" ")
 
 
 def extract_product_json(html_content: str) -> Dict[str, Any]:
     """从HTML中提取产品JSON数据"""
-    # 提取JSON数据
-    match = re.search(r'<script id="__LAYOUT__"[^>]*>(.*?)</script>', html_content, re.DOTALL)
+    # 只解码产品数据子树（不解码整个 __LAYOUT__）
+    product_data = load_resolved_data(html_content, "pdp_product_data")
+    if product_data is not None:
+        return product_data
 
-    if not match:
+    # 回退：解码完整 JSON
+    layout_text = extract_layout_text(html_content)
+
+    if layout_text is None:
         print("  ✗ 未找到__LAYOUT__数据")
         return {}
 
     try:
-        layout_data = json.loads(match.group(1))
-    except json.JSONDecodeError as e:
+        layout_data = load_json(layout_text)
+    except ValueError as e:
         print(f"  ✗ JSON解析失败: {e}")
         return {}
 
@@ -177,80 +243,139 @@ def extract_product_json(html_content: str) -> Dict[str, Any]:
     return product_wrapper["data"]
 
 
+def parse_product_detail(html_content: str) -> Dict[str, Any]:
+    """从详情页HTML中解析产品详情字段"""
+    # 提取JSON数据
+    product_data = extract_product_json(html_content)
+
+    if not product_data:
+        return {}
+
+    details = {}
+
+    # 产品亮点
+    benefits = product_data.get("benefits", [])
+    details["highlights"] = "; ".join(benefits) if benefits else ""
+
+    # 产品描述
+    description_html = product_data.get("description", "")
+    details["description"] = clean_html(description_html)
+
+    # Info Sections
+    info_sections = product_data.get("infoSections", {})
+    info_section = info_sections.get("infoSection", {})
+
+    # 用法说明
+    directions = info_section.get("directions", {})
+    heading = directions.get("heading", "")
+    text = directions.get("text", "")
+    details["directions"] = f"{heading} {text}".strip()
+
+    # 配料表
+    ingredients = info_section.get("otherIngredients", {})
+    ingredients_html = ingredients.get("text", "")
+    details["ingredients"] = clean_html(ingredients_html)
+
+    # 营养成分
+    nutritionals = info_sections.get("nutritionals", [])
+    nutritional_text = []
+    for nutritional in nutritionals:
+        for section in nutritional.get("sections", []):
+            fact = section.get("fact", {})
+            for item in fact.get("keys", []):
+                nutrient = item.get("key", "").strip()
+                amount = item.get("value", "").strip()
+                if nutrient and amount:
+                    nutritional_text.append(f"{nutrient}: {amount}")
+    details["nutritional_info"] = "; ".join(nutritional_text)
+
+    # 作用部位（从CSV模板来看需要这些字段，但JSON中可能没有直接对应）
+    # 暂时留空，后续可以根据实际需要补充
+    details["target_area"] = ""
+
+    return details
+
+
+def fetch_detail_html_selenium(driver, url: str) -> str:
+    """使用 Selenium 获取详情页HTML"""
+    driver.get(url)
+
+    # 等待 __LAYOUT__ 数据节点就绪（超时也继续尝试）
+    wait_for_layout(driver, timeout=config.PAGE_READY_TIMEOUT)
+
+    # 获取页面HTML，写入缓存供下次运行直接使用
+    html_content = driver.page_source
+    cache_page(url, html_content)
+    return html_content
+
+
+def fetch_detail_html(driver, url: str) -> Optional[str]:
+    """
+    获取详情页HTML（两阶段流水线的抓取阶段）
+
+    driver 为 None 时直接请求HTML，否则使用 Selenium（HTTP 失败后的重试会传入 driver）。
+    """
+    if driver is None:
+        return get_http_fetcher().fetch_layout_page(url)
+    return fetch_detail_html_selenium(driver, url)
+
+
 def scrape_product_detail(driver, url):
-    """爬取产品详情页的详细信息"""
+    """
+    爬取产品详情页的详细信息
+
+    driver 为 None 时直接请求服务端渲染的HTML（DETAIL_FETCH_ENGINE=http 的首次尝试），
+    否则直接使用 Selenium（HTTP 未获取到详情时，由调用方传入 driver 再次调用）。
+    两种方式都会先读取页面缓存。
+    """
     try:
-        driver.get(url)
+        if driver is None:
+            # HTTP 抓取器内部会先读取页面缓存
+            html_content = get_http_fetcher().fetch_layout_page(url)
+            return parse_product_detail(html_content) if html_content else {}
 
-        # 增加等待时间，确保页面完全加载
-        time.sleep(4)
+        cache = get_page_cache()
+        cached_html = cache.get(url) if cache is not None else None
+        if cached_html:
+            details = parse_product_detail(cached_html)
+            if details:
+                return details
 
-        # 等待页面关键元素加载
-        try:
-            WebDriverWait(driver, 10).until(
-                lambda d: d.execute_script("return document.readyState") == "complete"
-            )
-        except:
-            pass  # 超时也继续尝试
-
-        # 获取页面HTML
-        html_content = driver.page_source
-
-        # 提取JSON数据
-        product_data = extract_product_json(html_content)
-
-        if not product_data:
-            return {}
-
-        details = {}
-
-        # 产品亮点
-        benefits = product_data.get("benefits", [])
-        details["highlights"] = "; ".join(benefits) if benefits else ""
-
-        # 产品描述
-        description_html = product_data.get("description", "")
-        details["description"] = clean_html(description_html)
-
-        # Info Sections
-        info_sections = product_data.get("infoSections", {})
-        info_section = info_sections.get("infoSection", {})
-
-        # 用法说明
-        directions = info_section.get("directions", {})
-        heading = directions.get("heading", "")
-        text = directions.get("text", "")
-        details["directions"] = f"{heading} {text}".strip()
-
-        # 配料表
-        ingredients = info_section.get("otherIngredients", {})
-        ingredients_html = ingredients.get("text", "")
-        details["ingredients"] = clean_html(ingredients_html)
-
-        # 营养成分
-        nutritionals = info_sections.get("nutritionals", [])
-        nutritional_text = []
-        for nutritional in nutritionals:
-            for section in nutritional.get("sections", []):
-                fact = section.get("fact", {})
-                for item in fact.get("keys", []):
-                    nutrient = item.get("key", "").strip()
-                    amount = item.get("value", "").strip()
-                    if nutrient and amount:
-                        nutritional_text.append(f"{nutrient}: {amount}")
-        details["nutritional_info"] = "; ".join(nutritional_text)
-
-        # 作用部位（从CSV模板来看需要这些字段，但JSON中可能没有直接对应）
-        # 暂时留空，后续可以根据实际需要补充
-        details["target_area"] = ""
-
-        return details
+        html_content = fetch_detail_html_selenium(driver, url)
+        return parse_product_detail(html_content)
 
     except Exception as e:
         print(f"  ✗ 详情提取失败: {e}")
         return {}
 
 
+def build_complete_row(product: Dict, product_type: str) -> Dict[str, str]:
+    """
+    将产品数据转换为完整信息CSV的一行
+
+    Args:
+        product: 合并了详情的产品数据
+        product_type: 产品类型
+
+    Returns:
+        CSV 行（键为中文表头）
+    """
+    return {
+        "产品名称": product.get("name", ""),
+        "产品价格": product.get("price", ""),
+        "产品亮点": product.get("highlights", ""),
+        "用法说明": product.get("directions", ""),
+        "产品图": product.get("image", ""),
+        "产品类型": product_type,
+        "作用部位": product.get("target_area", ""),
+        "配料表": product.get("ingredients", ""),
+        "产品品牌": product.get("brand", ""),
+        "产品描述": product.get("description", ""),
+        "营养成分": product.get("nutritional_info", ""),
+        "URL": product.get("url", ""),
+    }
+
+
 def main():
     print("=" * 60)
     print("Holland & Barrett 产品爬虫")
@@ -267,6 +392,9 @@ def main():
     driver.set_page_load_timeout(config.PAGE_LOAD_TIMEOUT)
     driver.set_script_timeout(config.SCRIPT_TIMEOUT)
 
+    # SQLite 产品存储（PRODUCT_STORE_ENABLED=false 时为 None，沿用逐批追加CSV）
+    product_store = open_product_store()
+
     try:
         # 使用配置文件中的默认URL
         list_url = config.DEFAULT_CATEGORY_URL
@@ -290,13 +418,7 @@ def main():
         elif mode == "2":
             # 多页模式 - 爬取所有页
             print("  → 多页模式 - 爬取所有页面")
-            products = scrape_all_pages(
-                driver=driver,
-                base_url=list_url,
-                scrape_single_page_func=scrape_product_list,
-                max_pages=None,
-                enable_resume=config.ENABLE_RESUME
-            )
+            products = scrape_listing_pages(driver, list_url, max_pages=None)
         elif mode == "3":
             # 限制页数模式
             if config.INTERACTIVE_MODE:
@@ -309,13 +431,7 @@ def main():
                 max_pages = config.MAX_PAGES_LIMIT
 
             print(f"  → 限制页数模式 - 爬取{max_pages}页")
-            products = scrape_all_pages(
-                driver=driver,
-                base_url=list_url,
-                scrape_single_page_func=scrape_product_list,
-                max_pages=max_pages,
-                enable_resume=config.ENABLE_RESUME
-            )
+            products = scrape_listing_pages(driver, list_url, max_pages=max_pages)
         else:
             print("无效选择，使用单页模式")
             products = scrape_product_list(driver, list_url)
@@ -332,6 +448,8 @@ def main():
                 writer.writeheader()
                 writer.writerows(products)
             print(f"\n✓ 基本信息已保存到: {output_file}")
+            if product_store is not None:
+                product_store.upsert_products(products, product_type, with_details=False)
 
         # 询问是否继续爬取详情页 - 支持交互式和非交互式
         if config.INTERACTIVE_MODE:
@@ -365,20 +483,35 @@ def main():
                     max_products = len(products)
                     print(f"配置文件设置: 爬取全部{max_products}个产品")
 
+            # 增量爬取：列表数据未变化且详情未过期的产品直接复用上次的详情
+            detail_products = products[:max_products]
+            reused_products = []
+            scrape_state = None
+            if config.INCREMENTAL_SCRAPE:
+                scrape_state = load_scrape_state()
+                reused_products, detail_products = scrape_state.split(detail_products)
+                print(f"增量模式: 复用 {len(reused_products)} 个未变化产品的详情，"
+                      f"需要爬取 {len(detail_products)} 个")
+
             # 询问是否使用并行爬取 - 支持交互式和非交互式
             if config.INTERACTIVE_MODE:
                 print("\n爬取模式:")
                 print("  1. 顺序模式 - 一个接一个爬取（较慢但稳定）")
                 print("  2. 并行模式 - 多线程同时爬取（推荐，3-5个线程）")
-                parallel_mode = input("选择模式 (1/2, 默认2): ").strip() or "2"
+                print("  3. 异步模式 - HTTP高并发爬取（不启动浏览器，适合大批量）")
+                parallel_mode = input("选择模式 (1/2/3, 默认2): ").strip() or "2"
             else:
                 parallel_mode = str(config.DETAIL_SCRAPE_MODE)
-                mode_name = "并行模式" if parallel_mode == "2" else "顺序模式"
+                mode_name = {"2": "并行模式", "3": "异步模式"}.get(parallel_mode, "顺序模式")
                 print(f"配置文件设置: {mode_name}")
 
-            if parallel_mode == "2":
+            if parallel_mode in ("2", "3"):
                 # 并行模式配置 - 支持交互式和非交互式
-                if config.INTERACTIVE_MODE:
+                if parallel_mode == "3":
+                    max_workers = config.ASYNC_MAX_CONCURRENCY
+                    print(f"配置文件设置: 最多{max_workers}个并发请求，"
+                          f"单主机{config.ASYNC_PER_HOST_RATE or '不限'}次/秒")
+                elif config.INTERACTIVE_MODE:
                     print(f"\n提示: 建议使用{config.DEFAULT_MAX_WORKERS}-5个线程以平衡速度和稳定性")
                     try:
                         workers = input(f"并发线程数 (建议{config.DEFAULT_MAX_WORKERS}-5, 默认{config.DEFAULT_MAX_WORKERS}): ").strip() or str(config.DEFAULT_MAX_WORKERS)
@@ -392,8 +525,14 @@ def main():
                 retry_times = config.RETRY_TIMES
                 request_delay = (config.REQUEST_DELAY_MIN, config.REQUEST_DELAY_MAX)
 
-                print(f"\n使用并行模式爬取 {max_products} 个产品，{max_workers} 个线程并发")
-                print(f"配置: {retry_times}次重试, {request_delay[0]}-{request_delay[1]}秒随机延迟")
+                if parallel_mode == "3":
+                    print(f"\n使用异步模式爬取 {len(detail_products)} 个产品，最多 {max_workers} 个请求并发")
+                    print(f"配置: {retry_times}次重试, 按主机限速")
+                else:
+                    print(f"\n使用并行模式爬取 {len(detail_products)} 个产品，{max_workers} 个线程并发")
+                    print(f"配置: {retry_times}次重试, {request_delay[0]}-{request_delay[1]}秒随机延迟")
+                    if config.ADAPTIVE_CONCURRENCY:
+                        print(f"自适应并发: 运行中根据延迟和错误率在 1-{max(config.ADAPTIVE_MAX_WORKERS, max_workers)} 个线程之间调整")
                 print(f"💡 每{config.BATCH_SIZE}个产品自动写入CSV，避免内存占用过大")
                 print(f"{'=' * 60}")
 
@@ -403,7 +542,12 @@ def main():
 
                 # 创建批次写入回调函数
                 def write_batch_to_csv(batch_products, batch_num):
-                    """将批次产品写入CSV"""
+                    """将批次产品写入CSV（启用产品存储时写入数据库，最后统一导出CSV）"""
+                    if product_store is not None:
+                        product_store.upsert_products(batch_products, product_type)
+                        print(f"✓ 批次 {batch_num} 已写入 {len(batch_products)} 个产品到 {product_store.db_path.name}")
+                        return
+
                     from pathlib import Path
                     output_path = Path(final_output)
                     output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -418,45 +562,129 @@ def main():
                             writer.writeheader()
 
                         for product in batch_products:
-                            row = {
-                                "产品名称": product.get("name", ""),
-                                "产品价格": product.get("price", ""),
-                                "产品亮点": product.get("highlights", ""),
-                                "用法说明": product.get("directions", ""),
-                                "产品图": product.get("image", ""),
-                                "产品类型": product_type,
-                                "作用部位": product.get("target_area", ""),
-                                "配料表": product.get("ingredients", ""),
-                                "产品品牌": product.get("brand", ""),
-                                "产品描述": product.get("description", ""),
-                                "营养成分": product.get("nutritional_info", ""),
-                                "URL": product.get("url", ""),
-                            }
-                            writer.writerow(row)
+                            writer.writerow(build_complete_row(product, product_type))
 
                     print(f"✓ 批次 {batch_num} 已写入 {len(batch_products)} 个产品到 {final_output}")
 
-                # 使用并行爬取（带分批写入）- 使用配置文件中的批次大小
-                products = scrape_details_parallel(
-                    products=products,
-                    scrape_detail_func=scrape_product_detail,
-                    max_workers=max_workers,
-                    max_products=max_products,
-                    retry_times=retry_times,
-                    request_delay=request_delay,
-                    batch_size=config.BATCH_SIZE,
-                    batch_callback=write_batch_to_csv
-                )
+                if parallel_mode == "3":
+                    # 复用的产品作为第一批写入，爬取结果的批次号顺延
+                    batch_offset = 0
+                    if reused_products:
+                        write_batch_to_csv(reused_products, 1)
+                        batch_offset = 1
+
+                    def write_scraped_batch(batch_products, batch_num):
+                        """写入爬取批次，并记录增量状态（中断后已完成的批次不会重复爬取）"""
+                        write_batch_to_csv(batch_products, batch_num + batch_offset)
+                        if scrape_state is not None:
+                            scrape_state.record_many(batch_products)
+                            scrape_state.save()
+
+                    # 使用异步爬取（带分批写入）
+                    products = scrape_details_async(
+                        products=detail_products,
+                        parse_detail_func=parse_product_detail,
+                        max_workers=max_workers,
+                        retry_times=retry_times,
+                        batch_size=config.BATCH_SIZE,
+                        batch_callback=write_scraped_batch
+                    ) if detail_products else []
+                else:
+                    # 使用并行爬取：结果交给独立写入线程，爬取线程不等待磁盘写入，也不在内存中累积
+                    reused_urls = {product["url"] for product in reused_products}
+
+                    # 详情爬取断点：进程中断后再次运行时跳过已写出的产品
+                    checkpoint = None
+                    resume = False
+                    if config.ENABLE_RESUME:
+                        checkpoint_target = product_store.db_path if product_store is not None else final_output
+                        checkpoint = DetailCheckpoint(config.DETAIL_CHECKPOINT_FILE, checkpoint_target)
+                        completed_count = checkpoint.load()
+                        if completed_count:
+                            print(f"\n📂 发现未完成的详情爬取: 已写出 {completed_count} 个产品")
+                            if config.INTERACTIVE_MODE:
+                                resume = input("是否继续之前的爬取？(y/n): ").strip().lower() == "y"
+                            else:
+                                resume = config.AUTO_RESUME
+                                print(f"   → {'自动继续' if resume else '重新开始'}（配置文件设置）")
+                        if resume:
+                            # CSV 截断到最后一批完整写出的位置；数据库每批一次事务，无需处理
+                            checkpoint.reconcile(None if product_store is not None else final_output)
+                            print(f"✓ 继续爬取，跳过 {len(checkpoint.completed)} 个已完成的产品")
+                        else:
+                            checkpoint.start()
+
+                    def record_flushed(flushed_products):
+                        """每批写出后记录断点和增量状态（中断后已写出的产品不会重复爬取）"""
+                        if checkpoint is not None:
+                            checkpoint.record([product["url"] for product in flushed_products], result_sink.offset)
+                        if scrape_state is not None:
+                            scrape_state.record_many(
+                                [product for product in flushed_products if product["url"] not in reused_urls]
+                            )
+                            scrape_state.save()
+
+                    sink_options = dict(
+                        queue_size=config.SINK_QUEUE_SIZE,
+                        flush_rows=config.BATCH_SIZE,
+                        flush_interval=config.SINK_FLUSH_INTERVAL,
+                        on_flush=record_flushed
+                    )
+                    if product_store is not None:
+                        result_sink = ProductStoreSink(product_store, product_type, **sink_options)
+                    else:
+                        result_sink = CsvSink(
+                            final_output, fieldnames,
+                            row_builder=partial(build_complete_row, product_type=product_type),
+                            append=resume,
+                            **sink_options
+                        )
+
+                    with result_sink:
+                        # 复用的产品已包含详情，直接写入
+                        for product in (checkpoint.pending(reused_products) if resume else reused_products):
+                            result_sink.put(product)
+                        scrape_details_parallel(
+                            products=detail_products,
+                            scrape_detail_func=scrape_product_detail,
+                            max_workers=max_workers,
+                            retry_times=retry_times,
+                            request_delay=request_delay,
+                            # PARSE_WORKERS > 0 时抓取与解析分离，解析在独立进程中进行
+                            fetch_func=fetch_detail_html if config.PARSE_WORKERS > 0 else None,
+                            parse_func=parse_product_detail if config.PARSE_WORKERS > 0 else None,
+                            result_sink=result_sink,
+                            collect_results=False,
+                            checkpoint=checkpoint if resume else None
+                        )
+                    # 正常完成后删除断点（中断时保留，下次继续）
+                    if checkpoint is not None:
+                        checkpoint.clear()
+                    print(f"✓ 写入线程共写出 {result_sink.written} 个产品")
+                    # 结果已由写入线程写出，这里只保留产品列表用于导出和统计
+                    products = list(detail_products)
+                products = reused_products + products
+                if product_store is not None:
+                    exported = product_store.export_csv(
+                        "products_complete", final_output, urls=[product["url"] for product in products]
+                    )
+                    print(f"✓ 已从数据库导出 {exported} 个产品到 {final_output}")
             else:
                 # 顺序爬取（保留原有逻辑）
-                print(f"\n使用顺序模式爬取 {max_products} 个产品的详情...")
+                print(f"\n使用顺序模式爬取 {len(detail_products)} 个产品的详情...")
                 print(f"{'=' * 60}")
 
                 failed_products = []  # 记录失败的产品
-                for idx, product in enumerate(products[:max_products], 1):
-                    print(f"\n[{idx}/{max_products}] {product['name'][:50]}...")
+                for idx, product in enumerate(detail_products, 1):
+                    print(f"\n[{idx}/{len(detail_products)}] {product['name'][:50]}...")
                     try:
-                        details = scrape_product_detail(driver, product["url"])
+                        details = {}
+                        if config.DETAIL_FETCH_ENGINE == "http":
+                            details = scrape_product_detail(None, product["url"])
+                            if not details:
+                                print("  → HTTP 抓取未获取到详情，回退到 Selenium")
+                        if not details:
+                            details = scrape_product_detail(driver, product["url"])
                         # 检查是否成功获取到详情
                         if details and any(key in details for key in ['highlights', 'description', 'directions']):
                             product.update(details)
@@ -478,6 +706,10 @@ def main():
                         })
                     time.sleep(2)  # 避免请求过快
 
+                if scrape_state is not None:
+                    scrape_state.record_many(detail_products)
+                    scrape_state.save()
+
                 # 保存失败记录 - 使用配置文件中的路径
                 if failed_products:
                     import json
@@ -502,8 +734,16 @@ def main():
                     print(f"\n✗ {len(failed_products)} 个产品爬取失败，已记录到: {failed_file}")
                     print(f"  可使用 'uv run python scripts/retry_failed.py' 重新爬取")
 
-            # 保存完整数据到CSV（如果是并行模式且使用了分批写入，则跳过）
-            if parallel_mode != "2":  # 顺序模式需要保存
+            # 保存完整数据到CSV（如果是并行/异步模式且使用了分批写入，则跳过）
+            if parallel_mode not in ("2", "3") and product_store is not None:
+                # 写入数据库后导出本次爬取的产品
+                final_output = config.get_output_path(output_type='complete')
+                sequential_products = reused_products + detail_products
+                product_store.upsert_products(sequential_products, product_type)
+                product_store.export_csv(
+                    "products_complete", final_output, urls=[product["url"] for product in sequential_products]
+                )
+            elif parallel_mode not in ("2", "3"):  # 顺序模式需要保存
                 # 使用配置文件中的路径和字段名
                 final_output = config.get_output_path(output_type='complete')
                 fieldnames = config.CSV_FIELDNAMES_COMPLETE
@@ -512,26 +752,12 @@ def main():
                     writer = csv.DictWriter(f, fieldnames=fieldnames)
                     writer.writeheader()
 
-                    for product in products[:max_products]:
-                        row = {
-                            "产品名称": product.get("name", ""),
-                            "产品价格": product.get("price", ""),
-                            "产品亮点": product.get("highlights", ""),
-                            "用法说明": product.get("directions", ""),
-                            "产品图": product.get("image", ""),
-                            "产品类型": product_type,
-                            "作用部位": product.get("target_area", ""),
-                            "配料表": product.get("ingredients", ""),
-                            "产品品牌": product.get("brand", ""),
-                            "产品描述": product.get("description", ""),
-                            "营养成分": product.get("nutritional_info", ""),
-                            "URL": product.get("url", ""),
-                        }
-                        writer.writerow(row)
+                    for product in reused_products + detail_products:
+                        writer.writerow(build_complete_row(product, product_type))
 
             print(f"\n{'=' * 60}")
-            if parallel_mode == "2":
-                # 并行模式已经分批保存
+            if parallel_mode in ("2", "3"):
+                # 并行/异步模式已经分批保存
                 print(f"✓ 所有数据已保存到: data/output/products_complete.csv")
                 print(f"✓ 共爬取 {len(products)} 个产品的完整信息")
             else:
@@ -557,6 +783,9 @@ def main():
     except Exception as e:
         print(f"\n✗ 发生错误: {e}")
     finally:
+        log_readiness_summary()
+        if product_store is not None:
+            product_store.close()
         print("\n关闭浏览器...")
         driver.quit()
         print("完成!")
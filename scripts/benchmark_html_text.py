@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+HTML 转纯文本性能测试
+
+使用方法:
+    uv run python scripts/benchmark_html_text.py [--rounds N]
+
+对比 BeautifulSoup.get_text 与 utils.html_text.html_to_text 的耗时:
+1. 详情页中 clean_html 实际处理的字段（描述、配料）
+2. 两个样本页面 __LAYOUT__ 中所有包含 HTML 标记的字符串
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from bs4 import BeautifulSoup
+from utils.html_text import html_to_text
+from utils.layout_locator import load_layout, load_resolved_data
+
+SAMPLES_DIR = project_root / "data" / "samples"
+DETAIL_SAMPLE = SAMPLES_DIR / "Nature's Bounty® Hair, Skin and Nails with Biotin 60 Gummies | H&B.html"
+
+
+def clean_html_inputs(product_data):
+    """详情页中 clean_html 实际处理的字段"""
+    info_section = product_data.get("infoSections", {}).get("infoSection", {})
+    return [
+        product_data.get("description", ""),
+        info_section.get("otherIngredients", {}).get("text", ""),
+    ]
+
+
+def markup_fragments(layout_data):
+    """收集 __LAYOUT__ 中所有包含 HTML 标记的字符串"""
+    fragments = []
+
+    def collect(value):
+        if isinstance(value, dict):
+            for item in value.values():
+                collect(item)
+        elif isinstance(value, list):
+            for item in value:
+                collect(item)
+        elif isinstance(value, str) and "<" in value:
+            fragments.append(value)
+
+    collect(layout_data)
+    return fragments
+
+
+def bs4_text(html_text):
+    """原实现"""
+    return BeautifulSoup(html_text, "html.parser").get_text(strip=True, separator=" ")
+
+
+def benchmark(name, func, fragments, rounds):
+    """运行多轮并返回处理全部片段的平均耗时（毫秒）"""
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        for fragment in fragments:
+            func(fragment)
+    elapsed = (time.perf_counter() - start_time) / rounds * 1000
+    print(f"  {name:<24} {elapsed:8.3f} ms")
+    return elapsed
+
+
+def compare(title, fragments, rounds):
+    """对一组片段比较两种实现"""
+    total_kb = sum(len(fragment) for fragment in fragments) / 1024
+    print(f"\n{title}: {len(fragments)} 个片段，共 {total_kb:.1f} KB")
+    assert all(html_to_text(fragment) == bs4_text(fragment) for fragment in fragments), "输出与 BeautifulSoup 不一致"
+
+    bs4_ms = benchmark("BeautifulSoup.get_text", bs4_text, fragments, rounds)
+    fast_ms = benchmark("html_to_text", html_to_text, fragments, rounds)
+    print(f"  html_to_text 快 {bs4_ms / fast_ms:.1f} 倍")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML 转纯文本性能测试")
+    parser.add_argument("--rounds", type=int, default=20, help="运行轮数")
+    args = parser.parse_args()
+
+    print(f"轮数: {args.rounds}")
+
+    detail_html = DETAIL_SAMPLE.read_text(encoding="utf-8")
+    compare("详情页 clean_html 输入", clean_html_inputs(load_resolved_data(detail_html, "pdp_product_data")), args.rounds)
+
+    fragments = []
+    for path in sorted(SAMPLES_DIR.glob("*.html")):
+        fragments.extend(markup_fragments(load_layout(path.read_text(encoding="utf-8"))))
+    compare("样本页面中的 HTML 片段", fragments, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
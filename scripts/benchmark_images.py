@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+图片处理性能测试
+
+使用方法:
+    uv run python scripts/benchmark_images.py [--input DIR] [--rounds N] [--quality Q]
+
+对比原实现（统一转 RGBA、从原尺寸 LANCZOS 缩放、蒙版粘贴、保存 PNG）与
+utils.image_processor.render_image 各输出格式的耗时、输出体积和画质（相对原实现的 PSNR）。
+未指定 --input 时使用生成的模拟产品图（大尺寸 JPEG、小尺寸 JPEG、不透明 PNG、透明 PNG）。
+"""
+
+import argparse
+import math
+import sys
+import time
+from io import BytesIO
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from PIL import Image, ImageChops, ImageDraw, ImageStat
+from utils.image_processor import OUTPUT_FORMATS, render_image
+
+TARGET_SIZE = (800, 400)
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".webp"}
+
+
+def legacy_render(image_data, target_size):
+    """原实现"""
+    img = Image.open(BytesIO(image_data))
+    if img.mode != "RGBA":
+        img = img.convert("RGBA")
+    target_width, target_height = target_size
+    scale = min(target_width / img.width, target_height / img.height)
+    new_width, new_height = int(img.width * scale), int(img.height * scale)
+    img_resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    background = Image.new("RGB", target_size, (255, 255, 255))
+    x, y = (target_width - new_width) // 2, (target_height - new_height) // 2
+    background.paste(img_resized, (x, y), img_resized)
+    output = BytesIO()
+    background.save(output, format="PNG", quality=95)
+    return output.getvalue()
+
+
+def make_sample(size, image_format, transparent=False):
+    """生成模拟产品图（瓶身、瓶盖和标签）"""
+    mode = "RGBA" if transparent else "RGB"
+    background = (255, 255, 255, 0) if transparent else (255, 255, 255)
+    img = Image.new(mode, (1000, 1000), background)
+    draw = ImageDraw.Draw(img)
+    for x in range(380, 620):
+        shade = int(190 + 60 * (1 - abs(x - 500) / 120))
+        draw.line((x, 180, x, 900), fill=(shade, shade, shade - 25))
+    draw.rectangle((400, 100, 600, 190), fill=(30, 110, 60))
+    draw.rectangle((380, 420, 620, 700), fill=(180, 40, 50))
+    for row in range(8):
+        draw.text((400, 440 + row * 30), "HOLLAND & BARRETT VITAMIN", fill=(255, 255, 255))
+
+    output = BytesIO()
+    img = img.resize((size, size), Image.Resampling.LANCZOS)
+    if image_format == "JPEG":
+        img.convert("RGB").save(output, format="JPEG", quality=90)
+    else:
+        img.save(output, format=image_format)
+    return output.getvalue()
+
+
+def load_samples(input_dir):
+    """读取目录中的图片，未指定时生成模拟产品图"""
+    if input_dir:
+        paths = sorted(path for path in Path(input_dir).iterdir() if path.suffix.lower() in IMAGE_SUFFIXES)
+        return {path.name: path.read_bytes() for path in paths}
+    return {
+        "大尺寸 JPEG 1500x1500": make_sample(1500, "JPEG"),
+        "小尺寸 JPEG 320x320": make_sample(320, "JPEG"),
+        "不透明 PNG 1000x1000": make_sample(1000, "PNG"),
+        "透明 PNG 1000x1000": make_sample(1000, "PNG", transparent=True),
+    }
+
+
+def psnr(reference, candidate):
+    """两张图片的峰值信噪比（dB），完全相同时返回 inf"""
+    with Image.open(BytesIO(reference)) as ref_img, Image.open(BytesIO(candidate)) as cand_img:
+        difference = ImageChops.difference(ref_img.convert("RGB"), cand_img.convert("RGB"))
+    mse = sum(value ** 2 for value in ImageStat.Stat(difference).rms) / 3
+    return math.inf if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+
+
+def benchmark(name, func, image_data, rounds, reference):
+    """运行多轮并输出平均耗时、体积和画质"""
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        output = func(image_data)
+    elapsed = (time.perf_counter() - start_time) / rounds * 1000
+    quality = psnr(reference, output)
+    quality_text = "   无损" if math.isinf(quality) else f"{quality:6.1f}dB"
+    print(f"  {name:<22} {elapsed:8.1f} ms  {len(output) / 1024:8.1f} KB  {quality_text}")
+    return elapsed, len(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="图片处理性能测试")
+    parser.add_argument("--input", help="图片目录（默认使用生成的模拟产品图）")
+    parser.add_argument("--rounds", type=int, default=5, help="运行轮数")
+    parser.add_argument("--quality", type=int, default=90, help="WebP / JPEG 输出质量")
+    args = parser.parse_args()
+
+    samples = load_samples(args.input)
+    if not samples:
+        print(f"✗ 目录中没有图片: {args.input}")
+        return
+
+    print(f"目标尺寸: {TARGET_SIZE[0]}x{TARGET_SIZE[1]}，轮数: {args.rounds}，WebP / JPEG 质量: {args.quality}")
+    totals = {}
+    for sample_name, image_data in samples.items():
+        print(f"\n{sample_name}（{len(image_data) / 1024:.1f} KB）")
+        reference = legacy_render(image_data, TARGET_SIZE)
+        totals.setdefault("原实现", []).append(
+            benchmark("原实现 (PNG)", lambda data: legacy_render(data, TARGET_SIZE), image_data, args.rounds, reference)
+        )
+        for output_format in OUTPUT_FORMATS:
+            totals.setdefault(output_format, []).append(benchmark(
+                f"render_image ({output_format})",
+                lambda data: render_image(data, TARGET_SIZE, output_format, args.quality),
+                image_data, args.rounds, reference
+            ))
+
+    print("\n合计（全部样本）")
+    base_ms = sum(ms for ms, _ in totals["原实现"])
+    base_size = sum(size for _, size in totals["原实现"])
+    for name, results in totals.items():
+        total_ms = sum(ms for ms, _ in results)
+        total_size = sum(size for _, size in results)
+        print(
+            f"  {name:<10} {total_ms:8.1f} ms ({base_ms / total_ms:4.1f}x)  "
+            f"{total_size / 1024:8.1f} KB ({total_size / base_size:6.1%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+__LAYOUT__ 定位与解析性能测试
+
+使用方法:
+    uv run python scripts/benchmark_layout_locator.py [--rounds N]
+
+对 data/samples/ 中的详情页和列表页分别测量:
+1. 正则定位（原实现）与 str.find 定位的耗时
+2. JSON 解码耗时（已安装 orjson 时同时测量标准库 json）
+3. 每页总提取耗时（完整解码 / 只解码所需子树）
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.layout_locator import JSON_DECODER, extract_layout_text, load_layout, load_resolved_data, loads
+
+SAMPLES_DIR = project_root / "data" / "samples"
+# 样本文件及其需要的数据引用前缀
+SAMPLE_FILES = [
+    ("Nature's Bounty® Hair, Skin and Nails with Biotin 60 Gummies | H&B.html", "pdp_product_data"),
+    ("Hair, Skin & Nails _ Beauty Vitamins _ Holland & Barrett.html", "product_list"),
+]
+
+LAYOUT_PATTERN = re.compile(r'<script id="__LAYOUT__"[^>]*>(.*?)</script>', re.DOTALL)
+
+
+def regex_locate(html_content):
+    """原实现：正则匹配整个页面"""
+    match = LAYOUT_PATTERN.search(html_content)
+    return match.group(1) if match else None
+
+
+def time_per_call(func, arg, rounds):
+    """返回单次调用的平均耗时（毫秒）"""
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        func(arg)
+    return (time.perf_counter() - start_time) / rounds * 1000
+
+
+def benchmark_file(path, ref_prefix, rounds):
+    """测量单个样本文件"""
+    html_content = path.read_text(encoding="utf-8")
+    layout_text = extract_layout_text(html_content)
+    assert layout_text == regex_locate(html_content), "定位结果与正则不一致"
+
+    print(f"\n{path.name}")
+    print(f"  页面 {len(html_content) / 1024:.0f} KB, __LAYOUT__ {len(layout_text) / 1024:.0f} KB")
+
+    regex_ms = time_per_call(regex_locate, html_content, rounds)
+    find_ms = time_per_call(extract_layout_text, html_content, rounds)
+    print(f"  定位  正则      {regex_ms:8.3f} ms")
+    print(f"  定位  str.find  {find_ms:8.3f} ms  ({regex_ms / find_ms:.1f}x)")
+
+    decode_ms = time_per_call(loads, layout_text, rounds)
+    print(f"  解码  {JSON_DECODER:<9} {decode_ms:8.3f} ms")
+    if JSON_DECODER != "json":
+        stdlib_ms = time_per_call(json.loads, layout_text, rounds)
+        print(f"  解码  json      {stdlib_ms:8.3f} ms  ({stdlib_ms / decode_ms:.1f}x)")
+
+    total_ms = time_per_call(load_layout, html_content, rounds)
+    print(f"  每页总提取耗时  {total_ms:8.3f} ms")
+
+    targeted_ms = time_per_call(lambda html: load_resolved_data(html, ref_prefix), html_content, rounds)
+    print(f"  定向提取 {ref_prefix} {targeted_ms:8.3f} ms  ({total_ms / targeted_ms:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="__LAYOUT__ 定位与解析性能测试")
+    parser.add_argument("--rounds", type=int, default=50, help="每项测量的轮数")
+    args = parser.parse_args()
+
+    print(f"JSON 解码器: {JSON_DECODER}")
+    print(f"轮数: {args.rounds}")
+    for name, ref_prefix in SAMPLE_FILES:
+        benchmark_file(SAMPLES_DIR / name, ref_prefix, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+列表页解析性能测试
+
+使用方法:
+    uv run python scripts/benchmark_listing_parse.py [HTML文件] [--rounds N]
+
+对比三种提取方式:
+1. __LAYOUT__ JSON 解析（scrape_product_list 默认使用）
+2. 一次性解析产品卡片HTML（JSON 缺失时的备用方案）
+3. 逐个卡片逐个字段查询（模拟原来的 find_element 方式，不含 WebDriver 往返耗时）
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from bs4 import BeautifulSoup
+from utils.listing_extractor import parse_listing_cards_html, parse_listing_page
+
+DEFAULT_SAMPLE = project_root / "data" / "samples" / "Hair, Skin & Nails _ Beauty Vitamins _ Holland & Barrett.html"
+
+# 原来每个卡片需要的 WebDriver 调用次数（href + 品牌 + 名称 + 价格 + 图片）
+CALLS_PER_CARD = 5
+
+
+def per_card_lookup(html_content):
+    """逐个卡片逐个字段查询（每次查询对应原来的一次 WebDriver 调用）"""
+    soup = BeautifulSoup(html_content, "html.parser")
+    products = []
+    for card in soup.select('[data-test="product-card"]'):
+        product = {"url": card.get("href", "")}
+        for field, selector in (
+            ("brand", '[data-test="product-card-brand-name"]'),
+            ("name", '[data-test="product-card-title"]'),
+            ("price", '[data-test="product-card-price"]'),
+        ):
+            element = card.select_one(selector)
+            product[field] = element.get_text(strip=True) if element else ""
+        image = card.select_one('[data-test="product-image"]')
+        product["image"] = image.get("src", "") if image else ""
+        products.append(product)
+    return products
+
+
+def benchmark(name, func, html_content, rounds):
+    """运行多轮并输出平均耗时"""
+    start_time = time.perf_counter()
+    for _ in range(rounds):
+        result = func(html_content)
+    elapsed = (time.perf_counter() - start_time) / rounds
+    count = len(result[0]) if isinstance(result, tuple) else len(result)
+    print(f"  {name:<28} {elapsed * 1000:8.1f} ms/页   ({count} 个产品)")
+    return elapsed, count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="列表页解析性能测试")
+    parser.add_argument("html_file", nargs="?", default=str(DEFAULT_SAMPLE), help="列表页HTML文件")
+    parser.add_argument("--rounds", type=int, default=10, help="每种方式运行的轮数")
+    args = parser.parse_args()
+
+    html_content = Path(args.html_file).read_text(encoding="utf-8")
+    print(f"\n样本: {Path(args.html_file).name} ({len(html_content) / 1024:.0f} KB)")
+    print(f"轮数: {args.rounds}\n")
+
+    json_time, count = benchmark("__LAYOUT__ JSON", parse_listing_page, html_content, args.rounds)
+    html_time, _ = benchmark("一次性解析卡片HTML", parse_listing_cards_html, html_content, args.rounds)
+    card_time, card_count = benchmark("逐卡片逐字段查询", per_card_lookup, html_content, args.rounds)
+
+    print(f"\n  JSON 解析比逐字段查询快 {card_time / json_time:.1f} 倍")
+    print(f"  JSON 解析比一次性解析HTML快 {html_time / json_time:.1f} 倍")
+    print(
+        f"\n  原方式每页需要 {card_count * CALLS_PER_CARD} 次 WebDriver 调用，"
+        f"现在只需 1 次 page_source"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -68,7 +68,8 @@ def test_thread_count(products, thread_count, test_size=10):
         max_products=test_size,
         retry_times=2,  # 测试时减少重试次数
         request_delay=(1, 2),  # 测试时使用较短延迟
-        enable_headless=True
+        enable_headless=True,
+        adaptive=False  # 固定线程数才能比较
     )
 
     elapsed = time.time() - start_time
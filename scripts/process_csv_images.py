@@ -4,13 +4,46 @@ import sys
 import csv
 import os
 from pathlib import Path
+from typing import Dict, List
 
 # 添加项目根目录到路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from utils.image_pipeline import ImagePipeline
 from utils.image_processor import ImageProcessor
+from utils.image_registry import get_image_registry
+from utils.page_cache import get_image_cache
+from utils.product_store import load_urls_from_csv, open_product_store
 from tqdm import tqdm
 
+# 图片处理结果写入产品数据库的批次大小
+STORE_BATCH_SIZE = 20
+
+
+def print_pipeline_config(pipeline: ImagePipeline):
+    """显示图片流水线配置"""
+    resize_text = f"{pipeline.resize_workers} 个进程" if pipeline.resize_workers > 0 else "在上传线程内"
+    print(
+        f"✓ 图片流水线: 下载 {pipeline.download_workers} 线程，缩放 {resize_text}，"
+        f"上传 {pipeline.upload_workers} 线程，队列容量 {pipeline.queue_size}"
+    )
+
+
+def print_pipeline_stats(pipeline: ImagePipeline):
+    """显示图片流水线统计"""
+    stats = pipeline.stats()
+    print(
+        f"\n✓ 下载 {stats['downloaded']} 张，复用上次上传 {stats['reused']} 张，"
+        f"上传 {stats['uploaded']} 张，失败 {stats['failed']} 张"
+    )
+    registry = pipeline.processor.registry
+    if registry is not None:
+        registry_stats = registry.stats()
+        print(
+            f"✓ 上传记录: 按原图URL复用 {registry_stats['source_hits']} 张，按内容复用 "
+            f"{registry_stats['content_hits']} 张，按感知哈希复用 {registry_stats['perceptual_hits']} 张"
+        )
+
 
 def process_csv_images(
     input_csv: str,
@@ -53,35 +86,42 @@ def process_csv_images(
         print(f"✗ 未找到图片列: {image_column}")
         return
 
-    # 初始化图片处理器
-    with ImageProcessor(api_url, token) as processor:
-        success_count = 0
-        skip_count = 0
-        fail_count = 0
-
-        # 使用进度条处理每一行
-        for idx, row in enumerate(tqdm(rows, desc="处理进度"), 1):
-            original_url = row.get(image_column, "").strip()
-            product_name = row.get(name_column, f"product_{idx}")
+    # 同一张原图只处理一次，结果回填到所有引用它的行
+    rows_by_image: Dict[str, List[Dict]] = {}
+    names: Dict[str, str] = {}
+    skip_count = 0
+    for idx, row in enumerate(rows, 1):
+        original_url = row.get(image_column, "").strip()
+        if not original_url:
+            skip_count += 1
+            continue
+        rows_by_image.setdefault(original_url, []).append(row)
+        names.setdefault(original_url, row.get(name_column) or f"product_{idx}")
 
-            # 显示当前处理的产品
-            tqdm.write(f"\n[{idx}/{len(rows)}] {product_name[:50]}")
+    print(f"✓ 需要处理 {len(rows_by_image)} 张图片（{skip_count} 行无图片URL）")
 
-            if not original_url:
-                tqdm.write(f"  → 跳过：无图片URL")
-                skip_count += 1
-                continue
+    success_count = 0
+    fail_count = 0
 
-            # 处理并上传图片
-            new_url = processor.process_and_upload(original_url, product_name)
+    # 初始化图片处理器（上传记录和原图缓存用于复用上次上传结果，中英文CSV、多次运行之间共享）
+    with ImageProcessor(
+        api_url, token, cache=get_image_cache(), registry=get_image_registry()
+    ) as processor:
+        pipeline = ImagePipeline(processor)
+        print_pipeline_config(pipeline)
+        jobs = ((url, url, names[url]) for url in rows_by_image)
 
+        for original_url, new_url in tqdm(pipeline.run(jobs), total=len(rows_by_image), desc="处理进度"):
+            image_rows = rows_by_image[original_url]
             if new_url:
-                row[image_column] = new_url
-                tqdm.write(f"  ✓ 成功: {new_url}")
-                success_count += 1
+                for row in image_rows:
+                    row[image_column] = new_url
+                success_count += len(image_rows)
             else:
-                tqdm.write(f"  ✗ 失败: 保留原URL")
-                fail_count += 1
+                tqdm.write(f"  ✗ 失败: {names[original_url][:50]}，保留原URL")
+                fail_count += len(image_rows)
+
+        print_pipeline_stats(pipeline)
 
     # 保存结果
     with open(output_csv, "w", newline="", encoding="utf-8-sig") as f:
@@ -100,6 +140,59 @@ def process_csv_images(
     print(f"{'=' * 70}\n")
 
 
+def process_store_images(store, urls, api_url: str, token: str):
+    """
+    处理产品数据库中尚未处理（或原图有变化）的图片，只更新这些行
+
+    中英文CSV共用同一张图片，每张图片只处理一次。
+
+    Args:
+        store: ProductStore 实例
+        urls: 本次运行的产品URL
+        api_url: EasyImage API地址
+        token: API token
+    """
+    pending_rows = store.pending_images(urls)
+    print(f"\n✓ 产品数据库：本次 {len(urls)} 个产品，需要处理图片 {len(pending_rows)} 个")
+
+    success_count = 0
+    fail_count = 0
+    results = []
+
+    # 多个产品共用同一张原图时只处理一次
+    rows_by_image: Dict[str, List] = {}
+    for row in pending_rows:
+        rows_by_image.setdefault(row["image"], []).append(row)
+
+    with ImageProcessor(
+        api_url, token, cache=get_image_cache(), registry=get_image_registry()
+    ) as processor:
+        pipeline = ImagePipeline(processor)
+        print_pipeline_config(pipeline)
+        jobs = ((image_url, image_url, image_rows[0]["name"]) for image_url, image_rows in rows_by_image.items())
+
+        for image_url, new_url in tqdm(pipeline.run(jobs), total=len(rows_by_image), desc="处理进度"):
+            image_rows = rows_by_image[image_url]
+            results.extend((row["url"], new_url) for row in image_rows)
+            if new_url:
+                success_count += len(image_rows)
+            else:
+                tqdm.write(f"  ✗ 失败: {image_rows[0]['name'][:50]}，保留原URL")
+                fail_count += len(image_rows)
+
+            if len(results) >= STORE_BATCH_SIZE:
+                store.save_images(results)
+                results = []
+
+        print_pipeline_stats(pipeline)
+
+    if results:
+        store.save_images(results)
+
+    print(f"\n✓ 成功: {success_count}")
+    print(f"✗ 失败: {fail_count}")
+
+
 def image_post_precessor():
     """主函数"""
     # 配置
@@ -128,6 +221,27 @@ def image_post_precessor():
     print(f"目标尺寸: 800x800 (白底居中)")
     print("=" * 70)
 
+    # 产品数据库中已有本次的产品时，每张图片只处理一次，然后导出两个CSV
+    store = open_product_store()
+    if store is not None:
+        try:
+            urls = load_urls_from_csv(files_to_process[0]["input"])
+            if urls and store.count(urls):
+                response = input("是否处理图片？(y/n，默认y): ").strip().lower()
+                if response in ["", "y", "yes"]:
+                    process_store_images(store, urls, API_URL, TOKEN)
+                    views = ["products_complete_processed", "products_complete_zh_processed"]
+                    for view_name, file_info in zip(views, files_to_process):
+                        if file_info["input"].exists():
+                            exported = store.export_csv(view_name, file_info["output"], urls=urls)
+                            print(f"✓ 已导出 {exported} 个产品到: {file_info['output']}")
+                print("\n" + "=" * 70)
+                print("全部完成！")
+                print("=" * 70)
+                return
+        finally:
+            store.close()
+
     for file_info in files_to_process:
         input_file = file_info["input"]
         output_file = file_info["output"]
@@ -0,0 +1,119 @@
+"""测试异步爬取功能"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+
+from utils.async_scraper import AsyncScraper
+from utils.rate_limiter import RateLimiter, host_of
+
+LAYOUT_PAGE = '<html><script id="__LAYOUT__" type="application/json">{}</script></html>'
+
+
+def mock_parse_func(html_content):
+    """模拟解析函数"""
+    return {"description": f"parsed {len(html_content)} chars"}
+
+
+def test_bounded_concurrency(monkeypatch):
+    """测试同时进行中的请求数不超过信号量上限"""
+    # 不写入真实的失败记录文件
+    monkeypatch.setattr("utils.async_scraper.save_failed_items", lambda *args, **kwargs: None)
+    state = {"in_flight": 0, "peak": 0}
+
+    async def handler(request):
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        await asyncio.sleep(0.05)
+        state["in_flight"] -= 1
+        if request.url.path.endswith("/missing"):
+            return httpx.Response(404)
+        return httpx.Response(200, text=LAYOUT_PAGE)
+
+    items = [{"name": f"Product {i}", "url": f"https://example.com/product/{i}"} for i in range(40)]
+    items.append({"name": "Missing", "url": "https://example.com/product/missing"})
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        scraper = AsyncScraper(max_concurrency=8, retry_times=2, per_host_rate=0, client=client)
+        try:
+            return scraper, await scraper.scrape_items(items, mock_parse_func)
+        finally:
+            await client.aclose()
+
+    start_time = time.time()
+    scraper, results = asyncio.run(run())
+    elapsed = time.time() - start_time
+
+    print(f"✓ {len(results)} 个结果，峰值并发 {state['peak']}，耗时 {elapsed:.2f}秒")
+    assert len(results) == len(items)
+    assert state["peak"] <= 8
+    assert sum(1 for r in results if "description" in r) == 40
+    # 404 不重试，直接记为失败
+    assert [f["url"] for f in scraper.failed_items] == ["https://example.com/product/missing"]
+
+
+def test_backoff_releases_slot(monkeypatch):
+    """测试重试前的退避等待不占用并发名额，其他产品照常爬取"""
+    monkeypatch.setattr("utils.async_scraper.save_failed_items", lambda *args, **kwargs: None)
+    attempts = {}
+    finished = {}
+
+    async def handler(request):
+        path = request.url.path
+        attempts[path] = attempts.get(path, 0) + 1
+        await asyncio.sleep(0.02)
+        # flaky 产品第一次返回 503，退避后重试成功
+        if "flaky" in path and attempts[path] == 1:
+            return httpx.Response(503)
+        finished[path] = time.monotonic()
+        return httpx.Response(200, text=LAYOUT_PAGE)
+
+    items = [{"name": f"Flaky {i}", "url": f"https://example.com/product/flaky-{i}"} for i in range(2)]
+    items += [{"name": f"Product {i}", "url": f"https://example.com/product/{i}"} for i in range(6)]
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        scraper = AsyncScraper(max_concurrency=2, retry_times=2, per_host_rate=0, client=client)
+        try:
+            return await scraper.scrape_items(items, mock_parse_func)
+        finally:
+            await client.aclose()
+
+    start_time = time.monotonic()
+    results = asyncio.run(run())
+
+    healthy_elapsed = max(finished[f"/product/{i}"] for i in range(6)) - start_time
+    print(f"✓ 退避期间其他产品 {healthy_elapsed:.2f}秒 内完成")
+    assert all("description" in result for result in results)
+    assert attempts["/product/flaky-0"] == 2
+    # 退避 2 秒期间两个名额都空出来给其他产品
+    assert healthy_elapsed < 1.0
+
+
+def test_host_rate_limiter():
+    """测试单主机限速"""
+    async def run():
+        limiter = RateLimiter(rate=20)
+        start_time = time.monotonic()
+        await asyncio.gather(*[limiter.acquire_async(host_of("https://example.com/a")) for _ in range(5)])
+        # 其他主机不受影响
+        other_start = time.monotonic()
+        await limiter.acquire_async(host_of("https://other.example.com/a"))
+        return time.monotonic() - start_time, time.monotonic() - other_start
+
+    elapsed, other_elapsed = asyncio.run(run())
+    print(f"✓ 同一主机5个请求耗时 {elapsed:.2f}秒")
+    assert elapsed >= 0.19
+    assert other_elapsed < 0.05
+
+
+if __name__ == "__main__":
+    test_host_rate_limiter()
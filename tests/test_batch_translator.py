@@ -0,0 +1,126 @@
+"""测试批量翻译（去重、合并请求、长文本拆分、遗漏条目重试）"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils import batch_translator
+from utils.batch_translator import BatchTranslator, estimate_tokens, split_text
+from utils.rate_limiter import RateLimiter
+
+
+class FakeCompletions:
+    """模拟 chat.completions：按 JSON 编号返回 "译:原文"，skip 中的原文第一次请求时被遗漏"""
+
+    def __init__(self, skip=()):
+        self.skip = set(skip)
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def create(self, model, messages, **kwargs):
+        assert kwargs["response_format"] == {"type": "json_object"}
+        items = json.loads(messages[-1]["content"].split("\n", 1)[1])["items"]
+        with self._lock:
+            self.requests.append([item["text"] for item in items])
+            translations = []
+            for item in items:
+                if item["text"] in self.skip:
+                    self.skip.discard(item["text"])
+                    continue
+                translations.append({"id": item["id"], "text": f"译:{item['text']}"})
+        message = SimpleNamespace(content=json.dumps({"translations": translations}, ensure_ascii=False))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def make_translator(completions, **kwargs):
+    """创建使用模拟客户端、不限速的批量翻译器"""
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    kwargs.setdefault("max_batch_tokens", 1500)
+    kwargs.setdefault("max_batch_items", 40)
+    return BatchTranslator(client, RateLimiter(0), **kwargs)
+
+
+def test_dedupe_and_batch():
+    """测试相同原文只翻译一次，短文本按条数上限合并请求"""
+    completions = FakeCompletions()
+    translator = make_translator(completions, max_batch_items=10)
+    texts = [f"Vitamin {index % 25}" for index in range(100)] + ["", "ab"]
+
+    batches = []
+    results = translator.translate_many(texts, batches.append)
+
+    print(f"✓ {len(texts)} 条文本，{translator.requests} 次请求")
+    assert translator.requests == 3
+    assert sum(len(request) for request in completions.requests) == 25
+    assert results["Vitamin 7"] == "译:Vitamin 7"
+    # 空文本和过短的文本原样返回，不发送请求
+    assert results[""] == "" and results["ab"] == "ab"
+    assert sum(len(batch) for batch in batches) == 27
+
+
+def test_token_budget():
+    """测试每次请求的原文不超过 token 预算"""
+    completions = FakeCompletions()
+    translator = make_translator(completions, max_batch_tokens=200)
+    texts = [f"Take {index} capsules daily with food. " * 6 for index in range(20)]
+
+    results = translator.translate_many(texts)
+
+    assert len(results) == 20
+    assert translator.requests > 1
+    for request in completions.requests:
+        assert sum(estimate_tokens(text) + batch_translator.ITEM_OVERHEAD_TOKENS for text in request) <= 200
+
+
+def test_split_long_text():
+    """测试超长文本按换行和句子拆分，翻译后按原顺序拼接"""
+    paragraphs = [" ".join(f"Sentence {p}-{s} about the product." for s in range(30)) for p in range(3)]
+    text = "\n\n".join(paragraphs)
+
+    chunks = split_text(text, 100)
+    assert len(chunks) > 3
+    assert all(estimate_tokens(chunk) <= 100 for chunk, _ in chunks)
+    assert "".join(chunk + separator for chunk, separator in chunks) == text
+
+    # 没有空白的超长文本按字符数拆分
+    chunks = split_text("维生素" * 300, 100)
+    assert "".join(chunk for chunk, _ in chunks) == "维生素" * 300
+    assert all(estimate_tokens(chunk) <= 100 for chunk, _ in chunks)
+
+    completions = FakeCompletions()
+    translator = make_translator(completions, max_batch_tokens=150)
+    translated = translator.translate_many([text])[text]
+    assert translated.startswith("译:Sentence 0-0")
+    assert translated.count("\n\n") == 2
+    assert translator.requests > 1
+
+
+def test_missing_items_retried(monkeypatch):
+    """测试模型遗漏的条目重新请求，多次失败的原文不出现在结果中"""
+    monkeypatch.setattr(batch_translator.time, "sleep", lambda seconds: None)
+    completions = FakeCompletions(skip=["Biotin"])
+    translator = make_translator(completions)
+
+    results = translator.translate_many(["Biotin", "Vegan", "Zinc"])
+    assert results == {"Biotin": "译:Biotin", "Vegan": "译:Vegan", "Zinc": "译:Zinc"}
+    assert completions.requests[1] == ["Biotin"]
+
+    class BrokenCompletions(FakeCompletions):
+        def create(self, model, messages, **kwargs):
+            raise RuntimeError("API error")
+
+    translator = make_translator(BrokenCompletions(), max_retries=2)
+    assert translator.translate_many(["Biotin"]) == {}
+    assert translator.requests == 2
+
+
+if __name__ == "__main__":
+    test_dedupe_and_batch()
+    test_token_budget()
+    test_split_long_text()
@@ -0,0 +1,145 @@
+"""测试自适应并发控制"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.concurrency_controller import AdaptiveConcurrency, report_status
+from utils.http_fetcher import HttpFetcher
+from utils.parallel_scraper import ParallelScraper
+
+
+def run_requests(controller, count, status=None, fail=False, latency=0.0):
+    """依次模拟若干个请求"""
+    for _ in range(count):
+        with controller.slot() as slot:
+            if latency:
+                time.sleep(latency)
+            if status is not None:
+                report_status(status)
+            if fail:
+                slot.success = False
+
+
+def test_additive_increase():
+    """测试请求正常时每轮并发数加 1，请求间隔缩短"""
+    controller = AdaptiveConcurrency(initial_limit=2, max_limit=4, request_delay=(0.02, 0.02), min_delay=0, window=5)
+    run_requests(controller, 15)
+
+    stats = controller.stats()
+    print(f"✓ 并发 {stats['limit']}，间隔 {stats['delay']}s，调整 {stats['increases']} 次")
+    assert stats["limit"] == 4
+    assert controller.delay < 0.02
+    assert stats["decreases"] == 0
+
+
+def test_throttle_multiplicative_decrease():
+    """测试收到 429 时立即减半，同一轮在途请求不重复降低"""
+    controller = AdaptiveConcurrency(initial_limit=8, request_delay=(0, 0), min_delay=0, max_delay=0, window=50)
+    slots = [controller.slot() for _ in range(3)]
+    for slot in slots:
+        slot.__enter__()
+        report_status(429)
+        slot.__exit__(None, None, None)
+
+    stats = controller.stats()
+    assert stats["limit"] == 4
+    assert stats["throttled"] == 3
+    assert stats["decreases"] == 1
+
+    # 降低之后发出的请求再次被限流，继续降低
+    run_requests(controller, 1, status=429)
+    assert controller.limit == 2
+
+
+def test_error_rate_decrease():
+    """测试错误率过高时降低并发，且不低于下限"""
+    controller = AdaptiveConcurrency(initial_limit=4, min_limit=3, request_delay=(0, 0), max_delay=0, window=4)
+    run_requests(controller, 4, fail=True)
+    assert controller.limit == 3
+    assert controller.decisions[-1]["action"] == "decrease"
+    assert "错误率" in controller.decisions[-1]["reason"]
+
+
+def test_latency_inflation_decrease():
+    """测试延迟中位数明显高于基线时降低并发"""
+    controller = AdaptiveConcurrency(
+        initial_limit=4, max_limit=8, request_delay=(0, 0), max_delay=0, window=3, latency_tolerance=2.0
+    )
+    run_requests(controller, 3, latency=0.1)
+    assert controller.limit == 5
+    run_requests(controller, 3, latency=0.3)
+    assert controller.limit == 2
+    assert "延迟" in controller.decisions[-1]["reason"]
+
+
+def test_fixed_mode_limits_in_flight():
+    """测试固定模式下在途请求数不超过并发数，且不做调整"""
+    controller = AdaptiveConcurrency(initial_limit=2, request_delay=(0, 0), adaptive=False)
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def worker():
+        nonlocal in_flight, peak
+        with controller.slot():
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            time.sleep(0.02)
+            with lock:
+                in_flight -= 1
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
+    assert controller.decisions == []
+    assert controller.stats()["requests"] == 8
+
+
+def test_http_fetcher_reports_status():
+    """测试 HTTP 抓取器把 429 报告给当前槽位"""
+    transport = httpx.MockTransport(lambda request: httpx.Response(429))
+    fetcher = HttpFetcher(client=httpx.Client(transport=transport))
+    controller = AdaptiveConcurrency(initial_limit=4, request_delay=(0, 0), max_delay=0)
+
+    with controller.slot():
+        assert fetcher.fetch("https://www.hollandandbarrett.com/shop/product/x") is None
+
+    assert controller.stats()["throttled"] == 1
+    assert controller.limit == 2
+
+
+def test_parallel_scraper_uses_controller():
+    """测试并行爬取使用自适应控制器，线程数等于并发上限"""
+    controller = AdaptiveConcurrency(initial_limit=1, max_limit=3, request_delay=(0, 0), min_delay=0, window=2)
+    scraper = ParallelScraper(max_workers=1, retry_times=1, fetch_engine="http", concurrency=controller)
+    assert scraper.max_workers == 3
+
+    items = [{"name": f"Product {i}", "url": f"https://example.com/product/{i}"} for i in range(8)]
+    results = scraper.scrape_items_parallel(items, scrape_func=lambda driver, url: {"description": url})
+
+    assert len(results) == 8
+    assert controller.limit == 3
+    assert controller.stats()["requests"] == 8
+
+
+if __name__ == "__main__":
+    test_additive_increase()
+    test_throttle_multiplicative_decrease()
+    test_error_rate_decrease()
+    test_latency_inflation_decrease()
+    test_fixed_mode_limits_in_flight()
+    test_http_fetcher_reports_status()
+    test_parallel_scraper_uses_controller()
@@ -0,0 +1,145 @@
+"""测试详情爬取断点"""
+
+import csv
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.detail_checkpoint import DetailCheckpoint
+from utils.parallel_scraper import ParallelScraper
+from utils.result_sink import CsvSink
+
+FIELDNAMES = ["产品名称", "URL"]
+
+
+def make_product(index):
+    """构造列表页产品数据"""
+    return {"name": f"Product {index}", "url": f"https://example.com/product/{index}"}
+
+
+def build_row(product):
+    """转换为 CSV 行"""
+    return {"产品名称": product["name"], "URL": product["url"]}
+
+
+def read_names(path):
+    """读取 CSV 中的产品名称"""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return [row["产品名称"] for row in csv.DictReader(f)]
+
+
+def write_with_checkpoint(output_csv, checkpoint, products, append=False):
+    """通过写入器写出产品，每批写出后记录断点"""
+    sink = CsvSink(
+        output_csv, FIELDNAMES, row_builder=build_row, append=append, flush_rows=2,
+        on_flush=lambda batch: checkpoint.record([product["url"] for product in batch], sink.offset)
+    )
+    with sink:
+        for product in products:
+            sink.put(product)
+
+
+def test_resume_truncates_partial_batch(tmp_path):
+    """测试恢复时截断写了一半的批次，并跳过已完成的产品"""
+    output_csv = tmp_path / "products_complete.csv"
+    checkpoint_file = tmp_path / "detail_checkpoint.jsonl"
+
+    checkpoint = DetailCheckpoint(checkpoint_file, output_csv)
+    checkpoint.start()
+    write_with_checkpoint(output_csv, checkpoint, [make_product(i) for i in range(4)])
+
+    # 模拟崩溃：一行只写了一半，断点未记录
+    with open(output_csv, "a", encoding="utf-8") as f:
+        f.write("Product 4,https://exa")
+
+    checkpoint = DetailCheckpoint(checkpoint_file, output_csv)
+    assert checkpoint.load() == 4
+    checkpoint.reconcile(output_csv)
+    assert read_names(output_csv) == [f"Product {i}" for i in range(4)]
+
+    products = [make_product(i) for i in range(6)]
+    remaining = checkpoint.pending(products)
+    print(f"✓ 断点恢复: 跳过 {len(checkpoint.completed)} 个，剩余 {len(remaining)} 个")
+    assert [product["name"] for product in remaining] == ["Product 4", "Product 5"]
+
+    write_with_checkpoint(output_csv, checkpoint, remaining, append=True)
+    assert read_names(output_csv) == [f"Product {i}" for i in range(6)]
+
+
+def test_batches_missing_from_output(tmp_path):
+    """测试输出文件比断点记录短时，丢失的批次重新爬取"""
+    output_csv = tmp_path / "products_complete.csv"
+    checkpoint_file = tmp_path / "detail_checkpoint.jsonl"
+
+    checkpoint = DetailCheckpoint(checkpoint_file, output_csv)
+    checkpoint.start()
+    write_with_checkpoint(output_csv, checkpoint, [make_product(i) for i in range(4)])
+    first_batch_offset = checkpoint._batches[0]["offset"]
+
+    # 模拟系统崩溃：第二批未落盘
+    with open(output_csv, "r+b") as f:
+        f.truncate(first_batch_offset + 3)
+
+    checkpoint = DetailCheckpoint(checkpoint_file, output_csv)
+    checkpoint.load()
+    checkpoint.reconcile(output_csv)
+    assert checkpoint.completed == {make_product(0)["url"], make_product(1)["url"]}
+    assert read_names(output_csv) == ["Product 0", "Product 1"]
+
+    # 重写后的断点文件只包含保留的批次
+    reloaded = DetailCheckpoint(checkpoint_file, output_csv)
+    assert reloaded.load() == 2
+
+
+def test_other_target_ignored(tmp_path):
+    """测试输出目标不同时忽略断点"""
+    checkpoint_file = tmp_path / "detail_checkpoint.jsonl"
+    checkpoint = DetailCheckpoint(checkpoint_file, tmp_path / "a.csv")
+    checkpoint.start()
+    checkpoint.record([make_product(1)["url"]])
+
+    assert DetailCheckpoint(checkpoint_file, tmp_path / "a.csv").load() == 1
+    assert DetailCheckpoint(checkpoint_file, tmp_path / "b.csv").load() == 0
+
+    checkpoint.clear()
+    assert not checkpoint_file.exists()
+
+
+def test_scrape_details_skips_completed(tmp_path, monkeypatch):
+    """测试并行爬取跳过断点中已完成的产品"""
+    from utils import parallel_scraper
+
+    checkpoint = DetailCheckpoint(tmp_path / "detail_checkpoint.jsonl", "db")
+    checkpoint.start()
+    checkpoint.record([make_product(i)["url"] for i in range(3)])
+
+    scraped = []
+
+    def scrape(driver, url):
+        scraped.append(url)
+        return {"description": url}
+
+    monkeypatch.setattr(
+        parallel_scraper, "_create_detail_scraper",
+        lambda *args: ParallelScraper(max_workers=2, retry_times=1, request_delay=(0, 0), fetch_engine="http")
+    )
+    results = parallel_scraper.scrape_details_parallel(
+        [make_product(i) for i in range(5)], scrape, checkpoint=checkpoint
+    )
+    assert sorted(scraped) == [make_product(3)["url"], make_product(4)["url"]]
+    assert len(results) == 2
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    for test in (
+        test_resume_truncates_partial_batch,
+        test_batches_missing_from_output,
+        test_other_target_ignored,
+    ):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test(Path(temp_dir))
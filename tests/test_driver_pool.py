@@ -0,0 +1,98 @@
+"""测试 WebDriver 池"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.driver_pool import DriverPool
+
+
+class FakeDriver:
+    """模拟的 WebDriver（不启动真实浏览器）"""
+
+    def __init__(self):
+        self.alive = True
+        self.quit_called = False
+
+    def execute_script(self, script):
+        if not self.alive:
+            raise RuntimeError("browser crashed")
+        return 1
+
+    def quit(self):
+        self.quit_called = True
+
+
+def test_reuse_and_recycle():
+    """测试浏览器复用和按页数回收"""
+    created = []
+
+    def create_driver():
+        driver = FakeDriver()
+        created.append(driver)
+        return driver
+
+    pool = DriverPool(create_driver=create_driver, size=2, max_pages=3)
+    with pool:
+        for _ in range(6):
+            with pool.driver() as driver:
+                assert isinstance(driver, FakeDriver)
+
+    print(f"✓ 6 个页面共启动 {len(created)} 个浏览器")
+    # 每个浏览器处理 3 个页面后回收
+    assert len(created) == 2
+    assert pool.stats()["recycled"] == 2
+    assert all(driver.quit_called for driver in created)
+
+
+def test_unhealthy_driver_replaced():
+    """测试失效的浏览器在借出时被替换"""
+    created = []
+
+    def create_driver():
+        driver = FakeDriver()
+        created.append(driver)
+        return driver
+
+    with DriverPool(create_driver=create_driver, size=1, max_pages=0) as pool:
+        driver = pool.acquire()
+        pool.release(driver)
+        driver.alive = False
+
+        replacement = pool.acquire()
+        assert replacement is not driver
+        assert driver.quit_called
+        pool.release(replacement)
+
+
+def test_pool_size_bound():
+    """测试并发借用时浏览器数量不超过池大小"""
+    created = []
+
+    def create_driver():
+        driver = FakeDriver()
+        created.append(driver)
+        return driver
+
+    pool = DriverPool(create_driver=create_driver, size=3, max_pages=0)
+
+    def work(_):
+        with pool.driver():
+            assert pool.stats()["alive"] <= 3
+
+    with pool, ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(work, range(50)))
+
+    print(f"✓ 50 个并发任务共启动 {len(created)} 个浏览器")
+    assert len(created) <= 3
+    assert pool.stats()["alive"] == 0
+
+
+if __name__ == "__main__":
+    test_reuse_and_recycle()
+    test_unhealthy_driver_replaced()
+    test_pool_size_bound()
@@ -0,0 +1,91 @@
+"""测试 HTML 转纯文本与 BeautifulSoup.get_text 结果一致"""
+
+import sys
+import warnings
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+from bs4 import BeautifulSoup, MarkupResemblesLocatorWarning
+
+from utils.html_text import html_to_text
+from utils.layout_locator import load_layout
+
+SAMPLES_DIR = project_root / "data" / "samples"
+
+# 解析器边界情况
+EDGE_CASES = [
+    "",
+    "plain text  ",
+    "  \n ",
+    "<p>  </p>",
+    "<p>Hello <b>world</b></p><ul><li>one</li><li>two</li></ul>",
+    "x<br>y<br/>z",
+    "<p>a<b>b</p>c</b>d",
+    "a<script>x</script>b<style>y</style>c<!--comment-->d<template>t<p>u</p></template>e",
+    "<![CDATA[data]]>after",
+    "<!DOCTYPE html>w<?pi x?>v",
+    "&amp;&lt;b&gt;&nbsp;x &copy",
+    "a &unknown; b &amp c",
+    "&#65;&#x42;&#67x &#x44zz &#; &#xZ; &#150; &#0;",
+    "<textarea>a<b>c</textarea>",
+]
+
+
+def build_corpus():
+    """从样本页面的 __LAYOUT__ 中收集所有包含 HTML 的字符串，加上完整页面和边界情况"""
+    corpus = list(EDGE_CASES)
+
+    def collect(value):
+        if isinstance(value, dict):
+            for item in value.values():
+                collect(item)
+        elif isinstance(value, list):
+            for item in value:
+                collect(item)
+        elif isinstance(value, str) and ("<" in value or "&" in value):
+            corpus.append(value)
+
+    for path in sorted(SAMPLES_DIR.glob("*.html")):
+        html_content = path.read_text(encoding="utf-8")
+        collect(load_layout(html_content))
+        corpus.append(html_content)
+    return corpus
+
+
+def bs4_text(html_text, separator):
+    """BeautifulSoup 参考实现"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", MarkupResemblesLocatorWarning)
+        return BeautifulSoup(html_text, "html.parser").get_text(strip=True, separator=separator)
+
+
+@pytest.mark.parametrize("separator", [" ", ""])
+def test_matches_beautifulsoup(separator):
+    """测试在样本语料上与 BeautifulSoup 输出完全一致"""
+    corpus = build_corpus()
+    mismatches = [text[:80] for text in corpus if html_to_text(text, separator) != bs4_text(text, separator)]
+
+    print(f"✓ 语料 {len(corpus)} 条，不一致 {len(mismatches)} 条")
+    assert len(corpus) > 100
+    assert mismatches == []
+
+
+def test_clean_html_callers():
+    """测试 main 和 extract_product 中的 clean_html"""
+    import main
+    from utils import extract_product
+
+    fragment = "<p>Take <b>one</b> daily.</p>"
+    assert main.clean_html(fragment) == "Take one daily."
+    assert extract_product.clean_html(fragment) == "Takeonedaily."
+    assert main.clean_html(None) == ""
+
+
+if __name__ == "__main__":
+    test_matches_beautifulsoup(" ")
+    test_matches_beautifulsoup("")
+    test_clean_html_callers()
@@ -0,0 +1,61 @@
+"""测试 HTTP 抓取后端"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+
+from utils.http_fetcher import HttpFetcher
+from main import parse_product_detail
+
+DETAIL_SAMPLE = project_root / "data" / "samples" / "Nature's Bounty® Hair, Skin and Nails with Biotin 60 Gummies | H&B.html"
+
+
+def make_fetcher(handler):
+    """创建使用 MockTransport 的抓取器"""
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    return HttpFetcher(user_agent="test-agent", client=client)
+
+
+def test_fetch_detail_page():
+    """测试直接获取详情页并解析"""
+    html_content = DETAIL_SAMPLE.read_text(encoding="utf-8")
+    seen_headers = {}
+
+    def handler(request):
+        seen_headers.update(request.headers)
+        return httpx.Response(200, text=html_content)
+
+    with make_fetcher(handler) as fetcher:
+        page = fetcher.fetch_layout_page("https://www.hollandandbarrett.com/shop/product/test")
+
+    assert page is not None
+    assert seen_headers["user-agent"] == "test-agent"
+
+    details = parse_product_detail(page)
+    print(f"✓ 解析到字段: {', '.join(details.keys())}")
+    assert details["highlights"]
+    assert details["description"]
+    assert details["nutritional_info"]
+
+
+def test_fetch_without_layout():
+    """测试响应中没有 __LAYOUT__ 时返回 None（由调用方回退到 Selenium）"""
+    with make_fetcher(lambda request: httpx.Response(200, text="<html>captcha</html>")) as fetcher:
+        assert fetcher.fetch_layout_page("https://example.com/") is None
+
+
+def test_fetch_error_status():
+    """测试非 200 状态码返回 None"""
+    with make_fetcher(lambda request: httpx.Response(403)) as fetcher:
+        assert fetcher.fetch("https://example.com/") is None
+
+
+if __name__ == "__main__":
+    test_fetch_detail_page()
+    test_fetch_without_layout()
+    test_fetch_error_status()
@@ -0,0 +1,155 @@
+"""测试并发图片处理流水线"""
+
+import csv
+import sys
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+
+import httpx
+from PIL import Image
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.image_pipeline import ImagePipeline
+from utils.image_processor import ImageProcessor
+from utils.rate_limiter import RateLimiter
+
+API_URL = "https://img.example.com/api"
+
+
+def make_image_bytes(color=(200, 30, 30), size=(250, 250)):
+    """生成 PNG 图片数据"""
+    buffer = BytesIO()
+    Image.new("RGB", size, color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class MockImageServer:
+    """模拟原图服务器和图床，记录下载、上传次数和最大并发下载数"""
+
+    def __init__(self, latency=0.0, fail_urls=()):
+        self.latency = latency
+        self.fail_urls = set(fail_urls)
+        self.image_bytes = make_image_bytes()
+        self.downloads = 0
+        self.uploads = []
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def handler(self, request):
+        if request.method == "POST":
+            with self._lock:
+                self.uploads.append(request)
+                index = len(self.uploads)
+            return httpx.Response(200, json={"result": "success", "url": f"https://img.example.com/{index}.png"})
+
+        with self._lock:
+            self.downloads += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+
+        if str(request.url) in self.fail_urls:
+            return httpx.Response(404)
+        return httpx.Response(200, content=self.image_bytes)
+
+    def processor(self):
+        processor = ImageProcessor(API_URL, "token", rate_limiter=RateLimiter(0))
+        processor.client = httpx.Client(transport=httpx.MockTransport(self.handler))
+        return processor
+
+
+def image_url(index):
+    """构造原图URL"""
+    return f"https://images.example.com/{index}.png"
+
+
+def test_pipeline_concurrent_downloads():
+    """测试下载并发进行，每张图片都有结果，失败的图片返回 None"""
+    server = MockImageServer(latency=0.05, fail_urls={image_url(3)})
+    with server.processor() as processor:
+        pipeline = ImagePipeline(processor, download_workers=4, resize_workers=0, upload_workers=2, queue_size=4)
+        start_time = time.monotonic()
+        results = dict(pipeline.run((i, image_url(i), f"Product {i}") for i in range(12)))
+        elapsed = time.monotonic() - start_time
+
+    print(f"✓ 12 张图片耗时 {elapsed:.2f}秒，最大并发下载 {server.peak}")
+    assert sorted(results) == list(range(12))
+    assert results[3] is None
+    assert all(results[i] for i in range(12) if i != 3)
+    assert server.peak > 1
+    assert elapsed < 12 * 0.05
+    assert pipeline.stats()["uploaded"] == 11
+    assert pipeline.stats()["failed"] == 1
+
+
+def test_pipeline_process_pool_resize():
+    """测试缩放在进程池中进行，上传的是目标尺寸的图片"""
+    server = MockImageServer()
+    with server.processor() as processor:
+        pipeline = ImagePipeline(processor, download_workers=2, resize_workers=2, upload_workers=2)
+        results = list(pipeline.run((i, image_url(i), "") for i in range(4)))
+
+    assert len(results) == 4
+    assert pipeline.stats()["resized"] == 4
+    content = server.uploads[0].read()
+    start = content.index(b"\x89PNG")
+    uploaded = Image.open(BytesIO(content[start:]))
+    assert uploaded.size == (800, 400)
+
+
+def test_pipeline_early_close():
+    """测试提前停止读取结果时流水线能及时退出"""
+    server = MockImageServer(latency=0.01)
+    with server.processor() as processor:
+        pipeline = ImagePipeline(processor, download_workers=2, resize_workers=0, upload_workers=1, queue_size=2)
+        results = pipeline.run((i, image_url(i), "") for i in range(1000))
+        first = next(results)
+        results.close()
+
+    assert first[1] is not None
+    assert server.downloads < 100
+    assert not [thread for thread in threading.enumerate() if thread.name.startswith("image-")]
+
+
+def test_process_csv_images_dedupes(tmp_path, monkeypatch):
+    """测试 CSV 中重复的原图只处理一次，结果回填到所有行"""
+    from scripts import process_csv_images as module
+
+    server = MockImageServer()
+    monkeypatch.setattr(module, "get_image_cache", lambda: None)
+    monkeypatch.setattr(module, "get_image_registry", lambda: None)
+    monkeypatch.setattr(module, "ImageProcessor", lambda *args, **kwargs: server.processor())
+
+    input_csv = tmp_path / "products.csv"
+    output_csv = tmp_path / "products_processed.csv"
+    with open(input_csv, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=["产品名称", "产品图"])
+        writer.writeheader()
+        writer.writerow({"产品名称": "A", "产品图": image_url(1)})
+        writer.writerow({"产品名称": "B", "产品图": image_url(1)})
+        writer.writerow({"产品名称": "C", "产品图": image_url(2)})
+        writer.writerow({"产品名称": "D", "产品图": ""})
+
+    module.process_csv_images(str(input_csv), str(output_csv), API_URL, "token")
+
+    with open(output_csv, "r", encoding="utf-8-sig") as f:
+        images = [row["产品图"] for row in csv.DictReader(f)]
+    assert server.downloads == 2
+    assert len(server.uploads) == 2
+    assert images[0] == images[1] != images[2]
+    assert images[0].startswith("https://img.example.com/")
+    assert images[3] == ""
+
+
+if __name__ == "__main__":
+    test_pipeline_concurrent_downloads()
+    test_pipeline_process_pool_resize()
+    test_pipeline_early_close()
@@ -0,0 +1,285 @@
+"""测试图床上传记录（跨CSV、跨运行复用上传结果）"""
+
+import csv
+import random
+import sys
+import threading
+from io import BytesIO
+from pathlib import Path
+
+import httpx
+from PIL import Image, ImageDraw
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.image_processor import ImageProcessor
+from utils.image_registry import ImageRegistry, content_hash, perceptual_hash
+from utils.rate_limiter import RateLimiter
+
+API_URL = "https://img.example.com/api"
+
+
+class MockImageServer:
+    """模拟原图服务器和图床，distinct=False 时所有原图URL返回相同的图片，否则按URL返回不同产品的包装图"""
+
+    def __init__(self, distinct=False):
+        self.distinct = distinct
+        self.image_bytes = self.make_image(0)
+        self.downloads = 0
+        self.uploads = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_image(index):
+        """生成 PNG 图片数据（index 不同时颜色不同）"""
+        buffer = BytesIO()
+        Image.new("RGB", (120, 240), (30, 120, index % 256)).save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def handler(self, request):
+        with self._lock:
+            if request.method == "POST":
+                self.uploads += 1
+                return httpx.Response(
+                    200, json={"result": "success", "url": f"https://img.example.com/{self.uploads}.png"}
+                )
+            self.downloads += 1
+        if self.distinct:
+            return httpx.Response(200, content=make_packshot(250, sum(str(request.url).encode())))
+        return httpx.Response(200, content=self.image_bytes)
+
+    def processor(self, registry):
+        processor = ImageProcessor(API_URL, "token", rate_limiter=RateLimiter(0), registry=registry)
+        processor.client = httpx.Client(transport=httpx.MockTransport(self.handler))
+        return processor
+
+
+def make_packshot(size, seed, label_seed=None, label_color=(40, 60, 90)):
+    """
+    生成模拟的产品包装图（白底圆柱形瓶身和标签文字），seed 相同时为同一产品
+
+    label_seed / label_color 只改变标签文字 / 颜色，瓶身和标签位置不变（同系列的不同产品）
+    """
+    rnd = random.Random(seed)
+    text_rnd = random.Random(seed if label_seed is None else label_seed)
+    img = Image.new("RGB", (600, 600), "white")
+    draw = ImageDraw.Draw(img)
+    width = rnd.randint(140, 220)
+    for x in range(300 - width // 2, 300 + width // 2):
+        shade = int(200 + 50 * (1 - abs(x - 300) / (width / 2)))
+        draw.line((x, 90, x, 540), fill=(shade, shade, shade - 20))
+    draw.rectangle((300 - width // 2 + 10, 50, 300 + width // 2 - 10, 95), fill=(rnd.randint(0, 200), 80, 40))
+    label_top = rnd.randint(130, 330)
+    draw.rectangle((300 - width // 2, label_top, 300 + width // 2, label_top + rnd.randint(60, 180)), fill=label_color)
+    for row in range(12):
+        text = "".join(text_rnd.choice("ABCDEFGH ") for _ in range(12))
+        draw.text((300 - width // 2 + 15, 140 + row * 30), text, fill=(250, 250, 250))
+
+    buffer = BytesIO()
+    img.resize((size, size), Image.Resampling.LANCZOS).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+# 文件名 → 包装图参数（090001_A / 090002_A 与 084867_A 瓶身相同，只有标签文字 / 颜色不同）
+PACKSHOTS = {
+    "084867_A": {"seed": 1},
+    "084868_A": {"seed": 2},
+    "090001_A": {"seed": 1, "label_seed": 7},
+    "090002_A": {"seed": 1, "label_color": (150, 30, 30)},
+}
+
+
+class PackshotServer(MockImageServer):
+    """按URL返回不同尺寸 / 不同产品的包装图：/HB/<尺寸>/<文件名>.png"""
+
+    def handler(self, request):
+        if request.method == "POST":
+            return super().handler(request)
+        with self._lock:
+            self.downloads += 1
+        _, size, name = request.url.path.strip("/").removesuffix(".png").split("/")
+        return httpx.Response(200, content=make_packshot(int(size), **PACKSHOTS[name]))
+
+
+def test_source_url_reused_across_runs(tmp_path):
+    """测试原图URL已上传过时不再下载，重新打开数据库后仍然有效"""
+    server = MockImageServer()
+    image_url = "https://images.example.com/a.png"
+
+    registry = ImageRegistry(tmp_path / "image_registry.db")
+    with server.processor(registry) as processor:
+        first = processor.process_and_upload(image_url, "A")
+    registry.close()
+
+    registry = ImageRegistry(tmp_path / "image_registry.db")
+    with server.processor(registry) as processor:
+        second = processor.process_and_upload(image_url, "A")
+
+    print(f"✓ 下载 {server.downloads} 次，上传 {server.uploads} 次，统计: {registry.stats()}")
+    assert first == second == "https://img.example.com/1.png"
+    assert server.downloads == 1
+    assert server.uploads == 1
+    assert registry.stats()["source_hits"] == 1
+
+
+def test_content_hash_shared_between_urls(tmp_path):
+    """测试不同URL指向相同图片时只上传一次"""
+    server = MockImageServer()
+    registry = ImageRegistry(tmp_path / "image_registry.db")
+
+    with server.processor(registry) as processor:
+        first = processor.process_and_upload("https://images.example.com/a.png", "A")
+        second = processor.process_and_upload("https://images.example.com/b.png", "B")
+
+    assert first == second
+    assert server.downloads == 2
+    assert server.uploads == 1
+    assert registry.lookup_content(content_hash(server.image_bytes), "800x400") == first
+    # 第二个URL也记录了下来，下次不再下载
+    assert registry.lookup_source("https://images.example.com/b.png", "800x400") == first
+
+
+def test_expired_source_falls_back_to_content(tmp_path):
+    """测试原图URL记录过期后重新下载，内容未变化时不再上传；尺寸不同时重新处理"""
+    server = MockImageServer()
+    image_url = "https://images.example.com/a.png"
+    registry = ImageRegistry(tmp_path / "image_registry.db", ttl=0)
+
+    with server.processor(registry) as processor:
+        first = processor.process_and_upload(image_url, "A")
+        second = processor.process_and_upload(image_url, "A")
+        processor.target_size = (400, 400)
+        third = processor.process_and_upload(image_url, "A")
+
+    assert first == second
+    assert third != first
+    assert server.downloads == 3
+    assert server.uploads == 2
+
+
+def test_zh_csv_reuses_en_uploads(tmp_path, monkeypatch):
+    """测试处理中文CSV时复用英文CSV的上传结果，不再下载和上传"""
+    from scripts import process_csv_images as module
+
+    server = MockImageServer(distinct=True)
+    registry = ImageRegistry(tmp_path / "image_registry.db")
+    monkeypatch.setattr(module, "get_image_cache", lambda: None)
+    monkeypatch.setattr(module, "get_image_registry", lambda: registry)
+    monkeypatch.setattr(module, "ImageProcessor", lambda *args, **kwargs: server.processor(kwargs["registry"]))
+
+    outputs = []
+    for suffix, names in (("", ["A", "B"]), ("_zh", ["甲", "乙"])):
+        input_csv = tmp_path / f"products_complete{suffix}.csv"
+        output_csv = tmp_path / f"products_complete{suffix}_processed.csv"
+        with open(input_csv, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.DictWriter(f, fieldnames=["产品名称", "产品图"])
+            writer.writeheader()
+            for index, name in enumerate(names):
+                writer.writerow({"产品名称": name, "产品图": f"https://images.example.com/{index}.png"})
+
+        module.process_csv_images(str(input_csv), str(output_csv), API_URL, "token")
+        with open(output_csv, "r", encoding="utf-8-sig") as f:
+            outputs.append([row["产品图"] for row in csv.DictReader(f)])
+
+    assert outputs[0] == outputs[1]
+    assert server.downloads == 2
+    assert server.uploads == 2
+
+
+def test_perceptual_hash_variants():
+    """测试同一产品图的不同分辨率处理后感知哈希几乎相同，不同产品差别明显"""
+    processor = ImageProcessor(API_URL, "token", rate_limiter=RateLimiter(0))
+    small = perceptual_hash(processor.process_image(make_packshot(250, 1)))
+    large = perceptual_hash(processor.process_image(make_packshot(320, 1)))
+    other = perceptual_hash(processor.process_image(make_packshot(250, 2)))
+    processor.close()
+
+    print(f"✓ 同一产品距离 {(small ^ large).bit_count()}，不同产品距离 {(small ^ other).bit_count()}")
+    assert (small ^ large).bit_count() <= 4
+    assert (small ^ other).bit_count() > 4
+
+
+def test_perceptual_dedupe_skips_upload(tmp_path):
+    """测试 /HB/250/ 和 /HB/320/ 这类尺寸变体只上传一次，不同产品照常上传"""
+    server = PackshotServer()
+    registry = ImageRegistry(tmp_path / "image_registry.db")
+
+    with server.processor(registry) as processor:
+        first = processor.process_and_upload("https://images.example.com/HB/250/084867_A.png", "A")
+        variant = processor.process_and_upload("https://images.example.com/HB/320/084867_A.png", "A")
+        other = processor.process_and_upload("https://images.example.com/HB/250/084868_A.png", "B")
+
+    assert first == variant != other
+    assert server.uploads == 2
+    assert registry.stats()["perceptual_hits"] == 1
+    # 变体的原图URL也记录了下来，下次不再下载
+    assert registry.lookup_source("https://images.example.com/HB/320/084867_A.png", "800x400") == first
+
+    # 重新打开后从数据库加载感知哈希
+    registry.close()
+    registry = ImageRegistry(tmp_path / "image_registry.db")
+    with server.processor(registry) as processor:
+        assert processor.process_and_upload("https://images.example.com/HB/300/084867_A.png", "A") == first
+    assert server.uploads == 2
+
+
+def test_perceptual_dedupe_disabled(tmp_path):
+    """测试阈值为 -1 时不按感知哈希去重；纯色图片缺少细节，不参与感知哈希去重"""
+    server = PackshotServer()
+    registry = ImageRegistry(tmp_path / "image_registry.db", phash_distance=-1)
+
+    with server.processor(registry) as processor:
+        first = processor.process_and_upload("https://images.example.com/HB/250/084867_A.png", "A")
+        variant = processor.process_and_upload("https://images.example.com/HB/320/084867_A.png", "A")
+
+    assert first != variant
+    assert server.uploads == 2
+    assert registry.stats()["perceptuals"] == 0
+
+    registry = ImageRegistry(tmp_path / "image_registry_flat.db")
+    solid = [MockImageServer.make_image(index) for index in (0, 255)]
+    flat_hashes = [perceptual_hash(processor.process_image(data)) for data in solid]
+    solid_url = "https://images.example.com/solid.png"
+    assert registry.lookup_similar(flat_hashes[0], "800x400", solid_url) is None
+    registry.record(solid_url, "800x400", "https://img.example.com/x.png", phash=flat_hashes[0])
+    assert registry.lookup_similar(flat_hashes[1], "800x400", solid_url) is None
+
+
+def test_same_bottle_different_label_not_reused(tmp_path):
+    """测试瓶身相同、只有标签文字或颜色不同的产品感知哈希几乎相同，但文件名不同，不复用上传结果"""
+    processor = ImageProcessor(API_URL, "token", rate_limiter=RateLimiter(0))
+    base = perceptual_hash(processor.process_image(make_packshot(250, **PACKSHOTS["084867_A"])))
+    for name in ("090001_A", "090002_A"):
+        label_hash = perceptual_hash(processor.process_image(make_packshot(250, **PACKSHOTS[name])))
+        assert (base ^ label_hash).bit_count() <= 4
+    processor.close()
+
+    server = PackshotServer()
+    registry = ImageRegistry(tmp_path / "image_registry.db")
+    with server.processor(registry) as processor:
+        urls = [
+            processor.process_and_upload(f"https://images.example.com/HB/250/{name}.png", name)
+            for name in ("084867_A", "090001_A", "090002_A")
+        ]
+
+    assert len(set(urls)) == 3
+    assert server.uploads == 3
+    assert registry.stats()["perceptual_hits"] == 0
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    test_perceptual_hash_variants()
+    for test in (
+        test_source_url_reused_across_runs,
+        test_content_hash_shared_between_urls,
+        test_expired_source_falls_back_to_content,
+        test_perceptual_dedupe_skips_upload,
+        test_perceptual_dedupe_disabled,
+        test_same_bottle_different_label_not_reused,
+    ):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test(Path(temp_dir))
@@ -0,0 +1,158 @@
+"""测试图片缩放和输出格式"""
+
+import sys
+from io import BytesIO
+from pathlib import Path
+
+import httpx
+from PIL import Image
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from scripts.benchmark_images import legacy_render, make_sample, psnr
+from utils.image_processor import ImageProcessor, render_image
+from utils.image_registry import ImageRegistry
+from utils.page_cache import PageCache
+from utils.rate_limiter import RateLimiter
+
+TARGET_SIZE = (800, 400)
+
+
+def open_image(data):
+    """解码图片"""
+    img = Image.open(BytesIO(data))
+    img.load()
+    return img
+
+
+def test_large_jpeg_draft():
+    """测试大尺寸 JPEG 缩小后尺寸正确，与原实现画质接近"""
+    source = make_sample(1500, "JPEG")
+    output = render_image(source, TARGET_SIZE)
+
+    img = open_image(output)
+    assert img.format == "PNG"
+    assert img.size == TARGET_SIZE
+    # 左右两侧为白色背景，中间为产品
+    assert img.getpixel((10, 200)) == (255, 255, 255)
+    assert img.getpixel((400, 250)) != (255, 255, 255)
+
+    quality = psnr(legacy_render(source, TARGET_SIZE), output)
+    print(f"✓ 相对原实现 PSNR: {quality:.1f}dB")
+    assert quality > 40
+
+
+def test_opaque_png_matches_legacy():
+    """测试不透明图片跳过 RGBA 转换后输出与原实现一致"""
+    source = make_sample(320, "PNG")
+    assert psnr(legacy_render(source, TARGET_SIZE), render_image(source, TARGET_SIZE)) > 50
+
+
+def test_transparent_png_on_white():
+    """测试透明图片的透明区域粘贴为白色背景"""
+    img = Image.new("RGBA", (200, 400), (0, 0, 0, 0))
+    img.paste((200, 30, 30, 255), (50, 50, 150, 350))
+    buffer = BytesIO()
+    img.save(buffer, format="PNG")
+
+    output = open_image(render_image(buffer.getvalue(), TARGET_SIZE))
+    assert output.getpixel((310, 20)) == (255, 255, 255)
+    assert output.getpixel((400, 200)) == (200, 30, 30)
+
+
+def test_output_formats():
+    """测试 WebP / JPEG 输出格式，体积小于 PNG"""
+    source = make_sample(1000, "PNG")
+    sizes = {}
+    for output_format, pil_format in (("png", "PNG"), ("webp", "WEBP"), ("jpeg", "JPEG")):
+        output = render_image(source, TARGET_SIZE, output_format, 85)
+        img = open_image(output)
+        assert img.format == pil_format
+        assert img.size == TARGET_SIZE
+        sizes[output_format] = len(output)
+
+    print(f"✓ 输出体积: {sizes}")
+    assert sizes["webp"] < sizes["png"]
+
+
+def test_upload_uses_output_format():
+    """测试上传时文件名后缀和 MIME 类型与输出格式一致，不支持的格式报错"""
+    uploads = []
+
+    def handler(request):
+        if request.method == "POST":
+            uploads.append(request.read())
+            return httpx.Response(200, json={"result": "success", "url": "https://img.example.com/1.webp"})
+        return httpx.Response(200, content=make_sample(320, "JPEG"))
+
+    with ImageProcessor(
+        "https://img.example.com/api", "token", rate_limiter=RateLimiter(0), output_format="webp"
+    ) as processor:
+        processor.client = httpx.Client(transport=httpx.MockTransport(handler))
+        assert processor.process_and_upload("https://images.example.com/a.jpg", "Test Product")
+
+    assert b'filename="Test_Product.webp"' in uploads[0]
+    assert b"Content-Type: image/webp" in uploads[0]
+
+    try:
+        ImageProcessor("https://img.example.com/api", "token", output_format="gif")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("不支持的输出格式应报错")
+
+
+def test_format_switch_rerenders(tmp_path):
+    """测试切换输出格式或质量后不复用之前的上传结果（上传记录和原图缓存），重新处理并上传"""
+    image_url = "https://images.example.com/a.jpg"
+
+    for registry in (ImageRegistry(tmp_path / "image_registry.db"), None):
+        uploads = []
+        cache = PageCache(tmp_path / f"images_{registry is None}", suffix=".bin.gz")
+
+        def handler(request):
+            if request.method == "POST":
+                uploads.append(request.read())
+                return httpx.Response(200, json={"result": "success", "url": f"https://img.example.com/{len(uploads)}"})
+            return httpx.Response(200, content=make_sample(320, "JPEG"))
+
+        def upload(output_format, quality=90):
+            with ImageProcessor(
+                "https://img.example.com/api", "token", cache=cache, rate_limiter=RateLimiter(0),
+                registry=registry, output_format=output_format, quality=quality
+            ) as processor:
+                processor.client = httpx.Client(transport=httpx.MockTransport(handler))
+                return processor.size_key, processor.process_and_upload(image_url, "A")
+
+        # PNG 的标识与之前只按尺寸记录的结果兼容
+        assert upload("png") == ("800x400", "https://img.example.com/1")
+        assert upload("webp") == ("800x400.webp.q90", "https://img.example.com/2")
+        assert upload("webp", 75) == ("800x400.webp.q75", "https://img.example.com/3")
+        assert b"Content-Type: image/png" in uploads[0]
+        assert b"Content-Type: image/webp" in uploads[1]
+
+        if registry is not None:
+            # 上传记录按输出规格分别保存，切换回来时复用各自的上传结果
+            assert upload("png")[1] == "https://img.example.com/1"
+            assert upload("webp")[1] == "https://img.example.com/2"
+            registry.close()
+        else:
+            # 原图缓存只保存最近一次的上传结果，规格不同时重新处理
+            assert upload("png")[1] == "https://img.example.com/4"
+            assert upload("png")[1] == "https://img.example.com/4"
+            assert len(uploads) == 4
+
+
+if __name__ == "__main__":
+    test_large_jpeg_draft()
+    test_opaque_png_matches_legacy()
+    test_transparent_png_on_white()
+    test_output_formats()
+    test_upload_uses_output_format()
+
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        test_format_switch_rerenders(Path(temp_dir))
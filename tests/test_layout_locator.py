@@ -0,0 +1,100 @@
+"""测试 __LAYOUT__ 定位"""
+
+import re
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import pytest
+
+from utils.layout_locator import (
+    extract_layout_text,
+    find_layout_span,
+    find_ref_uuid,
+    load_layout,
+    load_resolved_data,
+)
+
+SAMPLES_DIR = project_root / "data" / "samples"
+DETAIL_SAMPLE = SAMPLES_DIR / "Nature's Bounty® Hair, Skin and Nails with Biotin 60 Gummies | H&B.html"
+LAYOUT_PATTERN = re.compile(r'<script id="__LAYOUT__"[^>]*>(.*?)</script>', re.DOTALL)
+
+
+@pytest.mark.parametrize("sample", sorted(SAMPLES_DIR.glob("*.html")), ids=lambda path: path.name[:20])
+def test_matches_regex_on_samples(sample):
+    """测试定位结果与原正则实现一致"""
+    html_content = sample.read_text(encoding="utf-8")
+    layout_text = extract_layout_text(html_content)
+
+    assert layout_text == LAYOUT_PATTERN.search(html_content).group(1)
+    assert "widgets" in load_layout(html_content)
+
+
+def test_bytes_input():
+    """测试 bytes 输入"""
+    html_content = b'<html><script type="application/json" id="__LAYOUT__">{"a": 1}</script></html>'
+    assert extract_layout_text(html_content) == b'{"a": 1}'
+    assert load_layout(html_content) == {"a": 1}
+
+
+def test_missing_or_invalid_layout():
+    """测试缺少 __LAYOUT__ 或 JSON 无效"""
+    assert find_layout_span("<html></html>") is None
+    assert find_layout_span('<script id="__LAYOUT__">{"a": 1}') is None
+    assert load_layout("<html></html>") is None
+    with pytest.raises(ValueError):
+        load_layout('<script id="__LAYOUT__">{not json}</script>')
+
+
+def test_targeted_product_lookup():
+    """测试只解码产品数据子树，结果与完整解析一致"""
+    import main
+
+    html_content = DETAIL_SAMPLE.read_text(encoding="utf-8")
+    layout_data = load_layout(html_content)
+    uuid = main.find_product_uuid(layout_data["widgets"])
+
+    assert find_ref_uuid(extract_layout_text(html_content), "pdp_product_data") == uuid
+    assert load_resolved_data(html_content, "pdp_product_data") == layout_data["resolveParamValues"][uuid]["data"]
+
+
+def test_ref_lookup_skips_non_keys():
+    """测试引用前缀出现在字符串值中时不被误认为键"""
+    layout_text = (
+        '{"widgets": [{"text": "pdp_product_data is here", "resolveParamRefs": '
+        '{"pdp_product_data_5_0_0": "abc"}}], '
+        '"resolveParamValues": {"x": "abc", "abc": {"data": {"ok": true}}}}'
+    )
+    html_content = f'<script id="__LAYOUT__">{layout_text}</script>'
+    assert find_ref_uuid(layout_text, "pdp_product_data") == "abc"
+    assert load_resolved_data(html_content, "pdp_product_data") == {"ok": True}
+    assert load_resolved_data(html_content, "missing_ref") is None
+
+
+def test_widget_path_cache():
+    """测试缓存的 widget 路径失效时重新递归查找"""
+    import main
+
+    def accordions(uuid):
+        return {"name": "accordions", "resolveParamRefs": {"pdp_product_data_5_0_0": uuid}}
+
+    assert main.find_product_uuid([{"children": [{}, accordions("first")]}]) == "first"
+    assert main._product_uuid_path == [0, 1]
+    assert main.find_product_uuid([{"children": [{}, accordions("second")]}]) == "second"
+    # 结构变化后回退到递归查找并更新缓存
+    assert main.find_product_uuid([accordions("third")]) == "third"
+    assert main._product_uuid_path == [0]
+
+
+if __name__ == "__main__":
+    for path in sorted(SAMPLES_DIR.glob("*.html")):
+        test_matches_regex_on_samples(path)
+    test_bytes_input()
+    test_missing_or_invalid_layout()
+    test_targeted_product_lookup()
+    test_ref_lookup_skips_non_keys()
+    test_widget_path_cache()
+    print("✓ 全部通过")
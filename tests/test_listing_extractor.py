@@ -0,0 +1,169 @@
+"""测试列表页 JSON 提取和直接分页爬取"""
+
+import json
+import sys
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+
+from utils.http_fetcher import HttpFetcher
+from utils.listing_extractor import (
+    build_page_url,
+    extract_listing_products,
+    parse_listing_cards_html,
+    parse_listing_page,
+)
+from utils.multi_page_scraper import scrape_all_pages_direct
+
+LISTING_SAMPLE = project_root / "data" / "samples" / "Hair, Skin & Nails _ Beauty Vitamins _ Holland & Barrett.html"
+CATEGORY_URL = "https://www.hollandandbarrett.com/shop/vitamins-supplements/condition/hair-skin-nails/"
+
+
+def make_listing_page(page, total, per_page=3):
+    """生成只包含产品列表数据的最小列表页"""
+    tiles = [
+        {
+            "url": f"/shop/product/p{page}-{i}",
+            "title": f"Product {page}-{i}",
+            "brandName": "Brand",
+            "actualPrice": "£1.00",
+            "images": ["https://images.example.com/HB/{resolution}/x.png"],
+        }
+        for i in range(per_page)
+    ]
+    layout = {
+        "widgets": [{"name": "searchcontentwidget", "resolveParamRefs": {"product_list_7_0_0": "list"}}],
+        "resolveParamValues": {
+            "list": {"data": {"tiles": tiles, "pagination": {"size": per_page, "total": total, "current": page}}}
+        },
+    }
+    return f'<html><script id="__LAYOUT__" type="application/json">{json.dumps(layout)}</script></html>'
+
+
+def test_parse_sample_listing():
+    """测试从保存的列表页中解析产品和分页"""
+    html_content = LISTING_SAMPLE.read_text(encoding="utf-8")
+    products, pagination = parse_listing_page(html_content)
+
+    print(f"✓ 解析到 {len(products)} 个产品，共 {pagination['total']} 页")
+    assert len(products) == 40
+    assert pagination == {"size": 40, "total": 5, "current": 1}
+
+    first = products[0]
+    assert first["url"] == (
+        "https://www.hollandandbarrett.com/shop/product/"
+        "nature-s-bounty-hair-skin-and-nails-with-biotin-60-gummies-60060158"
+    )
+    assert first["brand"] == "Nature's Bounty"
+    assert first["name"] == "® Hair, Skin and Nails with Biotin 60 Gummies"
+    assert first["price"] == "£13.73"
+    assert "/HB/320/060158_A.png" in first["image"]
+
+
+def test_card_html_matches_json():
+    """测试一次性解析卡片HTML与 JSON 提取结果一致"""
+    html_content = LISTING_SAMPLE.read_text(encoding="utf-8")
+    json_products, _ = parse_listing_page(html_content)
+    card_products = parse_listing_cards_html(html_content)
+
+    assert len(card_products) == len(json_products)
+    for card, tile in zip(card_products, json_products):
+        assert card["url"] == tile["url"]
+        assert card["brand"] == tile["brand"]
+        assert card["name"] == tile["name"]
+
+
+def test_extract_falls_back_to_cards():
+    """测试没有 __LAYOUT__ 时解析产品卡片"""
+    html_content = (
+        '<a data-test="product-card" href="https://example.com/p1">'
+        '<span data-test="product-card-brand-name">Brand</span>'
+        '<span data-test="product-card-title"> Name </span>'
+        '<span data-test="product-card-price">£2.00</span>'
+        '<img data-test="product-image" src="https://example.com/p1.png"></a>'
+    )
+    assert extract_listing_products(html_content) == [{
+        "url": "https://example.com/p1",
+        "brand": "Brand",
+        "name": "Name",
+        "price": "£2.00",
+        "image": "https://example.com/p1.png",
+    }]
+
+    # 相对链接按站点根地址补全
+    relative = html_content.replace("https://example.com/p1", "/shop/product/p1")
+    product = extract_listing_products(relative)[0]
+    assert product["url"] == "https://www.hollandandbarrett.com/shop/product/p1"
+    assert product["image"] == "https://www.hollandandbarrett.com/shop/product/p1.png"
+    assert extract_listing_products('<a data-test="product-card"></a>')[0]["url"] == ""
+
+
+def test_build_page_url():
+    """测试分页URL构造"""
+    assert build_page_url(CATEGORY_URL, 1) == CATEGORY_URL
+    assert build_page_url(CATEGORY_URL, 3) == CATEGORY_URL + "?page=3"
+    assert build_page_url(CATEGORY_URL + "?sort=price&page=2", 4) == CATEGORY_URL + "?sort=price&page=4"
+
+
+def test_scrape_all_pages_direct():
+    """测试读取总页数后并发请求所有分页，失败的分页交给备用方式补爬"""
+    requested_pages = []
+    fallback_urls = []
+
+    def handler(request):
+        page = int(request.url.params.get("page", "1"))
+        requested_pages.append(page)
+        if page == 4:
+            return httpx.Response(503)
+        return httpx.Response(200, text=make_listing_page(page, total=5))
+
+    def fallback(url):
+        fallback_urls.append(url)
+        return extract_listing_products(make_listing_page(4, total=5))
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    with HttpFetcher(client=client) as fetcher:
+        products = scrape_all_pages_direct(CATEGORY_URL, max_workers=4, fetcher=fetcher, fallback_page_func=fallback)
+        limited = scrape_all_pages_direct(CATEGORY_URL, max_pages=2, fetcher=fetcher)
+
+    # 第4页直接请求失败（重试2次）后由备用方式补爬，所有页面按页码顺序合并
+    assert [p["name"] for p in products[::3]] == [f"Product {page}-0" for page in range(1, 6)]
+    assert requested_pages.count(4) == 2
+    assert fallback_urls == [build_page_url(CATEGORY_URL, 4)]
+    assert len(limited) == 6
+
+
+def test_direct_returns_none_with_missing_pages():
+    """测试有分页无法获取（没有备用方式或补爬失败）时返回 None，不返回不完整的产品列表"""
+
+    def handler(request):
+        page = int(request.url.params.get("page", "1"))
+        if page == 4:
+            return httpx.Response(503)
+        return httpx.Response(200, text=make_listing_page(page, total=5))
+
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    with HttpFetcher(client=client) as fetcher:
+        assert scrape_all_pages_direct(CATEGORY_URL, fetcher=fetcher) is None
+        assert scrape_all_pages_direct(CATEGORY_URL, fetcher=fetcher, fallback_page_func=lambda url: []) is None
+
+
+def test_direct_returns_none_without_listing():
+    """测试第1页没有列表数据时返回 None（由调用方回退到浏览器翻页）"""
+    client = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(403)))
+    with HttpFetcher(client=client) as fetcher:
+        assert scrape_all_pages_direct(CATEGORY_URL, fetcher=fetcher) is None
+
+
+if __name__ == "__main__":
+    test_parse_sample_listing()
+    test_card_html_matches_json()
+    test_extract_falls_back_to_cards()
+    test_build_page_url()
+    test_scrape_all_pages_direct()
+    test_direct_returns_none_with_missing_pages()
+    test_direct_returns_none_without_listing()
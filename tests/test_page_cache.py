@@ -0,0 +1,262 @@
+"""测试页面缓存"""
+
+import asyncio
+import random
+import sys
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import httpx
+from PIL import Image
+
+from utils.async_scraper import AsyncScraper
+from utils.http_fetcher import HttpFetcher
+from utils.image_processor import ImageProcessor
+from utils.page_cache import PageCache
+
+DETAIL_SAMPLE = project_root / "data" / "samples" / "Nature's Bounty® Hair, Skin and Nails with Biotin 60 Gummies | H&B.html"
+PAGE_URL = "https://www.hollandandbarrett.com/shop/product/test"
+
+
+def test_put_and_get(tmp_path):
+    """测试写入后读取，元数据中保存 ETag / Last-Modified"""
+    cache = PageCache(tmp_path)
+    html_content = DETAIL_SAMPLE.read_text(encoding="utf-8")
+
+    assert cache.get(PAGE_URL) is None
+    cache.put(PAGE_URL, html_content, etag='"abc"', last_modified="Wed, 01 Jan 2025 00:00:00 GMT")
+
+    assert cache.get(PAGE_URL) == html_content
+    entry = cache.get_entry(PAGE_URL)
+    assert entry["etag"] == '"abc"'
+    assert entry["last_modified"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+    assert entry["fresh"]
+
+    stats = cache.stats()
+    print(f"✓ 压缩后 {entry['size'] / 1024:.0f} KB（原始 {len(html_content.encode()) / 1024:.0f} KB）")
+    assert stats["hits"] == 2 and stats["misses"] == 1
+    assert entry["size"] < len(html_content.encode()) / 3
+
+    # 新实例读取已有缓存
+    assert PageCache(tmp_path).get(PAGE_URL) == html_content
+
+
+def test_ttl_expiry(tmp_path):
+    """测试过期条目不再返回，但允许取出用于条件请求；touch 后重新有效"""
+    cache = PageCache(tmp_path, ttl=0.05)
+    cache.put(PAGE_URL, "<html>old</html>", etag='"v1"')
+    time.sleep(0.1)
+
+    assert cache.get(PAGE_URL) is None
+    stale = cache.get_entry(PAGE_URL, allow_stale=True)
+    assert stale["html"] == "<html>old</html>"
+    assert not stale["fresh"]
+
+    cache.touch(PAGE_URL)
+    assert cache.get(PAGE_URL) == "<html>old</html>"
+
+
+def test_size_eviction(tmp_path):
+    """测试超过容量上限时淘汰最早抓取的页面"""
+    cache = PageCache(tmp_path, ttl=None, max_size_mb=0.05)
+    # 随机内容难以压缩，每个页面压缩后约 12 KB
+    pages = {f"https://example.com/{i}": random.Random(i).randbytes(12 * 1024).hex() for i in range(5)}
+    for url, html_content in pages.items():
+        cache.put(url, html_content)
+        time.sleep(0.01)
+
+    remaining = [url for url in pages if cache.get(url) is not None]
+    print(f"✓ 淘汰后剩余 {len(remaining)}/{len(pages)} 个页面，{cache.stats()['size_mb'] * 1024:.1f} KB")
+    assert 0 < len(remaining) < len(pages)
+    assert "https://example.com/4" in remaining
+    assert "https://example.com/0" not in remaining
+    assert cache.stats()["size_mb"] <= 0.05
+
+
+def test_concurrent_put_same_url(tmp_path):
+    """测试多个线程同时写入同一URL时不报错、不留下临时文件，读到的是其中一次完整写入"""
+    cache = PageCache(tmp_path, ttl=None)
+    target = tmp_path / "page.html.gz"
+    payloads = [bytes([index]) * 64 * 1024 for index in range(16)]
+    errors = []
+
+    def writer(data):
+        try:
+            for _ in range(50):
+                cache._write_atomic(target, data)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=writer, args=(data,)) for data in payloads]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert target.read_bytes() in payloads
+    assert list(tmp_path.glob("*.tmp")) == []
+
+    pages = [f"<html>{index}</html>" for index in range(4)]
+    threads = [threading.Thread(target=cache.put, args=(PAGE_URL, html_content)) for html_content in pages]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.get(PAGE_URL) in pages
+
+
+def test_http_fetcher_uses_cache(tmp_path):
+    """测试 HttpFetcher 第二次获取同一页面时不发送请求"""
+    html_content = DETAIL_SAMPLE.read_text(encoding="utf-8")
+    requests = []
+
+    def handler(request):
+        requests.append(request.url)
+        return httpx.Response(200, text=html_content, headers={"ETag": '"v1"'})
+
+    cache = PageCache(tmp_path)
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    with HttpFetcher(user_agent="test-agent", client=client, cache=cache) as fetcher:
+        assert fetcher.fetch_layout_page(PAGE_URL) == html_content
+        assert fetcher.fetch_layout_page(PAGE_URL) == html_content
+        assert len(requests) == 1
+
+        # 显式跳过缓存
+        assert fetcher.fetch_layout_page(PAGE_URL, use_cache=False) == html_content
+        assert len(requests) == 2
+
+    assert cache.get_entry(PAGE_URL)["etag"] == '"v1"'
+
+
+def test_fetcher_skips_pages_without_layout(tmp_path):
+    """测试不含 __LAYOUT__ 的占位页不会写入缓存"""
+    cache = PageCache(tmp_path)
+    client = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, text="<html>captcha</html>")))
+    with HttpFetcher(client=client, cache=cache) as fetcher:
+        assert fetcher.fetch_layout_page(PAGE_URL) is None
+
+    assert cache.get_entry(PAGE_URL, allow_stale=True) is None
+
+
+def test_async_scraper_uses_cache(tmp_path):
+    """测试异步爬取命中缓存时不发送请求"""
+    html_content = DETAIL_SAMPLE.read_text(encoding="utf-8")
+    cache = PageCache(tmp_path)
+    cache.put(PAGE_URL, html_content)
+
+    def handler(request):
+        raise AssertionError("命中缓存时不应发送请求")
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        scraper = AsyncScraper(per_host_rate=0, client=client, cache=cache)
+        try:
+            return await scraper.scrape_items([{"url": PAGE_URL}], parse_func=lambda html: {"description": len(html)})
+        finally:
+            await client.aclose()
+
+    results = asyncio.run(run())
+    assert results[0]["description"] == len(html_content)
+
+
+def test_http_fetcher_conditional_request(tmp_path):
+    """测试缓存过期后发送条件请求，304 时复用缓存内容"""
+    html_content = DETAIL_SAMPLE.read_text(encoding="utf-8")
+    seen_headers = []
+
+    def handler(request):
+        seen_headers.append(dict(request.headers))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text=html_content, headers={"ETag": '"v1"'})
+
+    cache = PageCache(tmp_path, ttl=0.05)
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    with HttpFetcher(client=client, cache=cache) as fetcher:
+        assert fetcher.fetch_layout_page(PAGE_URL) == html_content
+        time.sleep(0.1)
+        assert fetcher.fetch_layout_page(PAGE_URL) == html_content
+
+    assert "if-none-match" not in seen_headers[0]
+    assert seen_headers[1]["if-none-match"] == '"v1"'
+    assert cache.stats()["not_modified"] == 1
+    # 304 后缓存重新变为有效
+    assert cache.get(PAGE_URL) == html_content
+
+
+def test_async_scraper_conditional_request(tmp_path):
+    """测试异步爬取对过期缓存发送条件请求"""
+    html_content = DETAIL_SAMPLE.read_text(encoding="utf-8")
+    cache = PageCache(tmp_path, ttl=0.05)
+    cache.put(PAGE_URL, html_content, last_modified="Wed, 01 Jan 2025 00:00:00 GMT")
+    time.sleep(0.1)
+
+    def handler(request):
+        assert request.headers["if-modified-since"] == "Wed, 01 Jan 2025 00:00:00 GMT"
+        return httpx.Response(304)
+
+    async def run():
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        scraper = AsyncScraper(per_host_rate=0, client=client, cache=cache)
+        try:
+            return await scraper.scrape_items([{"url": PAGE_URL}], parse_func=lambda html: {"description": len(html)})
+        finally:
+            await client.aclose()
+
+    results = asyncio.run(run())
+    assert results[0]["description"] == len(html_content)
+    assert cache.stats()["not_modified"] == 1
+
+
+def test_image_not_modified_reuses_upload(tmp_path):
+    """测试原图返回 304 时复用上次上传的图床URL，不再处理和上传"""
+    buffer = BytesIO()
+    Image.new("RGB", (250, 250), (200, 30, 30)).save(buffer, format="PNG")
+    image_bytes = buffer.getvalue()
+    image_url = "https://images.hollandandbarrettimages.co.uk/productimages/HB/250/084867_A.png"
+    uploads = []
+
+    def handler(request):
+        if request.method == "POST":
+            uploads.append(request)
+            return httpx.Response(200, json={"result": "success", "url": "https://img.example.com/1.png"})
+        if request.headers.get("if-none-match") == '"img1"':
+            return httpx.Response(304)
+        return httpx.Response(200, content=image_bytes, headers={"ETag": '"img1"'})
+
+    cache = PageCache(tmp_path, ttl=0.05, compress_level=0, suffix=".img.gz")
+    with ImageProcessor("https://img.example.com/api", "token", cache=cache) as processor:
+        processor.client = httpx.Client(transport=httpx.MockTransport(handler))
+        assert processor.process_and_upload(image_url, "Test") == "https://img.example.com/1.png"
+        time.sleep(0.1)
+        assert processor.process_and_upload(image_url, "Test") == "https://img.example.com/1.png"
+
+    print(f"✓ 上传次数: {len(uploads)}，304 次数: {cache.stats()['not_modified']}")
+    assert len(uploads) == 1
+    assert cache.stats()["not_modified"] == 1
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    for test in (
+        test_put_and_get,
+        test_ttl_expiry,
+        test_size_eviction,
+        test_concurrent_put_same_url,
+        test_http_fetcher_uses_cache,
+        test_fetcher_skips_pages_without_layout,
+        test_async_scraper_uses_cache,
+        test_http_fetcher_conditional_request,
+        test_async_scraper_conditional_request,
+        test_image_not_modified_reuses_upload,
+    ):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test(Path(temp_dir))
@@ -0,0 +1,83 @@
+"""测试事件驱动的页面就绪等待"""
+
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.page_ready import (
+    ReadinessStats,
+    wait_for_layout,
+    wait_for_ready_state,
+    wait_for_selector,
+)
+
+
+class FakeDriver:
+    """模拟的 WebDriver：readyState 在指定时间后变化"""
+
+    def __init__(self, interactive_after=0.2, complete_after=0.6, has_layout=True):
+        self.start_time = time.monotonic()
+        self.interactive_after = interactive_after
+        self.complete_after = complete_after
+        self.has_layout = has_layout
+
+    def _ready_state(self):
+        elapsed = time.monotonic() - self.start_time
+        if elapsed >= self.complete_after:
+            return "complete"
+        if elapsed >= self.interactive_after:
+            return "interactive"
+        return "loading"
+
+    def execute_script(self, script, *args):
+        if script == "return document.readyState":
+            return self._ready_state()
+        if "__LAYOUT__" in script:
+            return self._ready_state() != "loading" and self.has_layout
+        if "querySelector" in script:
+            return args[0] == '[data-test="product-card"]'
+        raise ValueError(f"unexpected script: {script}")
+
+
+def test_ready_state_returns_early():
+    """测试达到 interactive 后立即返回，不等待 complete"""
+    stats = ReadinessStats()
+    driver = FakeDriver(interactive_after=0.2, complete_after=5)
+
+    start_time = time.monotonic()
+    assert wait_for_ready_state(driver, "interactive", timeout=3, stats=stats)
+    elapsed = time.monotonic() - start_time
+
+    print(f"✓ interactive 等待耗时 {elapsed:.2f}秒")
+    assert elapsed < 1
+    assert stats.summary()["readyState:interactive"]["count"] == 1
+
+
+def test_layout_wait():
+    """测试 __LAYOUT__ 就绪等待及超时"""
+    stats = ReadinessStats()
+    assert wait_for_layout(FakeDriver(interactive_after=0.1), timeout=2, stats=stats)
+    assert not wait_for_layout(FakeDriver(interactive_after=0, has_layout=False), timeout=0.3, stats=stats)
+
+    summary = stats.summary()["layout"]
+    print(f"✓ layout 等待 {summary['count']} 次，超时 {summary['timeouts']} 次")
+    assert summary["count"] == 2
+    assert summary["timeouts"] == 1
+
+
+def test_selector_wait():
+    """测试选择器等待"""
+    stats = ReadinessStats()
+    driver = FakeDriver()
+    assert wait_for_selector(driver, '[data-test="product-card"]', timeout=1, stats=stats)
+    assert not wait_for_selector(driver, ".missing", timeout=0.2, stats=stats)
+
+
+if __name__ == "__main__":
+    test_ready_state_returns_early()
+    test_layout_wait()
+    test_selector_wait()
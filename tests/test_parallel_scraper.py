@@ -1,5 +1,6 @@
 """测试并行爬取功能"""
 
+import os
 import sys
 import time
 from pathlib import Path
@@ -10,6 +11,8 @@ sys.path.insert(0, str(project_root))
 
 from utils.parallel_scraper import ParallelScraper
 
+DETAIL_SAMPLE = project_root / "data" / "samples" / "Nature's Bounty® Hair, Skin and Nails with Biotin 60 Gummies | H&B.html"
+
 
 def mock_scrape_func(driver, url):
     """模拟爬取函数"""
@@ -21,6 +24,47 @@ def mock_scrape_func(driver, url):
     }
 
 
+def mock_fetch_func(driver, url):
+    """模拟抓取阶段：返回保存的详情页HTML"""
+    return DETAIL_SAMPLE.read_text(encoding="utf-8")
+
+
+def pid_parse_func(html_content):
+    """解析阶段：解析详情并记录执行解析的进程ID"""
+    from main import parse_product_detail
+
+    details = parse_product_detail(html_content)
+    details["parsed_by"] = os.getpid()
+    return details
+
+
+def slow_parse_func(html_content):
+    """解析阶段：模拟耗时解析，占位页解析为空"""
+    time.sleep(1)
+    return {} if "placeholder" in html_content else {"description": html_content}
+
+
+def test_process_pool_pipeline():
+    """测试抓取与解析分离：解析在独立进程中执行"""
+    items = [{"name": f"Product {i}", "url": f"https://example.com/product/{i}"} for i in range(6)]
+
+    scraper = ParallelScraper(
+        max_workers=3,
+        retry_times=1,
+        request_delay=(0, 0),
+        fetch_engine="http",  # 不启动浏览器
+        parse_workers=2
+    )
+    results = scraper.scrape_items_parallel(items, fetch_func=mock_fetch_func, parse_func=pid_parse_func)
+
+    parser_pids = {result["parsed_by"] for result in results}
+    print(f"✓ {len(results)} 个结果由 {len(parser_pids)} 个解析进程处理")
+    assert len(results) == len(items)
+    assert all(result["highlights"] for result in results)
+    assert os.getpid() not in parser_pids
+    assert scraper.failed_items == []
+
+
 def test_parallel_vs_sequential():
     """测试并行爬取vs顺序爬取的性能差异"""
     print("=" * 70)
@@ -82,5 +126,119 @@ def test_parallel_vs_sequential():
           f"({(sequential_time - estimated_parallel_time) / sequential_time * 100:.1f}%)")
 
 
+def test_iter_items_bounded_window():
+    """测试惰性输入：按完成顺序产出结果，在途项目数不超过窗口大小"""
+    consumed = 0
+    max_ahead = 0
+    yielded = 0
+
+    def lazy_items():
+        nonlocal consumed
+        for i in range(20):
+            consumed += 1
+            yield {"name": f"Product {i}", "url": f"https://example.com/product/{i}"}
+
+    def quick_scrape(driver, url):
+        time.sleep(0.01)
+        return {"description": f"Details for {url}"}
+
+    scraper = ParallelScraper(max_workers=2, retry_times=1, request_delay=(0, 0), fetch_engine="http")
+    results = []
+    for result in scraper.iter_items_parallel(lazy_items(), scrape_func=quick_scrape, window=4):
+        yielded += 1
+        max_ahead = max(max_ahead, consumed - yielded)
+        results.append(result)
+
+    print(f"✓ 产出 {len(results)} 个结果，最多提前读取 {max_ahead} 个")
+    assert len(results) == 20
+    assert all(result["description"].startswith("Details") for result in results)
+    # 窗口为 4：已读取但未产出的项目不超过 4 个（补充任务先于产出）
+    assert max_ahead <= 4
+
+
+def test_iter_items_early_stop():
+    """测试提前停止迭代时不会继续读取输入"""
+    consumed = 0
+
+    def lazy_items():
+        nonlocal consumed
+        for i in range(1000):
+            consumed += 1
+            yield {"name": f"Product {i}", "url": f"https://example.com/product/{i}"}
+
+    scraper = ParallelScraper(max_workers=2, retry_times=1, request_delay=(0, 0), fetch_engine="http")
+    iterator = scraper.iter_items_parallel(
+        lazy_items(), scrape_func=lambda driver, url: {"description": url}, window=3
+    )
+    first = [next(iterator) for _ in range(5)]
+    iterator.close()
+
+    assert len(first) == 5
+    assert consumed <= 5 + 3
+
+
+class FakeDriver:
+    """模拟浏览器（不启动 Chrome）"""
+
+    def execute_script(self, script):
+        return 1
+
+    def quit(self):
+        pass
+
+
+def test_http_miss_falls_back_to_selenium():
+    """测试 HTTP 引擎未获取到详情时回退一次 Selenium（retry_times=1 也会回退，且不重复 HTTP 请求）"""
+    calls = []
+
+    def scrape_func(driver, url):
+        calls.append("selenium" if driver is not None else "http")
+        return {"description": f"Details for {url}"} if driver is not None else {}
+
+    scraper = ParallelScraper(max_workers=1, retry_times=1, request_delay=(0, 0), fetch_engine="http")
+    scraper.driver_pool.create_driver = FakeDriver
+    items = [{"name": "Product 0", "url": "https://example.com/product/0"}]
+    results = list(scraper.iter_items_parallel(items, scrape_func=scrape_func))
+
+    assert calls == ["http", "selenium"]
+    assert results[0]["description"] == "Details for https://example.com/product/0"
+    assert scraper.failed_items == []
+
+
+def test_parse_does_not_block_fetch():
+    """测试解析在进程池中进行时抓取线程不等待解析，HTTP 抓取解析为空时回退到 Selenium"""
+    fetches = []
+
+    def fetch_func(driver, url):
+        fetches.append((url, driver is not None, time.time()))
+        if driver is None and url.endswith("/0"):
+            return "placeholder"
+        return f"Details for {url}"
+
+    scraper = ParallelScraper(
+        max_workers=1, retry_times=1, request_delay=(0, 0), fetch_engine="http", parse_workers=2
+    )
+    scraper.driver_pool.create_driver = FakeDriver
+    items = [{"name": f"Product {i}", "url": f"https://example.com/product/{i}"} for i in range(4)]
+
+    start_time = time.time()
+    results = list(scraper.iter_items_parallel(items, fetch_func=fetch_func, parse_func=slow_parse_func, window=4))
+
+    # 单个抓取线程在任何解析完成之前就抓取完全部 HTTP 页面
+    http_fetches = [fetched_at - start_time for _, used_driver, fetched_at in fetches if not used_driver]
+    assert len(http_fetches) == 4
+    assert max(http_fetches) < 0.5
+    assert [url for url, used_driver, _ in fetches if used_driver] == ["https://example.com/product/0"]
+    assert sorted(result["description"] for result in results) == [
+        f"Details for https://example.com/product/{i}" for i in range(4)
+    ]
+    assert scraper.failed_items == []
+
+
 if __name__ == "__main__":
+    test_process_pool_pipeline()
+    test_iter_items_bounded_window()
+    test_iter_items_early_stop()
+    test_http_miss_falls_back_to_selenium()
+    test_parse_does_not_block_fetch()
     test_parallel_vs_sequential()
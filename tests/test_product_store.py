@@ -0,0 +1,214 @@
+"""测试 SQLite 产品存储"""
+
+import csv
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.product_store import ProductStore, load_urls_from_csv
+from utils.rate_limiter import RateLimiter
+
+FIELDNAMES = [
+    '产品名称', '产品亮点', '产品价格', '产品品牌',
+    '产品图', '产品描述', '产品类型', '作用部位',
+    '用法说明', '营养成分', '配料表', 'URL'
+]
+
+
+def make_product(index, **overrides):
+    """构造合并了详情的产品数据"""
+    product = {
+        "brand": "Brand",
+        "name": f"Product {index}",
+        "price": "£10.99",
+        "image": f"https://images.example.com/{index}.jpg",
+        "url": f"https://www.hollandandbarrett.com/shop/product/product-{index}",
+        "highlights": "Vegan",
+        "description": f"Description {index}",
+        "directions": "Take one daily",
+        "ingredients": "Biotin",
+        "nutritional_info": "",
+    }
+    product.update(overrides)
+    return product
+
+
+def read_csv(path):
+    """读取导出的 CSV"""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def test_upsert_and_export(tmp_path):
+    """测试分批写入后导出的 CSV 与原有格式一致"""
+    with ProductStore(tmp_path / "products.db", FIELDNAMES) as store:
+        store.upsert_products([make_product(i) for i in range(3)], product_type="hair-skin-nails")
+        store.upsert_products([make_product(i) for i in range(3, 5)], product_type="hair-skin-nails")
+
+        output_csv = tmp_path / "products_complete.csv"
+        assert store.export_csv("products_complete", output_csv) == 5
+
+        rows = read_csv(output_csv)
+        assert list(rows[0].keys()) == FIELDNAMES
+        assert rows[0]["产品名称"] == "Product 0"
+        assert rows[4]["产品类型"] == "hair-skin-nails"
+        assert load_urls_from_csv(output_csv) == [make_product(i)["url"] for i in range(5)]
+
+        # 只导出指定产品
+        urls = [make_product(1)["url"], make_product(3)["url"]]
+        assert store.export_csv("products_complete", output_csv, urls=urls) == 2
+        assert store.count(urls) == 2
+
+
+def test_translation_stage(tmp_path):
+    """测试翻译只处理未翻译或源字段有变化的产品"""
+    with ProductStore(tmp_path / "products.db", FIELDNAMES) as store:
+        store.upsert_products([make_product(i) for i in range(3)])
+
+        pending = store.pending_translations()
+        assert [row["url"] for row in pending] == [make_product(i)["url"] for i in range(3)]
+
+        store.save_translations([
+            (row["url"], {"name": f"产品 {index}", "description": f"描述 {index}"})
+            for index, row in enumerate(pending)
+        ])
+        assert store.pending_translations() == []
+
+        # 第 1 个产品描述变化，第 2 个产品只有价格变化
+        store.upsert_products([
+            make_product(1, description="New description"),
+            make_product(2, price="£8.99"),
+        ])
+        pending = store.pending_translations()
+        assert [row["url"] for row in pending] == [make_product(1)["url"]]
+
+        zh_csv = tmp_path / "products_complete_zh.csv"
+        store.export_csv("products_complete_zh", zh_csv)
+        rows = read_csv(zh_csv)
+        print(f"✓ 中文导出: {rows[0]['产品名称']} / {rows[0]['产品描述']}")
+        assert rows[0]["产品名称"] == "产品 0"
+        assert rows[0]["产品描述"] == "描述 0"
+        # 没有译文的字段使用原文
+        assert rows[0]["用法说明"] == "Take one daily"
+        assert rows[2]["产品价格"] == "£8.99"
+
+
+def test_failed_detail_keeps_previous(tmp_path):
+    """测试详情爬取失败时保留上次成功的详情和翻译"""
+    with ProductStore(tmp_path / "products.db", FIELDNAMES) as store:
+        store.upsert_products([make_product(1)])
+        store.save_translations([(make_product(1)["url"], {"description": "描述"})])
+
+        failed = {key: value for key, value in make_product(1).items() if key in ("brand", "name", "price", "image", "url")}
+        store.upsert_products([failed])
+
+        rows = [dict(row) for row in store.conn.execute("SELECT * FROM products")]
+        assert rows[0]["description"] == "Description 1"
+        assert rows[0]["detail_status"] == "done"
+        assert store.pending_translations() == []
+
+
+def test_image_stage(tmp_path):
+    """测试图片处理状态，原图变化时需要重新处理"""
+    with ProductStore(tmp_path / "products.db", FIELDNAMES) as store:
+        store.upsert_products([make_product(i) for i in range(2)] + [make_product(2, image="")])
+        pending = store.pending_images()
+        assert len(pending) == 2
+
+        store.save_images([(pending[0]["url"], "https://img.example.com/0.png"), (pending[1]["url"], None)])
+        assert [row["url"] for row in store.pending_images()] == [pending[1]["url"]]
+
+        processed_csv = tmp_path / "processed.csv"
+        store.export_csv("products_complete_processed", processed_csv)
+        rows = read_csv(processed_csv)
+        assert rows[0]["产品图"] == "https://img.example.com/0.png"
+        assert rows[1]["产品图"] == make_product(1)["image"]
+
+        store.upsert_products([make_product(0, image="https://images.example.com/0-v2.jpg")])
+        assert len(store.pending_images()) == 2
+
+
+def test_listing_only_rows_not_exported(tmp_path):
+    """测试只有列表页信息的产品不出现在完整信息导出中"""
+    with ProductStore(tmp_path / "products.db", FIELDNAMES) as store:
+        store.upsert_products([make_product(1)], with_details=False)
+        assert store.count() == 0
+        assert store.export_csv("products_complete", tmp_path / "out.csv") == 0
+
+
+def test_views_follow_fieldnames(tmp_path):
+    """测试表头变化后重新打开数据库，导出的列与新表头一致"""
+    with ProductStore(tmp_path / "products.db", FIELDNAMES) as store:
+        store.upsert_products([make_product(0)])
+
+    fieldnames = [header for header in FIELDNAMES if header != "作用部位"]
+    with ProductStore(tmp_path / "products.db", fieldnames) as store:
+        store.export_csv("products_complete", tmp_path / "out.csv")
+        store.export_csv("products_complete_zh", tmp_path / "out_zh.csv")
+
+    assert list(read_csv(tmp_path / "out.csv")[0].keys()) == fieldnames
+    assert list(read_csv(tmp_path / "out_zh.csv")[0].keys()) == fieldnames
+
+
+class FakeCompletions:
+    """模拟 chat.completions（批量 JSON 格式），记录请求次数"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, model, messages, **kwargs):
+        self.calls += 1
+        items = json.loads(messages[-1]["content"].split("\n", 1)[1])["items"]
+        content = json.dumps({"translations": [{"id": item["id"], "text": f"译:{item['text']}"} for item in items]})
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_translate_with_store(tmp_path, monkeypatch):
+    """测试翻译阶段只翻译未翻译的产品，并导出中文CSV"""
+    from utils import translate
+
+    output_csv = tmp_path / "products_complete_zh.csv"
+    monkeypatch.setattr(translate, "OUTPUT_CSV", str(output_csv))
+    monkeypatch.setattr(translate, "get_rate_limiter", lambda name: RateLimiter(0))
+
+    completions = FakeCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+    with ProductStore(tmp_path / "products.db", FIELDNAMES) as store:
+        products = [make_product(i) for i in range(2)]
+        store.upsert_products(products)
+        urls = [product["url"] for product in products]
+
+        translate.translate_with_store(client, store, urls, interactive=False)
+        first_calls = completions.calls
+        # 名称、亮点、描述、用法、配料（营养成分为空）共 2 * 5 个单元格，合并为一次请求
+        assert first_calls == 1
+
+        rows = read_csv(output_csv)
+        assert rows[0]["产品名称"] == "译:Product 0"
+        assert rows[0]["产品价格"] == "£10.99"
+
+        # 再次运行：没有变化，不发送请求
+        translate.translate_with_store(client, store, urls, interactive=False)
+        assert completions.calls == first_calls
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    for test in (
+        test_upsert_and_export,
+        test_translation_stage,
+        test_failed_detail_keeps_previous,
+        test_image_stage,
+        test_listing_only_rows_not_exported,
+        test_views_follow_fieldnames,
+    ):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test(Path(temp_dir))
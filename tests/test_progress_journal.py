@@ -0,0 +1,122 @@
+"""测试多页爬取的追加式进度日志"""
+
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils import multi_page_scraper
+from utils.multi_page_scraper import MultiPageScraper, scrape_all_pages
+
+BASE_URL = "https://www.hollandandbarrett.com/shop/vitamins-supplements/"
+
+
+def make_page(page, count=3):
+    """构造一页产品数据"""
+    return [{"name": f"Product {page}-{i}", "url": f"https://example.com/{page}/{i}"} for i in range(count)]
+
+
+def make_scraper(tmp_path):
+    """创建进度文件位于临时目录的爬虫（不需要浏览器）"""
+    scraper = MultiPageScraper(driver=None)
+    scraper.progress_file = tmp_path / "scrape_progress.json"
+    scraper.journal_file = tmp_path / "scrape_progress.jsonl"
+    return scraper
+
+
+def test_append_and_load(tmp_path):
+    """测试每页追加一行，加载时合并所有页面"""
+    scraper = make_scraper(tmp_path)
+    for page in range(1, 4):
+        scraper.append_progress(BASE_URL, page, make_page(page))
+
+    lines = scraper.journal_file.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 3
+    assert len(json.loads(lines[-1])["products"]) == 3
+
+    progress = scraper.load_progress()
+    assert progress["base_url"] == BASE_URL
+    assert progress["last_page"] == 3
+    assert progress["pages_scraped"] == 3
+    assert progress["total_products"] == 9
+
+
+def test_torn_last_line(tmp_path):
+    """测试最后一行写入中断时，之前的页面仍可恢复"""
+    scraper = make_scraper(tmp_path)
+    scraper.append_progress(BASE_URL, 1, make_page(1))
+    scraper.append_progress(BASE_URL, 2, make_page(2))
+    with open(scraper.journal_file, "a", encoding="utf-8") as f:
+        f.write('{"base_url": "' + BASE_URL + '", "page": 3, "prod')
+
+    progress = scraper.load_progress()
+    print(f"✓ 恢复到第 {progress['last_page']} 页，{progress['total_products']} 个产品")
+    assert progress["last_page"] == 2
+    assert progress["total_products"] == 6
+
+
+def test_compact_then_append(tmp_path):
+    """测试合并为快照后继续追加，加载结果包含快照和新页面"""
+    scraper = make_scraper(tmp_path)
+    scraper.append_progress(BASE_URL, 1, make_page(1))
+    scraper.append_progress(BASE_URL, 2, make_page(2))
+    scraper.compact_progress()
+
+    assert scraper.progress_file.exists()
+    assert not scraper.journal_file.exists()
+
+    scraper.append_progress(BASE_URL, 3, make_page(3))
+    progress = scraper.load_progress()
+    assert progress["pages_scraped"] == 3
+    assert [product["name"] for product in progress["products"]][-1] == "Product 3-2"
+
+    scraper.clear_progress()
+    assert scraper.load_progress() is None
+
+
+def test_resume_after_interrupt(tmp_path, monkeypatch):
+    """测试中断后合并进度，下次运行从下一页继续"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(multi_page_scraper.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(MultiPageScraper, "go_to_next_page", lambda self: True)
+    monkeypatch.setattr(multi_page_scraper.config, "AUTO_RESUME", True)
+
+    visited = []
+
+    def interrupting_page(driver, url):
+        visited.append(url)
+        if len(visited) == 3:
+            raise KeyboardInterrupt
+        return make_page(len(visited))
+
+    driver = SimpleNamespace(current_url=BASE_URL)
+    products = scrape_all_pages(driver, BASE_URL, interrupting_page, interactive=False)
+    assert len(products) == 6
+    assert Path("data/output/scrape_progress.json").exists()
+    assert not Path("data/output/scrape_progress.jsonl").exists()
+
+    def final_page(driver, url):
+        visited.append(url)
+        return make_page(3)
+
+    products = scrape_all_pages(driver, BASE_URL, final_page, max_pages=1, interactive=False)
+    assert visited[-1].endswith("page=3")
+    assert len(products) == 9
+    # 正常完成后清除进度
+    assert not Path("data/output/scrape_progress.json").exists()
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    for test in (
+        test_append_and_load,
+        test_torn_last_line,
+        test_compact_then_append,
+    ):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test(Path(temp_dir))
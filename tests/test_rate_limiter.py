@@ -0,0 +1,102 @@
+"""测试令牌桶限速"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.rate_limiter import RateLimiter, TokenBucket, get_rate_limiter, host_of
+
+
+def test_burst_then_rate():
+    """测试突发请求立即通过，之后按速率放行"""
+    bucket = TokenBucket(rate=20, burst=3)
+    start_time = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    burst_elapsed = time.monotonic() - start_time
+
+    for _ in range(4):
+        bucket.acquire()
+    elapsed = time.monotonic() - start_time
+
+    print(f"✓ 突发 3 个耗时 {burst_elapsed:.3f}秒，共 7 个耗时 {elapsed:.3f}秒")
+    assert burst_elapsed < 0.03
+    assert elapsed >= 0.19
+
+
+def test_threads_wait_concurrently():
+    """测试多个线程同时等待令牌，总耗时由速率决定而不是串行叠加"""
+    limiter = RateLimiter(rate=50, burst=1)
+    start_time = time.monotonic()
+
+    threads = [threading.Thread(target=limiter.acquire) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    elapsed = time.monotonic() - start_time
+    # 10 个请求、每秒 50 个：约 0.18 秒
+    assert 0.15 <= elapsed < 0.5
+
+
+def test_per_key_buckets():
+    """测试不同主机使用独立的桶"""
+    limiter = RateLimiter(rate=5, burst=1)
+    limiter.acquire(host_of("https://example.com/a"))
+
+    start_time = time.monotonic()
+    limiter.acquire(host_of("https://other.example.com/a"))
+    assert time.monotonic() - start_time < 0.05
+
+    start_time = time.monotonic()
+    limiter.acquire(host_of("https://example.com/b"))
+    assert time.monotonic() - start_time >= 0.15
+
+
+def test_async_interface():
+    """测试 asyncio 接口等待期间不阻塞事件循环"""
+    async def run():
+        limiter = RateLimiter(rate=20, burst=1)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            for _ in range(5):
+                await asyncio.sleep(0.02)
+                ticks += 1
+
+        start_time = time.monotonic()
+        await asyncio.gather(ticker(), *[limiter.acquire_async("api") for _ in range(5)])
+        return time.monotonic() - start_time, ticks
+
+    elapsed, ticks = asyncio.run(run())
+    assert elapsed >= 0.19
+    assert ticks == 5
+
+
+def test_unlimited_and_global():
+    """测试速率为 0 时不限速，全局限速器按名称共享"""
+    limiter = RateLimiter(rate=0)
+    start_time = time.monotonic()
+    for _ in range(100):
+        limiter.acquire("any")
+    assert time.monotonic() - start_time < 0.05
+    assert limiter.bucket("any") is None
+
+    assert get_rate_limiter("translate") is get_rate_limiter("translate")
+    assert get_rate_limiter("translate") is not get_rate_limiter("image_upload")
+
+
+if __name__ == "__main__":
+    test_burst_then_rate()
+    test_threads_wait_concurrently()
+    test_per_key_buckets()
+    test_async_interface()
+    test_unlimited_and_global()
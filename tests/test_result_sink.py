@@ -0,0 +1,142 @@
+"""测试后台结果写入器"""
+
+import csv
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.parallel_scraper import ParallelScraper
+from utils.product_store import ProductStore
+from utils.result_sink import CsvSink, ProductStoreSink, ResultSink
+
+FIELDNAMES = ["产品名称", "URL"]
+
+
+def make_product(index):
+    """构造合并了详情的产品数据"""
+    return {
+        "name": f"Product {index}",
+        "url": f"https://www.hollandandbarrett.com/shop/product/product-{index}",
+        "description": f"Description {index}",
+    }
+
+
+def build_row(product):
+    """转换为 CSV 行"""
+    return {"产品名称": product["name"], "URL": product["url"]}
+
+
+def read_rows(path):
+    """读取 CSV"""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def test_csv_sink_batches(tmp_path):
+    """测试按行数分批写出，关闭时写出剩余结果"""
+    output_csv = tmp_path / "out.csv"
+    flushed = []
+    sink = CsvSink(
+        output_csv, FIELDNAMES, row_builder=build_row,
+        flush_rows=3, flush_interval=60, on_flush=lambda batch: flushed.append(len(batch))
+    )
+    with sink:
+        for i in range(7):
+            sink.put(make_product(i))
+
+    rows = read_rows(output_csv)
+    print(f"✓ 写出 {len(rows)} 行，批次: {flushed}")
+    assert [row["产品名称"] for row in rows] == [f"Product {i}" for i in range(7)]
+    assert flushed == [3, 3, 1]
+    assert sink.written == 7
+
+
+def test_checkpoint_and_interval(tmp_path):
+    """测试检查点立即写出，以及未满批次时按时间间隔写出"""
+    output_csv = tmp_path / "out.csv"
+    sink = CsvSink(output_csv, FIELDNAMES, row_builder=build_row, flush_rows=100, flush_interval=0.1)
+    with sink:
+        sink.put(make_product(0))
+        sink.checkpoint()
+        assert len(read_rows(output_csv)) == 1
+
+        sink.put(make_product(1))
+        deadline = time.time() + 5
+        while len(read_rows(output_csv)) < 2 and time.time() < deadline:
+            time.sleep(0.05)
+        assert len(read_rows(output_csv)) == 2
+
+
+def test_append_keeps_header_once(tmp_path):
+    """测试追加模式不重复写表头"""
+    output_csv = tmp_path / "out.csv"
+    with CsvSink(output_csv, FIELDNAMES, row_builder=build_row) as sink:
+        sink.put(make_product(0))
+    with CsvSink(output_csv, FIELDNAMES, row_builder=build_row, append=True) as sink:
+        sink.put(make_product(1))
+
+    assert [row["产品名称"] for row in read_rows(output_csv)] == ["Product 0", "Product 1"]
+
+
+class FailingSink(ResultSink):
+    """写入时出错的写入器"""
+
+    def _write(self, items):
+        raise OSError("disk full")
+
+
+def test_writer_error_surfaces():
+    """测试写入线程的错误在调用方线程抛出"""
+    sink = FailingSink(flush_rows=1).start()
+    sink.put(make_product(0))
+    try:
+        sink.close()
+    except RuntimeError as e:
+        assert "disk full" in str(e)
+    else:
+        raise AssertionError("写入错误未抛出")
+
+
+def test_product_store_sink(tmp_path):
+    """测试写入产品数据库"""
+    with ProductStore(tmp_path / "products.db", FIELDNAMES) as store:
+        with ProductStoreSink(store, "vitamins", flush_rows=2) as sink:
+            for i in range(5):
+                sink.put(make_product(i))
+        assert store.count() == 5
+
+
+def test_parallel_scraper_streams_to_sink(tmp_path):
+    """测试并行爬取结果直接进入写入器，不在内存中累积"""
+    def scrape(driver, url):
+        return {"description": f"details of {url}"}
+
+    scraper = ParallelScraper(max_workers=3, retry_times=1, request_delay=(0, 0), fetch_engine="http")
+    output_csv = tmp_path / "out.csv"
+    with CsvSink(output_csv, FIELDNAMES, row_builder=build_row, flush_rows=4) as sink:
+        results = scraper.scrape_items_parallel(
+            [make_product(i) for i in range(10)], scrape_func=scrape,
+            result_sink=sink, collect_results=False
+        )
+
+    assert results == []
+    assert sorted(row["产品名称"] for row in read_rows(output_csv)) == sorted(f"Product {i}" for i in range(10))
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    for test in (
+        test_csv_sink_batches,
+        test_checkpoint_and_interval,
+        test_append_keeps_header_once,
+        test_product_store_sink,
+        test_parallel_scraper_streams_to_sink,
+    ):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test(Path(temp_dir))
+    test_writer_error_surfaces()
@@ -0,0 +1,100 @@
+"""测试增量爬取状态"""
+
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from utils.scrape_state import ScrapeState, product_id
+
+
+def make_product(index, price="£10.99"):
+    """构造列表页产品数据"""
+    return {
+        "brand": "Brand",
+        "name": f"Product {index}",
+        "price": price,
+        "image": f"https://images.example.com/{index}.jpg",
+        "url": f"https://www.hollandandbarrett.com/shop/product/product-{index}",
+    }
+
+
+def with_details(product):
+    """模拟详情爬取结果"""
+    return {**product, "highlights": f"highlights of {product['name']}", "description": "desc", "ingredients": "x"}
+
+
+def test_split_new_changed_and_unchanged(tmp_path):
+    """测试新产品、列表数据变化的产品需要爬取，未变化的产品复用详情"""
+    state_file = tmp_path / "state.json"
+    state = ScrapeState(state_file)
+    products = [make_product(i) for i in range(10)]
+
+    reused, to_scrape = state.split(products)
+    assert reused == [] and len(to_scrape) == 10
+
+    assert state.record_many([with_details(product) for product in products]) == 10
+    state.save()
+
+    # 下一次运行：1 个产品降价，1 个新产品
+    next_products = [make_product(i) for i in range(10)] + [make_product(10)]
+    next_products[3]["price"] = "£8.99"
+    state = ScrapeState(state_file)
+    reused, to_scrape = state.split(next_products)
+
+    print(f"✓ 复用 {len(reused)} 个，需要爬取 {len(to_scrape)} 个")
+    assert [product["name"] for product in to_scrape] == ["Product 3", "Product 10"]
+    assert len(reused) == 9
+    assert reused[0]["highlights"] == "highlights of Product 0"
+    assert state.check(next_products[3]) == "changed"
+    assert state.check(next_products[10]) == "new"
+
+
+def test_stale_records(tmp_path):
+    """测试超过有效期的产品需要重新爬取"""
+    state = ScrapeState(tmp_path / "state.json", max_age=0.05)
+    product = make_product(1)
+    state.record(with_details(product))
+    assert state.check(product) is None
+
+    time.sleep(0.1)
+    assert state.check(product) == "stale"
+
+
+def test_failed_details_not_recorded(tmp_path):
+    """测试未获取到详情的产品不会记录，下次仍会爬取"""
+    state = ScrapeState(tmp_path / "state.json")
+    product = make_product(1)
+    assert not state.record(product)
+    assert state.check(product) == "new"
+
+
+def test_product_id_ignores_query():
+    """测试产品标识忽略查询参数"""
+    url = "https://www.hollandandbarrett.com/shop/product/biotin-60-gummies-6100000123"
+    assert product_id(url) == product_id(url + "?skuid=123#reviews")
+
+
+def test_corrupt_state_file(tmp_path):
+    """测试状态文件损坏时回退为全量爬取"""
+    state_file = tmp_path / "state.json"
+    state_file.write_text("{not json", encoding="utf-8")
+    state = ScrapeState(state_file)
+    assert state.check(make_product(1)) == "new"
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    for test in (
+        test_split_new_changed_and_unchanged,
+        test_stale_records,
+        test_failed_details_not_recorded,
+        test_corrupt_state_file,
+    ):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test(Path(temp_dir))
+    test_product_id_ignores_query()
@@ -0,0 +1,387 @@
+"""异步爬取工具 - 使用 asyncio + httpx 高并发抓取详情页（不启动浏览器）"""
+
+import asyncio
+import random
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from utils.http_fetcher import LAYOUT_MARKER, build_headers
+from utils.logger import get_logger
+from utils.page_cache import PageCache, conditional_headers
+from utils.rate_limiter import RateLimiter, host_of
+from utils.parallel_scraper import save_failed_items
+
+
+# 需要退避重试的 HTTP 状态码
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class AsyncScraper:
+    """异步并发爬取管理器"""
+
+    def __init__(
+        self,
+        max_concurrency: int = 100,
+        retry_times: int = 3,
+        request_delay: tuple = (0, 0),
+        per_host_rate: float = 10.0,
+        timeout: float = 30.0,
+        client: Optional[httpx.AsyncClient] = None,
+        cache: Optional[PageCache] = None
+    ):
+        """
+        初始化异步爬取器
+
+        Args:
+            max_concurrency: 同时进行中的请求上限（信号量大小）
+            retry_times: 失败重试次数
+            request_delay: 每个请求前的随机抖动范围(最小, 最大)秒
+            per_host_rate: 每个主机每秒最多请求数，<= 0 表示不限速
+            timeout: 请求超时时间（秒）
+            client: 外部传入的 httpx.AsyncClient（测试时注入 MockTransport 使用）
+            cache: 页面缓存，None 表示不缓存
+        """
+        self.max_concurrency = max_concurrency
+        self.retry_times = retry_times
+        self.request_delay = request_delay
+        self.per_host_rate = per_host_rate
+        self.timeout = timeout
+        self.client = client
+        self.cache = cache
+        self.logger = get_logger()
+        self.failed_items = []  # 记录失败的产品
+
+    def _create_client(self) -> httpx.AsyncClient:
+        """创建共享连接池的异步 HTTP 客户端"""
+        return httpx.AsyncClient(
+            headers=build_headers(),
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency
+            ),
+        )
+
+    async def _fetch_html(self, client: httpx.AsyncClient, url: str) -> str:
+        """
+        获取页面 HTML，状态码异常或缺少 __LAYOUT__ 时抛出异常以触发重试
+
+        启用缓存时优先读取未过期的缓存（命中时不占用主机限速配额）；缓存已过期但有
+        ETag / Last-Modified 时发送条件请求，304 时复用缓存内容；请求成功后写入缓存。
+
+        Args:
+            client: 异步 HTTP 客户端
+            url: 页面URL
+
+        Returns:
+            页面 HTML 文本
+        """
+        entry = None
+        if self.cache is not None:
+            # 缓存读写涉及磁盘 IO 和解压，放到线程中执行
+            entry = await asyncio.to_thread(self.cache.get_entry, url, True)
+            if entry is not None and entry["fresh"]:
+                return entry["html"]
+
+        await self.host_limiter.acquire_async(host_of(url))
+        response = await client.get(url, headers=conditional_headers(entry))
+
+        if response.status_code == 304 and entry is not None:
+            await asyncio.to_thread(self.cache.mark_not_modified, url)
+            return entry["html"]
+
+        if response.status_code != 200:
+            raise httpx.HTTPStatusError(
+                f"HTTP 状态码 {response.status_code}",
+                request=response.request,
+                response=response
+            )
+
+        html_content = response.text
+        if LAYOUT_MARKER not in html_content:
+            raise ValueError("未找到__LAYOUT__数据")
+
+        if self.cache is not None:
+            await asyncio.to_thread(
+                self.cache.put,
+                url,
+                html_content,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified")
+            )
+
+        return html_content
+
+    async def _scrape_single_item(
+        self,
+        client: httpx.AsyncClient,
+        item_data: Dict,
+        parse_func: Callable,
+        item_index: int,
+        total_items: int
+    ) -> Dict:
+        """
+        抓取并解析单个项目（带重试机制）
+
+        Args:
+            client: 异步 HTTP 客户端
+            item_data: 项目数据
+            parse_func: 解析函数，接收 html 返回详情字典
+            item_index: 当前索引
+            total_items: 总数
+
+        Returns:
+            Dict: 更新后的项目数据
+        """
+        url = item_data.get("url", "")
+
+        for attempt in range(1, self.retry_times + 1):
+            # 每次尝试单独占用并发名额，退避等待期间释放，不阻塞其他产品
+            backoff = None
+            async with self.semaphore:
+                if attempt == 1 and self.request_delay[1] > 0:
+                    await asyncio.sleep(random.uniform(*self.request_delay))
+
+                try:
+                    if attempt > 1:
+                        self.logger.warning(
+                            f"[{item_index}/{total_items}] 重试 {attempt}/{self.retry_times}: {url}"
+                        )
+                    else:
+                        self.logger.debug(f"[{item_index}/{total_items}] 开始爬取: {url}")
+
+                    html_content = await self._fetch_html(client, url)
+
+                    # 解析在线程中执行，避免阻塞事件循环中的其他请求
+                    details = await asyncio.to_thread(parse_func, html_content)
+                    if not details:
+                        raise ValueError("未解析到详情数据")
+
+                    self.logger.info(
+                        f"[{item_index}/{total_items}] ✓ 完成: {item_data.get('name', 'Unknown')[:40]}"
+                    )
+                    return {**item_data, **details}
+
+                except Exception as e:
+                    error_msg = str(e) or type(e).__name__
+                    # 404 等确定性错误无需重试
+                    retryable = not (
+                        isinstance(e, httpx.HTTPStatusError)
+                        and e.response.status_code not in RETRYABLE_STATUS_CODES
+                    )
+                    if retryable and attempt < self.retry_times:
+                        self.logger.warning(
+                            f"[{item_index}/{total_items}] 失败 (尝试 {attempt}/{self.retry_times}): "
+                            f"{error_msg[:100]}"
+                        )
+                        # 指数退避，429/5xx 时给服务器喘息时间
+                        backoff = min(2 ** attempt, 30)
+                    else:
+                        self.logger.error(
+                            f"[{item_index}/{total_items}] ✗ 最终失败: {error_msg[:100]}"
+                        )
+                        self.failed_items.append({
+                            "item_data": item_data,
+                            "error": error_msg[:200],
+                            "timestamp": datetime.now().isoformat(),
+                            "url": url
+                        })
+                        break
+
+            await asyncio.sleep(backoff)
+
+        # 所有重试都失败，返回原始数据
+        return item_data
+
+    async def scrape_items(
+        self,
+        items: List[Dict],
+        parse_func: Callable,
+        max_items: int = None,
+        batch_size: int = None,
+        batch_callback: Callable = None
+    ) -> List[Dict]:
+        """
+        异步并发爬取多个项目
+
+        Args:
+            items: 要爬取的项目列表
+            parse_func: 解析函数，接收 html 返回详情字典
+            max_items: 最大爬取数量，None表示全部
+            batch_size: 分批大小，每爬取N个就调用回调函数，None表示不分批
+            batch_callback: 分批回调函数，接收(batch_results, batch_num)参数
+
+        Returns:
+            List[Dict]: 爬取后的数据列表（按完成顺序）
+        """
+        items_to_scrape = items[:max_items] if max_items else items
+        total_items = len(items_to_scrape)
+        if not total_items:
+            return []
+
+        self.logger.info(
+            f"开始异步爬取 {total_items} 个项目\n"
+            f"  - 最大并发请求: {self.max_concurrency}\n"
+            f"  - 重试次数: {self.retry_times}\n"
+            f"  - 单主机限速: {self.per_host_rate or '不限'} 次/秒"
+        )
+
+        # 信号量需要在事件循环内创建
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        # 按主机的令牌桶（容量为 1：同一主机的请求均匀间隔 1/rate 秒）
+        self.host_limiter = RateLimiter(self.per_host_rate)
+
+        start_time = time.time()
+        results = []
+        batch_results = []
+        completed_count = 0
+        success_count = 0
+        failed_count = 0
+        batch_num = 0
+
+        client = self.client or self._create_client()
+        try:
+            tasks = [
+                asyncio.create_task(
+                    self._scrape_single_item(client, item, parse_func, idx + 1, total_items)
+                )
+                for idx, item in enumerate(items_to_scrape)
+            ]
+
+            for task in asyncio.as_completed(tasks):
+                result = await task
+                results.append(result)
+                batch_results.append(result)
+                completed_count += 1
+
+                if any(key in result for key in ['highlights', 'description', 'directions']):
+                    success_count += 1
+                else:
+                    failed_count += 1
+
+                # 批次回调放到线程中执行，避免写文件阻塞事件循环
+                if batch_size and batch_callback and len(batch_results) >= batch_size:
+                    batch_num += 1
+                    self.logger.info(
+                        f"\n📦 批次 {batch_num}: 已完成 {len(batch_results)} 个产品，正在写入CSV..."
+                    )
+                    await asyncio.to_thread(batch_callback, batch_results, batch_num)
+                    batch_results = []
+
+                if completed_count % 20 == 0 or completed_count == total_items:
+                    elapsed = time.time() - start_time
+                    self.logger.info(
+                        f"进度: {completed_count}/{total_items} "
+                        f"({completed_count/total_items*100:.1f}%) - "
+                        f"成功: {success_count}, 失败: {failed_count} - "
+                        f"已用时: {elapsed:.1f}s"
+                    )
+
+            if batch_size and batch_callback and batch_results:
+                batch_num += 1
+                self.logger.info(
+                    f"\n📦 批次 {batch_num} (最后一批): 已完成 {len(batch_results)} 个产品，正在写入CSV..."
+                )
+                await asyncio.to_thread(batch_callback, batch_results, batch_num)
+        finally:
+            if self.client is None:
+                await client.aclose()
+
+        elapsed = time.time() - start_time
+        self.logger.info(
+            f"\n异步爬取完成!\n"
+            f"  - 总耗时: {elapsed:.1f}s\n"
+            f"  - 吞吐量: {total_items/elapsed if elapsed else 0:.2f} 项/秒\n"
+            f"  - 成功: {success_count}/{total_items} ({success_count/total_items*100:.1f}%)\n"
+            f"  - 失败: {failed_count}/{total_items} ({failed_count/total_items*100:.1f}%)"
+        )
+
+        if self.failed_items:
+            save_failed_items(self.failed_items, self.logger)
+
+        return results
+
+
+async def async_scrape_details(
+    products: List[Dict],
+    parse_detail_func: Callable,
+    max_workers: int = None,
+    max_products: int = None,
+    retry_times: int = 3,
+    request_delay: tuple = (0, 0),
+    batch_size: int = None,
+    batch_callback: Callable = None,
+    per_host_rate: float = None
+) -> List[Dict]:
+    """
+    异步爬取产品详情（协程版本，可在已有事件循环中 await）
+
+    Args:
+        products: 产品列表
+        parse_detail_func: 详情解析函数，接收 html 返回详情字典
+        max_workers: 最大并发请求数，None 表示从配置文件读取
+        max_products: 最大产品数
+        retry_times: 失败重试次数，默认3
+        request_delay: 每个请求前的随机抖动范围(秒)，默认不抖动
+        batch_size: 分批大小，每爬取N个就写入CSV，默认None（不分批）
+        batch_callback: 分批回调函数，接收(batch_results, batch_num)
+        per_host_rate: 每个主机每秒最多请求数，None 表示从配置文件读取
+
+    Returns:
+        List[Dict]: 包含详情的产品列表
+    """
+    import config
+    from utils.page_cache import get_page_cache
+
+    scraper = AsyncScraper(
+        max_concurrency=max_workers or config.ASYNC_MAX_CONCURRENCY,
+        retry_times=retry_times,
+        request_delay=request_delay,
+        per_host_rate=config.ASYNC_PER_HOST_RATE if per_host_rate is None else per_host_rate,
+        timeout=config.HTTP_TIMEOUT,
+        cache=get_page_cache()
+    )
+    return await scraper.scrape_items(
+        items=products,
+        parse_func=parse_detail_func,
+        max_items=max_products,
+        batch_size=batch_size,
+        batch_callback=batch_callback
+    )
+
+
+def scrape_details_async(
+    products: List[Dict],
+    parse_detail_func: Callable,
+    max_workers: int = None,
+    max_products: int = None,
+    retry_times: int = 3,
+    request_delay: tuple = (0, 0),
+    batch_size: int = None,
+    batch_callback: Callable = None,
+    per_host_rate: float = None
+) -> List[Dict]:
+    """
+    异步爬取产品详情的便捷函数（同步调用，参数与 scrape_details_parallel 对应）
+
+    与 scrape_details_parallel 的区别：第二个参数是解析函数（html -> 详情字典），
+    而不是接收 (driver, url) 的爬取函数；max_workers 表示同时进行中的请求数。
+
+    Returns:
+        List[Dict]: 包含详情的产品列表
+    """
+    return asyncio.run(async_scrape_details(
+        products=products,
+        parse_detail_func=parse_detail_func,
+        max_workers=max_workers,
+        max_products=max_products,
+        retry_times=retry_times,
+        request_delay=request_delay,
+        batch_size=batch_size,
+        batch_callback=batch_callback,
+        per_host_rate=per_host_rate
+    ))
@@ -0,0 +1,293 @@
+"""批量翻译 - 相同原文只翻译一次，多条短文本合并为一次请求（JSON 结构化返回），超长文本按 token 预算拆分"""
+
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from tqdm import tqdm
+
+from utils.rate_limiter import RateLimiter
+
+SYSTEM_PROMPT = (
+    "你是一个专业的翻译助手。翻译规则：\n"
+    "1. 只翻译产品信息，不解释、不增删\n"
+    "2. 完全删除所有地址信息（包括街道地址、邮编、城市、国家等）\n"
+    "3. 保持原有的格式（如分号分隔、换行等）\n"
+    "4. 如果内容只包含地址，返回空字符串\n"
+    "5. 输入为 JSON：{\"items\": [{\"id\": 编号, \"text\": 原文}]}，逐条独立翻译，"
+    "只返回 JSON：{\"translations\": [{\"id\": 编号, \"text\": 译文}]}，编号与输入一致，不要遗漏"
+)
+
+# 短于该长度的文本不翻译
+MIN_TEXT_LENGTH = 3
+# 每条文本在请求中的额外 token 开销（JSON 结构和编号）
+ITEM_OVERHEAD_TOKENS = 8
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    估算文本的 token 数（不依赖分词器：ASCII 约 4 个字符一个 token，其他字符约一个字符一个 token）
+
+    Args:
+        text: 文本
+
+    Returns:
+        估算的 token 数
+    """
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+def _hard_split(text: str, max_tokens: int) -> List[str]:
+    """按字符数硬切分（单个句子仍超出预算时使用）"""
+    pieces = []
+    start = 0
+    while start < len(text):
+        end = start + 1
+        # 二分出不超过预算的最长前缀
+        low, high = start + 1, len(text)
+        while low <= high:
+            middle = (low + high) // 2
+            if estimate_tokens(text[start:middle]) <= max_tokens:
+                end, low = middle, middle + 1
+            else:
+                high = middle - 1
+        pieces.append(text[start:end])
+        start = end
+    return pieces
+
+
+def split_text(text: str, max_tokens: int) -> List[Tuple[str, str]]:
+    """
+    把超长文本拆分为不超过 token 预算的片段
+
+    优先在换行处拆分，单行仍超出预算时在句末拆分，单句仍超出时按字符数拆分。
+
+    Args:
+        text: 原文
+        max_tokens: 每个片段的 token 预算
+
+    Returns:
+        [(片段, 片段之后的分隔符)]，按顺序拼接译文和分隔符即得到完整译文
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [(text, "")]
+
+    # 先拆成 (行, 换行符) 单元，超长的行再按句子 / 字符拆开
+    units: List[Tuple[str, str]] = []
+    parts = re.split(r"(\n+)", text)
+    for line, newline in zip(parts[::2], parts[1::2] + [""]):
+        if estimate_tokens(line) <= max_tokens:
+            units.append((line, newline))
+            continue
+        sentences = re.split(r"(?<=[.!?;。！？；])\s+", line)
+        for index, sentence in enumerate(sentences):
+            separator = newline if index == len(sentences) - 1 else " "
+            if estimate_tokens(sentence) <= max_tokens:
+                units.append((sentence, separator))
+            else:
+                pieces = _hard_split(sentence, max_tokens)
+                units.extend((piece, "") for piece in pieces[:-1])
+                units.append((pieces[-1], separator))
+
+    # 相邻单元在预算内合并，减少片段数
+    chunks: List[Tuple[str, str]] = []
+    current, current_separator = "", ""
+    for unit, separator in units:
+        candidate = current + current_separator + unit if current else unit
+        if current and estimate_tokens(candidate) > max_tokens:
+            chunks.append((current, current_separator))
+            current = unit
+        else:
+            current = candidate
+        current_separator = separator
+    chunks.append((current, current_separator))
+    return [(chunk, separator) for chunk, separator in chunks if chunk.strip() or separator]
+
+
+class BatchTranslator:
+    """
+    批量翻译器
+
+    相同的原文只翻译一次；多条文本按 token 预算合并为一次请求，要求模型按编号返回 JSON；
+    超长文本拆分后与其他文本一起分批，翻译完成后按原顺序拼接。多个批次并发请求，
+    每次请求（包括重试）从令牌桶获取令牌。
+    """
+
+    def __init__(
+        self,
+        client,
+        rate_limiter: RateLimiter,
+        model: str = "gpt-4o-mini",
+        target_lang: str = "中文",
+        max_batch_tokens: int = None,
+        max_batch_items: int = None,
+        max_workers: int = 5,
+        max_retries: int = 3
+    ):
+        """
+        初始化批量翻译器
+
+        Args:
+            client: OpenAI 客户端
+            rate_limiter: 翻译 API 限速器
+            model: 模型名称
+            target_lang: 目标语言
+            max_batch_tokens: 每次请求的原文 token 预算，None 表示从配置文件读取
+            max_batch_items: 每次请求最多的文本条数，None 表示从配置文件读取
+            max_workers: 并发请求数
+            max_retries: 每个批次的最大尝试次数（遗漏的条目会在下一次尝试中重新请求）
+        """
+        import config
+
+        self.client = client
+        self.rate_limiter = rate_limiter
+        self.model = model
+        self.target_lang = target_lang
+        self.max_batch_tokens = max_batch_tokens or config.TRANSLATE_BATCH_TOKENS
+        self.max_batch_items = max_batch_items or config.TRANSLATE_BATCH_ITEMS
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.requests = 0
+
+    def _request(self, texts: List[str]) -> Dict[int, str]:
+        """
+        发送一次批量翻译请求
+
+        Args:
+            texts: 原文列表（编号为下标）
+
+        Returns:
+            {编号: 译文}，只包含模型返回的有效条目
+        """
+        self.rate_limiter.acquire()
+        self.requests += 1
+        payload = json.dumps({"items": [{"id": index, "text": text} for index, text in enumerate(texts)]},
+                             ensure_ascii=False)
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": f"请将以下内容翻译为{self.target_lang}，并删除所有地址信息：\n{payload}"},
+            ],
+            response_format={"type": "json_object"},
+            timeout=120,
+        )
+        data = json.loads(response.choices[0].message.content)
+
+        results = {}
+        for item in data.get("translations", []):
+            index = item.get("id") if isinstance(item, dict) else None
+            if isinstance(index, int) and 0 <= index < len(texts) and isinstance(item.get("text"), str):
+                results[index] = item["text"].strip()
+        return results
+
+    def _translate_batch(self, texts: List[str]) -> Dict[str, str]:
+        """
+        翻译一个批次，失败或遗漏的条目重试
+
+        Args:
+            texts: 原文列表
+
+        Returns:
+            {原文: 译文}，多次尝试后仍失败的条目不包含在内
+        """
+        translated: Dict[str, str] = {}
+        pending = list(texts)
+        for attempt in range(self.max_retries):
+            try:
+                results = self._request(pending)
+            except Exception as e:
+                tqdm.write(f"   ⚠️ 批量翻译失败 (尝试 {attempt + 1}/{self.max_retries}, {len(pending)} 条): {e}")
+                results = {}
+            for index, text in results.items():
+                translated[pending[index]] = text
+            pending = [text for index, text in enumerate(pending) if index not in results]
+            if not pending:
+                break
+            if attempt < self.max_retries - 1:
+                time.sleep(3)
+
+        if pending:
+            tqdm.write(f"   ✗ {len(pending)} 条达到最大重试次数，未翻译")
+        return translated
+
+    def _make_batches(self, texts: List[str]) -> List[List[str]]:
+        """按 token 预算和条数上限分批（原文按长度排序，批次大小更均匀）"""
+        batches: List[List[str]] = []
+        current: List[str] = []
+        current_tokens = 0
+        for text in sorted(texts, key=len):
+            tokens = estimate_tokens(text) + ITEM_OVERHEAD_TOKENS
+            if current and (current_tokens + tokens > self.max_batch_tokens or len(current) >= self.max_batch_items):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def translate_many(
+        self,
+        texts: Iterable[str],
+        on_translated: Optional[Callable[[Dict[str, str]], None]] = None
+    ) -> Dict[str, str]:
+        """
+        翻译一组文本（去重、分批、并发）
+
+        Args:
+            texts: 原文（可以有重复，空文本和过短的文本原样返回）
+            on_translated: 每个批次完成后调用，参数为本批次完成的 {原文: 译文}（在调用线程中执行）
+
+        Returns:
+            {原文: 译文}，翻译失败的原文不包含在内
+        """
+        results: Dict[str, str] = {}
+        # 原文 -> [(片段, 分隔符)]
+        pieces_by_text: Dict[str, List[Tuple[str, str]]] = {}
+        # 片段 -> 引用该片段的原文
+        texts_by_piece: Dict[str, List[str]] = {}
+
+        for text in texts:
+            if text in results or text in pieces_by_text:
+                continue
+            if not text or len(text.strip()) < MIN_TEXT_LENGTH:
+                results[text] = text
+                continue
+            pieces = split_text(text.strip(), max(self.max_batch_tokens - ITEM_OVERHEAD_TOKENS, 1))
+            pieces_by_text[text] = pieces
+            for piece, _ in pieces:
+                if piece.strip():
+                    texts_by_piece.setdefault(piece, []).append(text)
+
+        if results and on_translated is not None:
+            on_translated(dict(results))
+
+        translated_pieces: Dict[str, str] = {}
+        batches = self._make_batches(list(texts_by_piece))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._translate_batch, batch) for batch in batches]
+            for future in as_completed(futures):
+                batch_results = future.result()
+                translated_pieces.update(batch_results)
+
+                # 所有片段都已翻译的原文拼接为完整译文
+                completed = {}
+                for piece in batch_results:
+                    for text in texts_by_piece[piece]:
+                        if text in results:
+                            continue
+                        pieces = pieces_by_text[text]
+                        if all(not piece.strip() or piece in translated_pieces for piece, _ in pieces):
+                            completed[text] = "".join(
+                                (translated_pieces[piece] if piece.strip() else piece) + separator
+                                for piece, separator in pieces
+                            ).strip()
+                results.update(completed)
+                if completed and on_translated is not None:
+                    on_translated(completed)
+
+        return results
@@ -0,0 +1,243 @@
+"""自适应并发控制 - 根据延迟、错误率和 429/5xx 响应按 AIMD 规则调整并发数和请求间隔"""
+
+import random
+import time
+from threading import Condition, local
+from typing import Dict, List, Optional
+
+from utils.logger import get_logger
+
+
+# 服务端限流信号：立即降低并发
+THROTTLE_STATUS_CODES = {429, 503}
+# 服务端错误：计入错误率
+ERROR_STATUS_CODES = {500, 502, 504}
+# 延迟基线下限（秒），避免极短的延迟因抖动被判定为明显升高
+LATENCY_FLOOR = 0.1
+
+_current = local()
+
+
+def report_status(status_code: int):
+    """
+    记录当前线程正在进行的请求的 HTTP 状态码
+
+    由抓取器在收到响应后调用；当前线程不在并发槽位内时忽略。
+
+    Args:
+        status_code: HTTP 状态码
+    """
+    slot = getattr(_current, "slot", None)
+    if slot is not None:
+        slot.status = status_code
+
+
+class _Slot:
+    """一次请求占用的并发槽位（上下文管理器，退出时向控制器报告结果）"""
+
+    def __init__(self, controller: "AdaptiveConcurrency", epoch: int):
+        self.controller = controller
+        self.epoch = epoch
+        self.status: Optional[int] = None
+        self.success = True
+        self._start = 0.0
+
+    def __enter__(self) -> "_Slot":
+        time.sleep(self.controller.next_delay())
+        self._start = time.monotonic()
+        _current.slot = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _current.slot = None
+        if exc_type is not None:
+            self.success = False
+        self.controller._release(self, time.monotonic() - self._start)
+        return False
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD 并发控制器（线程安全）
+
+    每完成 window 个请求评估一次：错误率或延迟中位数明显升高时并发数乘以
+    decrease_factor、请求间隔加倍；否则并发数加 1、请求间隔缩短。收到 429/503
+    时立即降低，同一轮中已在途的请求再次收到限流响应不会重复降低。
+
+    adaptive=False 时并发数和请求间隔固定（与原来的信号量 + 随机延迟一致）。
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int = 1,
+        max_limit: Optional[int] = None,
+        request_delay: tuple = (1, 3),
+        min_delay: float = 0.5,
+        max_delay: float = 30.0,
+        adaptive: bool = True,
+        window: int = 20,
+        max_error_rate: float = 0.2,
+        latency_tolerance: float = 2.0,
+        decrease_factor: float = 0.5
+    ):
+        """
+        初始化并发控制器
+
+        Args:
+            initial_limit: 初始并发数
+            min_limit: 最小并发数
+            max_limit: 最大并发数，None 表示等于初始并发数
+            request_delay: 请求间隔范围(最小, 最大)秒，最小值为初始间隔，范围宽度为随机抖动
+            min_delay: 自适应时请求间隔下限（秒）
+            max_delay: 自适应时请求间隔上限（秒）
+            adaptive: 是否根据运行情况调整
+            window: 每多少个请求评估一次
+            max_error_rate: 错误率超过该值时降低并发
+            latency_tolerance: 延迟中位数超过基线的倍数时降低并发
+            decrease_factor: 降低并发时的乘数
+        """
+        self.max_limit = max(max_limit or initial_limit, initial_limit)
+        self.min_limit = max(1, min(min_limit, initial_limit))
+        self.limit = initial_limit
+        self.request_delay = request_delay
+        self.delay = float(request_delay[0])
+        self.jitter = max(0.0, request_delay[1] - request_delay[0])
+        self.min_delay = min(min_delay, self.delay)
+        self.max_delay = max(max_delay, self.delay)
+        self.adaptive = adaptive
+        self.window = window
+        self.max_error_rate = max_error_rate
+        self.latency_tolerance = latency_tolerance
+        self.decrease_factor = decrease_factor
+        self.logger = get_logger()
+
+        self.baseline: Optional[float] = None  # 延迟基线（各轮中位数的下限，缓慢上浮）
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.decisions: List[Dict] = []
+
+        self._cond = Condition()
+        self._in_flight = 0
+        self._epoch = 0
+        self._samples: List[tuple] = []
+
+    def slot(self) -> _Slot:
+        """
+        等待并占用一个并发槽位
+
+        Returns:
+            槽位上下文管理器（进入时按当前间隔等待，退出时报告延迟和结果）
+        """
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+            return _Slot(self, self._epoch)
+
+    def next_delay(self) -> float:
+        """
+        本次请求前的等待时间
+
+        Returns:
+            等待秒数
+        """
+        if not self.adaptive:
+            return random.uniform(*self.request_delay)
+        return self.delay + random.uniform(0, self.jitter)
+
+    def _release(self, slot: _Slot, latency: float):
+        """释放槽位并记录结果"""
+        with self._cond:
+            self._in_flight -= 1
+            self.requests += 1
+
+            throttled = slot.status in THROTTLE_STATUS_CODES
+            failed = not slot.success or throttled or slot.status in ERROR_STATUS_CODES
+            self.throttled += throttled
+            self.errors += failed
+
+            if self.adaptive:
+                if throttled:
+                    # 降低之前发出的请求随后也会收到限流响应，只按第一次降低
+                    if slot.epoch == self._epoch:
+                        self._decrease(f"HTTP {slot.status}")
+                else:
+                    self._samples.append((latency, failed))
+                    if len(self._samples) >= self.window:
+                        self._evaluate()
+
+            self._cond.notify_all()
+
+    def _evaluate(self):
+        """根据最近一轮的错误率和延迟调整"""
+        samples, self._samples = self._samples, []
+        error_rate = sum(failed for _, failed in samples) / len(samples)
+        latencies = sorted(latency for latency, failed in samples if not failed)
+        median = latencies[len(latencies) // 2] if latencies else None
+
+        if median is not None:
+            self.baseline = median if self.baseline is None else min(median, self.baseline * 1.05)
+
+        if error_rate > self.max_error_rate:
+            self._decrease(f"错误率 {error_rate:.0%}")
+        elif median is not None and median > max(self.baseline, LATENCY_FLOOR) * self.latency_tolerance:
+            self._decrease(f"延迟中位数 {median:.1f}s 超过基线 {self.baseline:.1f}s 的 {self.latency_tolerance} 倍")
+        else:
+            median_text = f"{median:.1f}s" if median is not None else "-"
+            self._increase(f"错误率 {error_rate:.0%}，延迟中位数 {median_text}")
+
+    def _increase(self, reason: str):
+        """加性增加并发数，缩短请求间隔"""
+        old_limit, old_delay = self.limit, self.delay
+        self.limit = min(self.max_limit, self.limit + 1)
+        self.delay = max(self.min_delay, self.delay * 0.75)
+        if (self.limit, round(self.delay, 2)) != (old_limit, round(old_delay, 2)):
+            self._record("increase", old_limit, old_delay, reason)
+
+    def _decrease(self, reason: str):
+        """乘性降低并发数，加倍请求间隔"""
+        old_limit, old_delay = self.limit, self.delay
+        self.limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+        self.delay = min(self.max_delay, max(self.delay * 2, 1.0))
+        self._epoch += 1
+        self._samples = []
+        self._record("decrease", old_limit, old_delay, reason)
+
+    def _record(self, action: str, old_limit: int, old_delay: float, reason: str):
+        """记录一次调整"""
+        self.decisions.append({
+            "time": time.time(),
+            "action": action,
+            "limit": self.limit,
+            "delay": round(self.delay, 2),
+            "reason": reason,
+        })
+        message = (
+            f"⚙ 并发调整: {old_limit} → {self.limit}，"
+            f"请求间隔 {old_delay:.1f}s → {self.delay:.1f}s（{reason}）"
+        )
+        if action == "decrease":
+            self.logger.warning(message)
+        else:
+            self.logger.info(message)
+
+    def stats(self) -> Dict:
+        """
+        获取运行统计
+
+        Returns:
+            包含当前并发数、请求间隔、请求数、错误数、限流次数和调整次数的字典
+        """
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "delay": round(self.delay, 2),
+                "in_flight": self._in_flight,
+                "requests": self.requests,
+                "errors": self.errors,
+                "throttled": self.throttled,
+                "increases": sum(d["action"] == "increase" for d in self.decisions),
+                "decreases": sum(d["action"] == "decrease" for d in self.decisions),
+            }
@@ -0,0 +1,185 @@
+"""详情爬取断点 - 记录已写出的产品URL和输出文件偏移，中断后跳过已完成的产品"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from utils.logger import get_logger
+
+
+class DetailCheckpoint:
+    """
+    详情爬取断点（追加式 JSONL 文件）
+
+    第一行记录输出目标，之后每写出一批追加一行:
+        {"target": 输出目标}
+        {"urls": [本批产品URL], "offset": 写出后CSV文件的字节数}
+
+    只有写出并刷新到文件后才记录，因此断点中的产品一定已在输出中；
+    恢复时把 CSV 截断到最后一次记录的偏移，去掉中断时写了一半的批次。
+    """
+
+    def __init__(self, checkpoint_file: Path, target: str):
+        """
+        初始化断点
+
+        Args:
+            checkpoint_file: 断点文件路径
+            target: 输出目标标识（如CSV路径），与断点记录不一致时忽略断点
+        """
+        self.checkpoint_file = Path(checkpoint_file)
+        self.target = str(target)
+        self.logger = get_logger()
+        self.completed: set = set()
+        self.offset: Optional[int] = None
+        self._batches: List[Dict] = []
+
+    def load(self) -> int:
+        """
+        读取断点文件
+
+        Returns:
+            int: 已完成的产品数
+        """
+        self.completed = set()
+        self.offset = None
+        self._batches = []
+        if not self.checkpoint_file.exists():
+            return 0
+
+        try:
+            with open(self.checkpoint_file, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError as e:
+            self.logger.warning(f"读取详情断点失败: {e}")
+            return 0
+
+        for index, line in enumerate(lines):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # 最后一行可能在写入时中断，之前的记录仍然有效
+                self.logger.warning("详情断点最后一条记录不完整，已忽略")
+                break
+            if index == 0:
+                if record.get("target") != self.target:
+                    self.logger.info("详情断点对应的输出文件不同，忽略断点")
+                    return 0
+                continue
+            self._batches.append(record)
+
+        for batch in self._batches:
+            self.completed.update(batch["urls"])
+            if batch.get("offset") is not None:
+                self.offset = batch["offset"]
+        return len(self.completed)
+
+    def reconcile(self, output_csv: Optional[Path] = None):
+        """
+        使输出文件与断点一致
+
+        CSV 比断点记录长时截断多出的部分（写了一半的批次）；CSV 比断点记录短时
+        （如系统崩溃导致最后几批未落盘）丢弃超出文件长度的批次，这些产品会重新爬取。
+
+        Args:
+            output_csv: 输出CSV路径，None 表示输出不是CSV（如数据库，每批一次事务无需处理）
+        """
+        if output_csv is None or self.offset is None:
+            return
+
+        output_csv = Path(output_csv)
+        size = output_csv.stat().st_size if output_csv.exists() else 0
+
+        kept = []
+        offset = None
+        for batch in self._batches:
+            if batch.get("offset") is not None and batch["offset"] > size:
+                break
+            kept.append(batch)
+            if batch.get("offset") is not None:
+                offset = batch["offset"]
+
+        if len(kept) < len(self._batches):
+            self.logger.warning(
+                f"输出文件缺少 {len(self._batches) - len(kept)} 批已记录的产品，将重新爬取这些产品"
+            )
+        self._batches = kept
+        self.completed = {url for batch in kept for url in batch["urls"]}
+        self.offset = offset
+
+        target_size = offset or 0
+        if size > target_size:
+            with open(output_csv, "r+b") as f:
+                f.truncate(target_size)
+            self.logger.info(f"已截断未完成的批次: {output_csv.name} {size} → {target_size} 字节")
+
+        # 重写断点文件，去掉被丢弃的批次
+        self._rewrite()
+
+    def start(self):
+        """开始新的断点（清除旧记录）"""
+        self.completed = set()
+        self.offset = None
+        self._batches = []
+        self._rewrite()
+
+    def record(self, urls: Iterable[str], offset: Optional[int] = None):
+        """
+        记录一批已写出的产品（在写入线程中调用）
+
+        Args:
+            urls: 产品URL
+            offset: 写出后CSV文件的字节数，输出不是CSV时为 None
+        """
+        batch = {"urls": list(urls), "offset": offset}
+        self._batches.append(batch)
+        self.completed.update(batch["urls"])
+        if offset is not None:
+            self.offset = offset
+        self._append(batch)
+
+    def pending(self, products: Iterable[Dict]) -> Iterable[Dict]:
+        """
+        过滤掉已完成的产品
+
+        Args:
+            products: 产品列表或可迭代对象
+
+        Returns:
+            未完成的产品（输入为列表时返回列表，否则返回生成器）
+        """
+        if isinstance(products, list):
+            return [product for product in products if product["url"] not in self.completed]
+        return (product for product in products if product["url"] not in self.completed)
+
+    def clear(self):
+        """删除断点文件（详情爬取正常完成后调用）"""
+        self.completed = set()
+        self.offset = None
+        self._batches = []
+        try:
+            if self.checkpoint_file.exists():
+                self.checkpoint_file.unlink()
+        except OSError as e:
+            self.logger.warning(f"删除详情断点失败: {e}")
+
+    def _append(self, record: Dict):
+        """追加一条记录并落盘"""
+        self.checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.checkpoint_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _rewrite(self):
+        """重写断点文件（先写临时文件再替换）"""
+        self.checkpoint_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.checkpoint_file.with_name(f"{self.checkpoint_file.name}.tmp")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"target": self.target}, ensure_ascii=False) + "\n")
+            for batch in self._batches:
+                f.write(json.dumps(batch, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.checkpoint_file)
@@ -0,0 +1,276 @@
+"""WebDriver 池 - 复用预热的 Chrome 实例，避免每个产品都重新启动浏览器"""
+
+import os
+import time
+from contextlib import contextmanager
+from queue import Empty, Queue
+from threading import Lock
+from typing import Callable, Dict, Optional
+
+from utils.logger import get_logger
+
+
+def _process_tree_rss_mb(pid: int) -> Optional[float]:
+    """
+    统计进程及其所有子进程的常驻内存（MB）
+
+    优先使用 psutil（如已安装），否则读取 /proc（仅 Linux）。
+
+    Args:
+        pid: 根进程ID（chromedriver 进程，Chrome 是它的子进程）
+
+    Returns:
+        内存占用（MB），无法获取时返回 None
+    """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            processes = [process] + process.children(recursive=True)
+            total = 0
+            for proc in processes:
+                try:
+                    total += proc.memory_info().rss
+                except psutil.Error:
+                    continue
+            return total / 1024 / 1024
+        except psutil.Error:
+            return None
+
+    if not os.path.isdir("/proc"):
+        return None
+
+    total_kb = 0
+    pending = [pid]
+    seen = set()
+    while pending:
+        current = pending.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        try:
+            with open(f"/proc/{current}/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+                        break
+            task_dir = f"/proc/{current}/task"
+            for tid in os.listdir(task_dir):
+                with open(f"{task_dir}/{tid}/children", "r") as f:
+                    pending.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            continue
+
+    return total_kb / 1024 if seen else None
+
+
+class DriverPool:
+    """线程安全的 WebDriver 池"""
+
+    def __init__(
+        self,
+        create_driver: Callable,
+        size: int = 3,
+        max_pages: int = 100,
+        max_memory_mb: Optional[float] = None,
+        acquire_timeout: float = 300
+    ):
+        """
+        初始化 WebDriver 池
+
+        Args:
+            create_driver: 创建 WebDriver 的函数（无参数）
+            size: 池中最多同时存在的浏览器数量（通常等于工作线程数）
+            max_pages: 单个浏览器最多处理的页面数，超过后回收重建，<= 0 表示不限制
+            max_memory_mb: 浏览器进程树内存上限（MB），超过后回收重建，None 表示不检查
+            acquire_timeout: 等待空闲浏览器的超时时间（秒）
+        """
+        self.create_driver = create_driver
+        self.size = size
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.acquire_timeout = acquire_timeout
+        self.logger = get_logger()
+
+        self._idle: Queue = Queue()
+        self._lock = Lock()
+        self._all_drivers = set()  # 所有存活的浏览器（含已借出）
+        self._page_counts: Dict[int, int] = {}
+        self._created_count = 0
+        self._recycled_count = 0
+        self._spawning = 0  # 正在启动中的浏览器数量（占用名额）
+        self._closed = False
+
+    def _spawn(self):
+        """创建新的浏览器并登记"""
+        start_time = time.time()
+        try:
+            driver = self.create_driver()
+        finally:
+            with self._lock:
+                self._spawning -= 1
+        with self._lock:
+            self._all_drivers.add(driver)
+            self._page_counts[id(driver)] = 0
+            self._created_count += 1
+        self.logger.debug(f"🚀 新建浏览器实例 (耗时 {time.time() - start_time:.1f}s, 池中共 {len(self._all_drivers)} 个)")
+        return driver
+
+    def _is_healthy(self, driver) -> bool:
+        """检查浏览器是否仍可用"""
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    def _should_recycle(self, driver) -> Optional[str]:
+        """
+        判断浏览器是否需要回收
+
+        Returns:
+            回收原因，不需要回收时返回 None
+        """
+        pages = self._page_counts.get(id(driver), 0)
+        if self.max_pages and self.max_pages > 0 and pages >= self.max_pages:
+            return f"已处理 {pages} 个页面"
+
+        if self.max_memory_mb:
+            service = getattr(driver, "service", None)
+            process = getattr(service, "process", None)
+            if process is not None:
+                memory_mb = _process_tree_rss_mb(process.pid)
+                if memory_mb is not None and memory_mb > self.max_memory_mb:
+                    return f"内存 {memory_mb:.0f}MB 超过上限 {self.max_memory_mb:.0f}MB"
+
+        return None
+
+    def _quit(self, driver):
+        """关闭浏览器并注销"""
+        with self._lock:
+            self._all_drivers.discard(driver)
+            self._page_counts.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self):
+        """
+        借出一个可用的浏览器（优先复用空闲实例，池未满时新建）
+
+        Returns:
+            webdriver.Chrome: 浏览器实例
+        """
+        if self._closed:
+            raise RuntimeError("DriverPool 已关闭")
+
+        deadline = time.time() + self.acquire_timeout
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except Empty:
+                with self._lock:
+                    can_spawn = len(self._all_drivers) + self._spawning < self.size
+                    if can_spawn:
+                        self._spawning += 1
+                if can_spawn:
+                    return self._spawn()
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise TimeoutError("等待空闲浏览器超时") from None
+                try:
+                    driver = self._idle.get(timeout=min(remaining, 1.0))
+                except Empty:
+                    continue
+
+            if self._is_healthy(driver):
+                return driver
+
+            self.logger.warning("浏览器实例已失效，重新创建")
+            self._quit(driver)
+
+    def release(self, driver):
+        """
+        归还浏览器（计入一次页面处理，必要时回收）
+
+        Args:
+            driver: 浏览器实例
+        """
+        with self._lock:
+            if id(driver) in self._page_counts:
+                self._page_counts[id(driver)] += 1
+
+        if self._closed:
+            self._quit(driver)
+            return
+
+        reason = self._should_recycle(driver)
+        if reason:
+            self.logger.info(f"♻️  回收浏览器实例: {reason}")
+            with self._lock:
+                self._recycled_count += 1
+            self._quit(driver)
+            return
+
+        self._idle.put(driver)
+
+    def discard(self, driver):
+        """
+        丢弃出错的浏览器（不再放回池中）
+
+        Args:
+            driver: 浏览器实例
+        """
+        self._quit(driver)
+
+    @contextmanager
+    def driver(self):
+        """
+        借用浏览器的上下文管理器，出现异常时丢弃该实例
+
+        Yields:
+            webdriver.Chrome: 浏览器实例
+        """
+        driver = self.acquire()
+        try:
+            yield driver
+        except Exception:
+            self.discard(driver)
+            raise
+        else:
+            self.release(driver)
+
+    def stats(self) -> Dict[str, int]:
+        """获取池的统计信息"""
+        with self._lock:
+            return {
+                "alive": len(self._all_drivers),
+                "idle": self._idle.qsize(),
+                "created": self._created_count,
+                "recycled": self._recycled_count,
+            }
+
+    def close(self):
+        """关闭池中所有浏览器"""
+        self._closed = True
+        with self._lock:
+            drivers = list(self._all_drivers)
+        for driver in drivers:
+            self._quit(driver)
+        while True:
+            try:
+                self._idle.get_nowait()
+            except Empty:
+                break
+
+    def __enter__(self):
+        self._closed = False
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
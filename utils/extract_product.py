@@ -13,9 +13,9 @@ Holland & Barrett 产品信息提取器
 """
 
 import json
-import re
-from bs4 import BeautifulSoup
 from typing import Dict, List, Any, Optional
+from utils.html_text import html_to_text
+from utils.layout_locator import extract_layout_text, load_resolved_data, loads as load_json
 
 
 def find_product_uuid(widgets: List[Dict]) -> Optional[str]:
@@ -58,45 +58,40 @@ def clean_html(html_text: str) -> str:
     if not html_text:
         return ''
     
-    soup = BeautifulSoup(html_text, 'html.parser')
-    return soup.get_text(strip=True)
+    return html_to_text(html_text, separator='')
 
 
-def extract_product_data(html_content: str) -> Dict[str, Any]:
+def _extract_product_data_full(html_content: str) -> Dict[str, Any]:
     """
-    从 Holland & Barrett 产品页面提取所有产品信息
-    
+    解码完整的 __LAYOUT__ JSON 并取出产品数据
+
     Args:
         html_content: HTML 页面内容
-        
+
     Returns:
-        包含所有产品信息的字典
-        
+        产品数据字典
+
     Raises:
         ValueError: 如果无法找到必要的数据
     """
-    # 1. 提取 JSON 数据
-    match = re.search(
-        r'<script id="__LAYOUT__"[^>]*>(.*?)</script>', 
-        html_content, 
-        re.DOTALL
-    )
-    
-    if not match:
+    # 提取 JSON 数据
+    layout_text = extract_layout_text(html_content)
+    
+    if layout_text is None:
         raise ValueError("No __LAYOUT__ script found in HTML")
     
     try:
-        layout_data = json.loads(match.group(1))
-    except json.JSONDecodeError as e:
+        layout_data = load_json(layout_text)
+    except ValueError as e:
         raise ValueError(f"Failed to parse layout JSON: {e}")
     
-    # 2. 查找产品数据 UUID
+    # 查找产品数据 UUID
     product_uuid = find_product_uuid(layout_data.get('widgets', []))
     
     if not product_uuid:
         raise ValueError("Product data UUID not found in layout")
     
-    # 3. 获取产品数据
+    # 获取产品数据
     resolve_values = layout_data.get('resolveParamValues', {})
     
     if product_uuid not in resolve_values:
@@ -109,7 +104,28 @@ def extract_product_data(html_content: str) -> Dict[str, Any]:
     
     product_data = product_wrapper['data']
     
-    # 4. 提取各个字段
+    return product_data
+
+
+def extract_product_data(html_content: str) -> Dict[str, Any]:
+    """
+    从 Holland & Barrett 产品页面提取所有产品信息
+    
+    Args:
+        html_content: HTML 页面内容
+        
+    Returns:
+        包含所有产品信息的字典
+        
+    Raises:
+        ValueError: 如果无法找到必要的数据
+    """
+    # 1. 只解码产品数据子树，失败时回退到完整解析
+    product_data = load_resolved_data(html_content, 'pdp_product_data')
+    if product_data is None:
+        product_data = _extract_product_data_full(html_content)
+    
+    # 2. 提取各个字段
     result = {}
     
     # Benefits (产品亮点)
@@ -0,0 +1,120 @@
+"""HTML 转纯文本 - 基于 html.parser 事件，不构建 BeautifulSoup 文档树"""
+
+import re
+from html.parser import HTMLParser
+from typing import List
+
+from bs4.dammit import EntitySubstitution, UnicodeDammit
+
+
+# 这些标签内的文本不计入 get_text() 结果（与 BeautifulSoup 一致）
+SKIPPED_TEXT_TAGS = {"script", "style", "template"}
+
+_DECIMAL_REFERENCE = re.compile(r"^([0-9]+)(.*)")
+_HEX_REFERENCE = re.compile(r"^([0-9a-f]+)(.*)")
+
+
+class _TextExtractor(HTMLParser):
+    """收集文本节点的解析器，文本节点的划分方式与 BeautifulSoup 的 html.parser 后端相同"""
+
+    def __init__(self):
+        # 与 BeautifulSoup 相同，自行处理字符引用
+        super().__init__(convert_charrefs=False)
+        self.strings: List[str] = []
+        self._buffer: List[str] = []
+        self._skip_depth = 0
+
+    def _flush(self, keep: bool = True):
+        """结束当前文本节点"""
+        if self._buffer:
+            if keep and not self._skip_depth:
+                self.strings.append("".join(self._buffer))
+            self._buffer = []
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in SKIPPED_TEXT_TAGS:
+            self._skip_depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush()
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if tag in SKIPPED_TEXT_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        self._buffer.append(data)
+
+    def handle_charref(self, name):
+        base, pattern = 10, _DECIMAL_REFERENCE
+        if name[:1] in ("x", "X"):
+            name, base, pattern = name[1:], 16, _HEX_REFERENCE
+
+        extra_data = ""
+        try:
+            codepoint = int(name, base)
+        except ValueError:
+            # 没有分号结尾的数字引用：只取数字部分，剩余部分作为普通文本
+            match = pattern.search(name)
+            if match is None:
+                self._buffer.append(name)
+                return
+            codepoint = int(match.group(1), base)
+            extra_data = match.group(2)
+
+        character, _ = UnicodeDammit.numeric_character_reference(codepoint)
+        self._buffer.append(character)
+        if extra_data:
+            self._buffer.append(extra_data)
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self._buffer.append(character if character is not None else f"&{name}")
+
+    def unknown_decl(self, data):
+        # CDATA 的内容计入文本，其他声明不计入
+        self._flush()
+        if data.upper().startswith("CDATA["):
+            self.strings.append(data[len("CDATA["):])
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def close(self):
+        super().close()
+        self._flush()
+
+
+def html_to_text(html_text: str, separator: str = " ") -> str:
+    """
+    提取 HTML 片段中的纯文本
+
+    结果与 BeautifulSoup(html_text, "html.parser").get_text(strip=True, separator=separator) 相同。
+
+    Args:
+        html_text: HTML 文本
+        separator: 文本节点之间的分隔符
+
+    Returns:
+        纯文本
+    """
+    if not html_text:
+        return ""
+
+    # 不含标签和实体的纯文本无需解析
+    if "<" not in html_text and "&" not in html_text:
+        return html_text.strip()
+
+    parser = _TextExtractor()
+    parser.feed(html_text)
+    parser.close()
+
+    return separator.join(text for text in (s.strip() for s in parser.strings) if text)
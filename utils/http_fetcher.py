@@ -0,0 +1,197 @@
+"""HTTP 抓取后端 - 直接获取服务端渲染的 HTML，无需启动浏览器"""
+
+from threading import Lock
+from typing import Dict, Optional
+
+import httpx
+
+from utils.concurrency_controller import report_status
+from utils.layout_locator import LAYOUT_ID
+from utils.logger import get_logger
+from utils.page_cache import PageCache, conditional_headers, get_page_cache
+
+
+# 详情页 / 列表页的 __LAYOUT__ 数据节点标记
+LAYOUT_MARKER = LAYOUT_ID
+
+
+def build_headers(user_agent: Optional[str] = None) -> Dict[str, str]:
+    """
+    构建模拟浏览器的请求头
+
+    Args:
+        user_agent: User-Agent，None 表示使用配置文件中的 Chrome UA
+
+    Returns:
+        请求头字典
+    """
+    if user_agent is None:
+        import config
+        user_agent = config.CHROME_USER_AGENT
+
+    return {
+        "User-Agent": user_agent,
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "en-GB,en;q=0.9",
+    }
+
+
+class HttpFetcher:
+    """基于 httpx 的页面抓取器（线程安全，可在多个线程间共享）"""
+
+    def __init__(
+        self,
+        user_agent: Optional[str] = None,
+        timeout: float = 30.0,
+        max_connections: int = 20,
+        client: Optional[httpx.Client] = None,
+        cache: Optional[PageCache] = None
+    ):
+        """
+        初始化 HTTP 抓取器
+
+        Args:
+            user_agent: 请求使用的 User-Agent，None 表示使用配置文件中的 Chrome UA
+            timeout: 请求超时时间（秒）
+            max_connections: 连接池最大连接数
+            client: 外部传入的 httpx.Client（测试时注入 MockTransport 使用）
+            cache: 页面缓存，None 表示不缓存
+        """
+        self.headers = build_headers(user_agent)
+        self.cache = cache
+        self.logger = get_logger()
+        self.client = client or httpx.Client(
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+        )
+
+    def _get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[httpx.Response]:
+        """
+        发送 GET 请求
+
+        Args:
+            url: 页面URL
+            headers: 额外的请求头
+
+        Returns:
+            状态码为 200 的响应（发送条件请求时也可能是 304），失败返回 None
+        """
+        request_headers = {**self.headers, **(headers or {})}
+        try:
+            response = self.client.get(url, headers=request_headers)
+        except httpx.HTTPError as e:
+            self.logger.warning(f"HTTP 请求失败: {type(e).__name__}: {url}")
+            return None
+
+        # 供自适应并发控制器识别 429/5xx
+        report_status(response.status_code)
+        if response.status_code not in (200, 304):
+            self.logger.warning(f"HTTP 状态码 {response.status_code}: {url}")
+            return None
+
+        return response
+
+    def fetch(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """
+        获取页面 HTML
+
+        Args:
+            url: 页面URL
+            headers: 额外的请求头
+
+        Returns:
+            页面 HTML 文本，失败返回 None
+        """
+        response = self._get(url, headers)
+        if response is None or response.status_code != 200:
+            return None
+        return response.text
+
+    def fetch_layout_page(self, url: str, use_cache: bool = True) -> Optional[str]:
+        """
+        获取包含 __LAYOUT__ 数据的页面
+
+        服务端偶尔会返回不含数据的占位页（如反爬验证页），此时返回 None，
+        由调用方回退到 Selenium。启用缓存时优先读取未过期的缓存；缓存已过期
+        但有 ETag / Last-Modified 时发送条件请求，304 时复用缓存内容；
+        请求成功后写入缓存。
+
+        Args:
+            url: 页面URL
+            use_cache: 是否使用页面缓存
+
+        Returns:
+            页面 HTML 文本，未包含 __LAYOUT__ 时返回 None
+        """
+        cache = self.cache if use_cache else None
+        entry = None
+        if cache is not None:
+            entry = cache.get_entry(url, allow_stale=True)
+            if entry is not None and entry["fresh"]:
+                self.logger.debug(f"命中页面缓存: {url}")
+                return entry["html"]
+
+        response = self._get(url, conditional_headers(entry))
+        if response is None:
+            return None
+
+        if response.status_code == 304:
+            if entry is None:
+                return None
+            cache.mark_not_modified(url)
+            self.logger.debug(f"页面未变化 (304)，复用缓存: {url}")
+            return entry["html"]
+
+        html_content = response.text
+        if LAYOUT_MARKER not in html_content:
+            self.logger.warning(f"HTTP 响应中未找到 __LAYOUT__ 数据: {url}")
+            return None
+
+        if cache is not None:
+            cache.put(
+                url,
+                html_content,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified")
+            )
+
+        return html_content
+
+    def close(self):
+        """关闭 HTTP 客户端"""
+        self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+# 全局共享的抓取器实例（复用连接池）
+_global_fetcher: Optional[HttpFetcher] = None
+_global_fetcher_lock = Lock()
+
+
+def get_http_fetcher() -> HttpFetcher:
+    """
+    获取全局共享的 HTTP 抓取器
+
+    Returns:
+        HttpFetcher: 抓取器实例
+    """
+    global _global_fetcher
+    if _global_fetcher is None:
+        with _global_fetcher_lock:
+            if _global_fetcher is None:
+                import config
+                _global_fetcher = HttpFetcher(
+                    timeout=config.HTTP_TIMEOUT,
+                    max_connections=config.HTTP_MAX_CONNECTIONS,
+                    cache=get_page_cache()
+                )
+    return _global_fetcher
@@ -0,0 +1,217 @@
+"""并发图片处理流水线 - 下载和上传在线程中进行，缩放在进程池中进行，各阶段之间用有界队列衔接"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from queue import Empty, Full, Queue
+from threading import Event, Lock, Thread
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from utils.image_processor import ImageProcessor, render_image
+from utils.logger import get_logger
+
+# 阶段结束标记
+_DONE = object()
+# 队列等待的轮询间隔（秒），用于及时响应提前结束
+_POLL_INTERVAL = 0.1
+
+
+class ImagePipeline:
+    """
+    图片处理流水线
+
+    下载线程 → 缩放进程池 → 上传线程，三个阶段同时进行。下载队列和上传队列都有容量上限，
+    某个阶段变慢时上游阻塞等待，内存中最多只保留 queue_size 张左右的图片。
+    已上传过的图片（见 ImageProcessor.fetch_source）在下载阶段直接返回图床URL，不进入后续阶段。
+    """
+
+    def __init__(
+        self,
+        processor: ImageProcessor,
+        download_workers: int = None,
+        resize_workers: int = None,
+        upload_workers: int = None,
+        queue_size: int = None
+    ):
+        """
+        初始化流水线
+
+        Args:
+            processor: 图片处理器（提供下载、上传和缓存，需线程安全）
+            download_workers: 下载线程数，None 表示从配置文件读取
+            resize_workers: 缩放进程数，0 表示在上传线程内缩放，None 表示从配置文件读取
+            upload_workers: 上传线程数，None 表示从配置文件读取
+            queue_size: 各阶段之间的队列容量，None 表示从配置文件读取
+        """
+        import config
+
+        self.processor = processor
+        self.download_workers = max(1, download_workers or config.IMAGE_DOWNLOAD_WORKERS)
+        self.resize_workers = config.IMAGE_RESIZE_WORKERS if resize_workers is None else resize_workers
+        self.upload_workers = max(1, upload_workers or config.IMAGE_UPLOAD_WORKERS)
+        self.queue_size = max(1, queue_size or config.IMAGE_PIPELINE_QUEUE_SIZE)
+        self.logger = get_logger()
+
+        self._lock = Lock()
+        self._stats = {"downloaded": 0, "reused": 0, "resized": 0, "uploaded": 0, "failed": 0}
+
+    def _count(self, name: str):
+        """统计计数加 1"""
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取运行统计
+
+        Returns:
+            包含下载、复用、缩放、上传和失败数量的字典
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def _create_resize_executor(self) -> Optional[ProcessPoolExecutor]:
+        """
+        创建缩放进程池
+
+        使用 spawn 方式启动子进程：下载和上传线程已在运行时 fork 进程并不安全。
+        """
+        if self.resize_workers <= 0:
+            return None
+        return ProcessPoolExecutor(
+            max_workers=self.resize_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+    @staticmethod
+    def _put(queue: Queue, item: Any, stop: Event) -> bool:
+        """放入有界队列，队列满时等待；提前结束时放弃并返回 False"""
+        while not stop.is_set():
+            try:
+                queue.put(item, timeout=_POLL_INTERVAL)
+                return True
+            except Full:
+                continue
+        return False
+
+    @staticmethod
+    def _get(queue: Queue, stop: Event) -> Any:
+        """从队列取出一项；提前结束时返回结束标记"""
+        while not stop.is_set():
+            try:
+                return queue.get(timeout=_POLL_INTERVAL)
+            except Empty:
+                continue
+        return _DONE
+
+    def run(self, jobs: Iterable[Tuple[Any, str, str]]) -> Iterator[Tuple[Any, Optional[str]]]:
+        """
+        处理一批图片（生成器，按完成顺序返回结果）
+
+        Args:
+            jobs: (键, 原始图片URL, 产品名称) 序列，可以是惰性的迭代器；键原样返回，用于对应回原数据
+
+        Yields:
+            (键, 新的图片URL)，处理失败时新URL为 None
+        """
+        download_queue: Queue = Queue(maxsize=self.queue_size)
+        upload_queue: Queue = Queue(maxsize=self.queue_size)
+        result_queue: Queue = Queue()
+        stop = Event()
+        executor = self._create_resize_executor()
+        running = {"download": self.download_workers, "upload": self.upload_workers}
+        running_lock = Lock()
+        render_args = (self.processor.target_size, self.processor.output_format, self.processor.quality)
+
+        def finish(stage: str, queue: Queue, count: int):
+            """阶段内最后一个线程退出时通知下游结束"""
+            with running_lock:
+                running[stage] -= 1
+                last = running[stage] == 0
+            if last:
+                for _ in range(count):
+                    self._put(queue, _DONE, stop)
+
+        def feed():
+            try:
+                for job in jobs:
+                    if not self._put(download_queue, job, stop):
+                        break
+            finally:
+                for _ in range(self.download_workers):
+                    self._put(download_queue, _DONE, stop)
+
+        def download_worker():
+            try:
+                while True:
+                    job = self._get(download_queue, stop)
+                    if job is _DONE:
+                        break
+                    key, image_url, _ = job
+                    try:
+                        image_data, reused_url = self.processor.fetch_source(image_url)
+                    except Exception as e:
+                        self.logger.error(f"✗ 图片下载出错 {image_url}: {e}")
+                        image_data, reused_url = None, None
+
+                    if image_data is None:
+                        self._count("reused" if reused_url else "failed")
+                        result_queue.put((key, reused_url))
+                        continue
+
+                    self._count("downloaded")
+                    resized = executor.submit(render_image, image_data, *render_args) if executor else None
+                    if not self._put(upload_queue, (job, image_data, resized), stop):
+                        break
+            finally:
+                finish("download", upload_queue, self.upload_workers)
+
+        def upload_worker():
+            try:
+                while True:
+                    item = self._get(upload_queue, stop)
+                    if item is _DONE:
+                        break
+                    (key, image_url, product_name), image_data, resized = item
+                    new_url = None
+                    try:
+                        if resized is not None:
+                            processed_data = resized.result()
+                        else:
+                            processed_data = render_image(image_data, *render_args)
+                        if processed_data:
+                            self._count("resized")
+                            new_url = self.processor.upload_processed(
+                                image_url, processed_data, product_name, image_data=image_data
+                            )
+                    except Exception as e:
+                        self.logger.error(f"✗ 图片处理出错 {image_url}: {e}")
+
+                    self._count("uploaded" if new_url else "failed")
+                    result_queue.put((key, new_url))
+            finally:
+                finish("upload", result_queue, 1)
+
+        threads = [Thread(target=feed, name="image-feed", daemon=True)]
+        threads += [
+            Thread(target=download_worker, name=f"image-download-{i}", daemon=True)
+            for i in range(self.download_workers)
+        ]
+        threads += [
+            Thread(target=upload_worker, name=f"image-upload-{i}", daemon=True)
+            for i in range(self.upload_workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                item = result_queue.get()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
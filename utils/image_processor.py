@@ -2,15 +2,116 @@
 import httpx
 from PIL import Image
 from io import BytesIO
-from pathlib import Path
-from typing import Optional
-import time
+from typing import Dict, Optional, Tuple
+
+from utils.image_registry import ImageRegistry, content_hash, perceptual_hash
+from utils.page_cache import PageCache, conditional_headers
+from utils.rate_limiter import RateLimiter, get_rate_limiter
+
+
+# 输出格式: 配置值 -> (Pillow 格式, MIME 类型, 文件后缀)
+OUTPUT_FORMATS = {
+    "png": ("PNG", "image/png", ".png"),
+    "webp": ("WEBP", "image/webp", ".webp"),
+    "jpeg": ("JPEG", "image/jpeg", ".jpg"),
+}
+
+
+def render_image(
+    image_data: bytes,
+    target_size: tuple,
+    output_format: str = "png",
+    quality: int = 90
+) -> Optional[bytes]:
+    """
+    处理图片：调整尺寸并居中到白色背景
+
+    模块级函数，可以提交到进程池中执行。JPEG 原图在解码时直接缩小（draft），
+    大幅缩小时先用 reduce() 按整数倍缩小再 LANCZOS 重采样；不透明的图片不转换 RGBA，
+    直接粘贴，不使用透明度蒙版。
+
+    Args:
+        image_data: 原始图片字节数据
+        target_size: 目标尺寸 (宽, 高)
+        output_format: 输出格式（png / webp / jpeg，见 OUTPUT_FORMATS）
+        quality: WebP / JPEG 输出质量（1-100），PNG 为无损压缩时忽略
+
+    Returns:
+        处理后的图片字节数据，失败返回 None
+    """
+    try:
+        # 打开图片（只读取文件头，尚未解码像素）
+        img = Image.open(BytesIO(image_data))
+
+        # 计算缩放比例（保持宽高比）
+        original_width, original_height = img.size
+        target_width, target_height = target_size
+
+        # 等比例缩放，使图片完全放入目标尺寸
+        # 800x400 的横条形尺寸适合展示竖长的药品瓶子
+        scale = min(target_width / original_width, target_height / original_height)
+
+        # 计算新尺寸
+        new_width = max(1, int(original_width * scale))
+        new_height = max(1, int(original_height * scale))
+
+        # JPEG 解码时按 1/2、1/4、1/8 直接缩小（不小于目标尺寸），省去大部分解码和缩放工作
+        if img.format == "JPEG":
+            img.draft("RGB", (new_width, new_height))
+
+        # 只有确实带透明像素的图片才需要 RGBA 和透明度蒙版
+        has_alpha = img.has_transparency_data
+        if has_alpha:
+            img = img.convert("RGBA")
+            has_alpha = img.getchannel("A").getextrema()[0] < 255
+        if not has_alpha and img.mode != "RGB":
+            img = img.convert("RGB")
+
+        # 缩放图片（高质量抗锯齿；缩小超过 3 倍时先用 reduce() 按整数倍缩小）
+        img_resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+        # 创建白色背景
+        background = Image.new("RGB", target_size, (255, 255, 255))
+
+        # 计算居中位置
+        x = (target_width - new_width) // 2
+        y = (target_height - new_height) // 2
+
+        # 将缩放后的图片粘贴到白色背景上（带透明度时使用蒙版）
+        background.paste(img_resized, (x, y), img_resized if has_alpha else None)
+
+        # 转换为字节数据
+        pil_format = OUTPUT_FORMATS[output_format][0]
+        output = BytesIO()
+        if pil_format == "PNG":
+            # optimize=True 编码耗时翻倍，体积只小几个百分点
+            background.save(output, format="PNG")
+        elif pil_format == "WEBP":
+            # method 2 与默认的 4 体积相当，编码快一倍以上
+            background.save(output, format="WEBP", quality=quality, method=2)
+        else:
+            background.save(output, format="JPEG", quality=quality, optimize=True)
+        return output.getvalue()
+
+    except Exception as e:
+        print(f"  ✗ 图片处理出错: {e}")
+        return None
 
 
 class ImageProcessor:
     """图片处理器：下载、居中处理、上传到图床"""
 
-    def __init__(self, api_url: str, token: str, target_size: tuple = (800, 400)):
+    def __init__(
+        self,
+        api_url: str,
+        token: str,
+        target_size: tuple = (800, 400),
+        cache: Optional[PageCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        registry: Optional[ImageRegistry] = None,
+        output_format: Optional[str] = None,
+        quality: Optional[int] = None
+    ):
         """
         初始化图片处理器
 
@@ -18,84 +119,88 @@ class ImageProcessor:
             api_url: EasyImage API 地址
             token: API token
             target_size: 目标尺寸，默认 (800, 400) 横条形，适合竖长的药品瓶子
+            cache: 原图缓存（保存 ETag / Last-Modified 和上传结果），None 表示不缓存
+            rate_limiter: 图床上传限速器，None 表示使用全局共享的 "image_upload" 限速器
+            registry: 图床上传记录（按原图URL和内容哈希复用上传结果），None 表示不使用
+            output_format: 输出格式（png / webp / jpeg），None 表示从配置文件读取
+            quality: WebP / JPEG 输出质量，None 表示从配置文件读取
         """
+        import config
+
         self.api_url = api_url
         self.token = token
         self.target_size = target_size
+        self.cache = cache
+        self.rate_limiter = rate_limiter or get_rate_limiter("image_upload")
+        self.registry = registry
+        self.output_format = (output_format or config.IMAGE_OUTPUT_FORMAT).lower()
+        self.quality = quality or config.IMAGE_OUTPUT_QUALITY
+        if self.output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"不支持的输出格式: {self.output_format}（可选: {', '.join(OUTPUT_FORMATS)}）")
         self.client = httpx.Client(timeout=60.0)
 
-    def download_image(self, url: str) -> Optional[bytes]:
+    def _download(self, url: str) -> Tuple[Optional[bytes], Optional[Dict]]:
         """
-        下载图片
+        下载图片，启用缓存时发送条件请求
 
         Args:
             url: 图片URL
 
         Returns:
-            图片字节数据，失败返回 None
+            (图片字节数据, 缓存条目)，图片与上次相同（缓存未过期或服务器返回 304）时
+            缓存条目不为 None；下载失败时图片数据为 None
         """
+        entry = self.cache.get_bytes_entry(url, allow_stale=True) if self.cache else None
+        if entry is not None and entry["fresh"]:
+            return entry["content"], entry
+
         try:
-            response = self.client.get(url)
-            if response.status_code == 200:
-                return response.content
-            else:
-                print(f"  ✗ 下载失败 (状态码: {response.status_code}): {url}")
-                return None
+            response = self.client.get(url, headers=conditional_headers(entry))
         except Exception as e:
             print(f"  ✗ 下载出错: {e}")
-            return None
+            return None, None
 
-    def process_image(self, image_data: bytes) -> Optional[bytes]:
+        if response.status_code == 304 and entry is not None:
+            self.cache.mark_not_modified(url)
+            return entry["content"], entry
+
+        if response.status_code != 200:
+            print(f"  ✗ 下载失败 (状态码: {response.status_code}): {url}")
+            return None, None
+
+        if self.cache is not None:
+            self.cache.put_bytes(
+                url,
+                response.content,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified")
+            )
+        return response.content, None
+
+    def download_image(self, url: str) -> Optional[bytes]:
         """
-        处理图片：调整尺寸并居中到白色背景
+        下载图片
 
         Args:
-            image_data: 原始图片字节数据
+            url: 图片URL
 
         Returns:
-            处理后的图片字节数据（PNG格式），失败返回 None
+            图片字节数据，失败返回 None
         """
-        try:
-            # 打开图片
-            img = Image.open(BytesIO(image_data))
-
-            # 转换为 RGBA 模式（支持透明度）
-            if img.mode != "RGBA":
-                img = img.convert("RGBA")
-
-            # 计算缩放比例（保持宽高比）
-            original_width, original_height = img.size
-            target_width, target_height = self.target_size
-
-            # 等比例缩放，使图片完全放入目标尺寸
-            # 800x400 的横条形尺寸适合展示竖长的药品瓶子
-            scale = min(target_width / original_width, target_height / original_height)
-
-            # 计算新尺寸
-            new_width = int(original_width * scale)
-            new_height = int(original_height * scale)
-
-            # 缩放图片（使用高质量抗锯齿）
-            img_resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        image_data, _ = self._download(url)
+        return image_data
 
-            # 创建白色背景
-            background = Image.new("RGB", self.target_size, (255, 255, 255))
-
-            # 计算居中位置
-            x = (target_width - new_width) // 2
-            y = (target_height - new_height) // 2
-
-            # 将缩放后的图片粘贴到白色背景上（处理透明度）
-            background.paste(img_resized, (x, y), img_resized)
+    def process_image(self, image_data: bytes) -> Optional[bytes]:
+        """
+        处理图片：调整尺寸并居中到白色背景
 
-            # 转换为字节数据
-            output = BytesIO()
-            background.save(output, format="PNG", quality=95)
-            return output.getvalue()
+        Args:
+            image_data: 原始图片字节数据
 
-        except Exception as e:
-            print(f"  ✗ 图片处理出错: {e}")
-            return None
+        Returns:
+            处理后的图片字节数据（输出格式由 output_format 决定），失败返回 None
+        """
+        return render_image(image_data, self.target_size, self.output_format, self.quality)
 
     def upload_to_imagebed(self, image_data: bytes, filename: str = "product.png") -> Optional[str]:
         """
@@ -109,7 +214,7 @@ class ImageProcessor:
             上传后的图片URL，失败返回 None
         """
         try:
-            files = {"image": (filename, image_data, "image/png")}
+            files = {"image": (filename, image_data, OUTPUT_FORMATS[self.output_format][1])}
             data = {"token": self.token}
 
             response = self.client.post(self.api_url, files=files, data=data)
@@ -129,6 +234,104 @@ class ImageProcessor:
             print(f"  ✗ 上传出错: {e}")
             return None
 
+    @property
+    def size_key(self) -> str:
+        """
+        输出规格标识（与上传结果一起缓存和记录，尺寸、输出格式或质量变化后重新处理）
+
+        PNG 为 "800x400"（与之前只按尺寸记录的上传结果兼容），WebP / JPEG 带上格式和质量，
+        如 "800x400.webp.q90"。
+        """
+        key = f"{self.target_size[0]}x{self.target_size[1]}"
+        if self.output_format == "png":
+            return key
+        return f"{key}.{self.output_format}.q{self.quality}"
+
+    def fetch_source(self, image_url: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """
+        获取原图，已上传过的图片直接返回上次的图床URL
+
+        依次检查：上传记录中的原图URL（不下载）→ 原图缓存（未变化且尺寸相同）→
+        上传记录中的内容哈希（其他URL上传过相同的图片）。
+
+        Args:
+            image_url: 原始图片URL
+
+        Returns:
+            (图片字节数据, 可复用的图床URL)，两者最多一个不为 None；下载失败时都为 None
+        """
+        if self.registry is not None:
+            hosted_url = self.registry.lookup_source(image_url, self.size_key)
+            if hosted_url:
+                return None, hosted_url
+
+        image_data, cached_entry = self._download(image_url)
+        if not image_data:
+            return None, None
+
+        hosted_url = None
+        if cached_entry and cached_entry.get("hosted_url") and cached_entry.get("hosted_size") == self.size_key:
+            hosted_url = cached_entry["hosted_url"]
+
+        if self.registry is not None:
+            image_hash = content_hash(image_data)
+            hosted_url = hosted_url or self.registry.lookup_content(image_hash, self.size_key)
+            if hosted_url:
+                self.registry.record(image_url, self.size_key, hosted_url, image_hash)
+
+        if hosted_url:
+            return None, hosted_url
+        return image_data, None
+
+    def upload_processed(
+        self,
+        image_url: str,
+        processed_data: bytes,
+        product_name: str = "",
+        image_data: Optional[bytes] = None
+    ) -> Optional[str]:
+        """
+        上传处理后的图片，并把结果记录到原图缓存和上传记录
+
+        启用上传记录时先查找文件名相同、感知哈希近似相同的图片（同一产品图的其他分辨率版本），
+        找到则复用其图床URL，不再上传。
+
+        Args:
+            image_url: 原始图片URL（缓存键）
+            processed_data: 处理后的图片字节数据
+            product_name: 产品名称（用于生成文件名）
+            image_data: 原图字节数据（用于记录内容哈希），None 表示只按原图URL记录
+
+        Returns:
+            新的图片URL，失败返回 None
+        """
+        image_hash = content_hash(image_data) if image_data else None
+
+        # 同一张产品图（文件名相同）的其他分辨率版本已上传过时，复用其图床URL
+        phash = None
+        if self.registry is not None and self.registry.phash_distance >= 0:
+            phash = perceptual_hash(processed_data)
+            similar_url = self.registry.lookup_similar(phash, self.size_key, image_url)
+            if similar_url:
+                self.registry.record(image_url, self.size_key, similar_url, image_hash)
+                if self.cache is not None:
+                    self.cache.update_meta(image_url, hosted_url=similar_url, hosted_size=self.size_key)
+                return similar_url
+
+        # 生成文件名（后缀与输出格式一致）
+        suffix = OUTPUT_FORMATS[self.output_format][2]
+        filename = f"{product_name[:30].replace(' ', '_')}{suffix}" if product_name else f"product{suffix}"
+
+        # 上传到图床（按图床限速，复用缓存结果时不占用配额）
+        self.rate_limiter.acquire()
+        new_url = self.upload_to_imagebed(processed_data, filename)
+        if new_url and self.cache is not None:
+            self.cache.update_meta(image_url, hosted_url=new_url, hosted_size=self.size_key)
+        if new_url and self.registry is not None:
+            self.registry.record(image_url, self.size_key, new_url, image_hash, phash)
+
+        return new_url
+
     def process_and_upload(self, image_url: str, product_name: str = "") -> Optional[str]:
         """
         完整流程：下载 -> 处理 -> 上传
@@ -145,7 +348,10 @@ class ImageProcessor:
             return None
 
         # 下载图片
-        image_data = self.download_image(image_url)
+        image_data, reused_url = self.fetch_source(image_url)
+        if reused_url:
+            print("  → 图片已上传过，复用上次上传结果")
+            return reused_url
         if not image_data:
             return None
 
@@ -154,16 +360,7 @@ class ImageProcessor:
         if not processed_data:
             return None
 
-        # 生成文件名
-        filename = f"{product_name[:30].replace(' ', '_')}.png" if product_name else "product.png"
-
-        # 上传到图床
-        new_url = self.upload_to_imagebed(processed_data, filename)
-
-        # 延迟一下，避免请求过快
-        time.sleep(0.5)
-
-        return new_url
+        return self.upload_processed(image_url, processed_data, product_name, image_data=image_data)
 
     def close(self):
         """关闭 HTTP 客户端"""
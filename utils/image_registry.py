@@ -0,0 +1,306 @@
+"""图床上传记录 - 持久保存 原图URL、原图内容哈希、处理后图片感知哈希 → 图床URL 的映射，跨CSV、跨运行复用上传结果"""
+
+import hashlib
+import sqlite3
+import time
+from io import BytesIO
+from pathlib import Path, PurePosixPath
+from threading import Lock
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from PIL import Image
+
+from utils.logger import get_logger
+
+# 感知哈希边长（hash_size x hash_size 位）
+PHASH_SIZE = 8
+# 灰度不低于该值的像素视为白色背景
+BACKGROUND_THRESHOLD = 245
+# 感知哈希中为 1 的位少于该值时视为缺少细节（纯色图、占位图），不按感知哈希去重
+MIN_PHASH_BITS = 8
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS source_images (
+    source_url TEXT NOT NULL,
+    size TEXT NOT NULL,
+    hosted_url TEXT NOT NULL,
+    content_hash TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (source_url, size)
+);
+CREATE TABLE IF NOT EXISTS content_images (
+    content_hash TEXT NOT NULL,
+    size TEXT NOT NULL,
+    hosted_url TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (content_hash, size)
+);
+CREATE TABLE IF NOT EXISTS perceptual_images (
+    source_name TEXT NOT NULL,
+    size TEXT NOT NULL,
+    phash TEXT NOT NULL,
+    hosted_url TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (source_name, size, phash)
+);
+"""
+
+
+def content_hash(image_data: bytes) -> str:
+    """
+    计算原图内容哈希
+
+    Args:
+        image_data: 原图字节数据
+
+    Returns:
+        SHA-256 十六进制字符串
+    """
+    return hashlib.sha256(image_data).hexdigest()
+
+
+def source_name(source_url: str) -> str:
+    """
+    原图文件名（同一张产品图的不同分辨率版本文件名相同，如 /HB/250/084867_A.png 和 /HB/320/084867_A.png）
+
+    Args:
+        source_url: 原图URL
+
+    Returns:
+        URL 路径的最后一段，没有时返回空字符串
+    """
+    return PurePosixPath(urlsplit(source_url).path).name
+
+
+def perceptual_hash(image_data: bytes, hash_size: int = PHASH_SIZE) -> int:
+    """
+    计算处理后图片的差值哈希（dHash）
+
+    先裁掉白色背景只保留产品区域，再缩小为 (hash_size + 1) x hash_size 的灰度图，
+    比较每行相邻像素的明暗得到 hash_size * hash_size 位。同一张产品图的不同分辨率版本
+    处理后哈希几乎相同，汉明距离可用于判断是否为同一张图片。
+
+    Args:
+        image_data: 图片字节数据（通常为白底居中的处理结果）
+        hash_size: 哈希边长
+
+    Returns:
+        hash_size * hash_size 位的整数
+    """
+    with Image.open(BytesIO(image_data)) as img:
+        gray = img.convert("L")
+    # 白色背景占画布的大部分，不裁掉的话任意两张图片都会有大量相同的位；
+    # 接近白色的像素（JPEG 压缩噪点）也当作背景
+    bbox = gray.point(lambda value: 255 if value < BACKGROUND_THRESHOLD else 0).getbbox()
+    if bbox:
+        gray = gray.crop(bbox)
+    pixels = gray.resize((hash_size + 1, hash_size), Image.Resampling.LANCZOS).tobytes()
+
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+class ImageRegistry:
+    """
+    图床上传记录（SQLite，线程安全）
+
+    source_images   原图URL + 输出规格 → 图床URL，有效期内直接复用，不再下载原图
+    content_images  原图内容哈希 + 输出规格 → 图床URL，不同URL指向相同图片时只上传一次
+    perceptual_images  原图文件名 + 输出规格 + 处理后图片的感知哈希 → 图床URL，同一张产品图的
+                       不同分辨率版本（如 /HB/250/084867_A.png 和 /HB/320/084867_A.png）只上传一次。
+                       8x8 的感知哈希分辨不出瓶身相同、只有标签文字或颜色不同的产品，
+                       因此只在原图文件名相同时才按感知哈希复用。
+
+    原图URL的记录过期后重新下载原图：内容未变化时通过内容哈希复用，不再缩放和上传。
+    """
+
+    def __init__(self, db_path: Path, ttl: Optional[float] = 7 * 24 * 3600, phash_distance: int = 4):
+        """
+        初始化上传记录
+
+        Args:
+            db_path: 数据库文件路径
+            ttl: 原图URL记录的有效期（秒），None 表示永不过期
+            phash_distance: 感知哈希汉明距离不超过该值时视为同一张图片，< 0 表示不按感知哈希去重
+        """
+        self.db_path = Path(db_path)
+        self.ttl = ttl
+        self.phash_distance = phash_distance
+        self.logger = get_logger()
+        self._lock = Lock()
+        self._source_hits = 0
+        self._content_hits = 0
+        self._perceptual_hits = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+
+    def lookup_source(self, source_url: str, size: str) -> Optional[str]:
+        """
+        按原图URL查找图床URL
+
+        Args:
+            source_url: 原图URL
+            size: 输出规格标识（ImageProcessor.size_key，如 "800x400"、"800x400.webp.q90"）
+
+        Returns:
+            图床URL，没有记录或记录已过期时返回 None
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT hosted_url, updated_at FROM source_images WHERE source_url = ? AND size = ?",
+                (source_url, size)
+            ).fetchone()
+            if row is None or (self.ttl is not None and time.time() - row[1] > self.ttl):
+                return None
+            self._source_hits += 1
+            return row[0]
+
+    def lookup_content(self, image_hash: str, size: str) -> Optional[str]:
+        """
+        按原图内容哈希查找图床URL
+
+        Args:
+            image_hash: 原图内容哈希（见 content_hash）
+            size: 输出规格标识
+
+        Returns:
+            图床URL，没有记录时返回 None
+        """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT hosted_url FROM content_images WHERE content_hash = ? AND size = ?",
+                (image_hash, size)
+            ).fetchone()
+            if row is None:
+                return None
+            self._content_hits += 1
+            return row[0]
+
+    def lookup_similar(self, phash: int, size: str, source_url: str) -> Optional[str]:
+        """
+        查找同一原图文件名下感知哈希近似相同的图片的图床URL
+
+        Args:
+            phash: 处理后图片的感知哈希（见 perceptual_hash）
+            size: 输出规格标识
+            source_url: 原图URL（只与文件名相同的原图比较，见 source_name）
+
+        Returns:
+            汉明距离最小且不超过 phash_distance 的图床URL，没有时返回 None
+        """
+        name = source_name(source_url)
+        if self.phash_distance < 0 or not name or phash.bit_count() < MIN_PHASH_BITS:
+            return None
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT phash, hosted_url FROM perceptual_images WHERE source_name = ? AND size = ?",
+                (name, size)
+            ).fetchall()
+            best_url, best_distance = None, self.phash_distance + 1
+            for known_hash, hosted_url in rows:
+                distance = (int(known_hash, 16) ^ phash).bit_count()
+                if distance < best_distance:
+                    best_url, best_distance = hosted_url, distance
+            if best_url is not None:
+                self._perceptual_hits += 1
+            return best_url
+
+    def record(
+        self,
+        source_url: str,
+        size: str,
+        hosted_url: str,
+        image_hash: Optional[str] = None,
+        phash: Optional[int] = None
+    ):
+        """
+        记录一次上传（或复用）结果
+
+        Args:
+            source_url: 原图URL
+            size: 输出规格标识
+            hosted_url: 图床URL
+            image_hash: 原图内容哈希，None 表示不记录
+            phash: 处理后图片的感知哈希，None 表示不记录（缺少细节或没有文件名的图片也不记录）
+        """
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO source_images (source_url, size, hosted_url, content_hash, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (source_url, size, hosted_url, image_hash, now)
+            )
+            if image_hash is not None:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO content_images (content_hash, size, hosted_url, updated_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (image_hash, size, hosted_url, now)
+                )
+            name = source_name(source_url)
+            if phash is not None and name and phash.bit_count() >= MIN_PHASH_BITS:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO perceptual_images (source_name, size, phash, hosted_url, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (name, size, f"{phash:x}", hosted_url, now)
+                )
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取统计信息
+
+        Returns:
+            包含各映射表记录数和本次运行命中次数的字典
+        """
+        with self._lock:
+            return {
+                "sources": self.conn.execute("SELECT COUNT(*) FROM source_images").fetchone()[0],
+                "contents": self.conn.execute("SELECT COUNT(*) FROM content_images").fetchone()[0],
+                "perceptuals": self.conn.execute("SELECT COUNT(*) FROM perceptual_images").fetchone()[0],
+                "source_hits": self._source_hits,
+                "content_hits": self._content_hits,
+                "perceptual_hits": self._perceptual_hits,
+            }
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
+
+
+# 全局上传记录（同一进程内的所有图片处理器共用）
+_global_registry: Optional[ImageRegistry] = None
+_global_registry_lock = Lock()
+
+
+def get_image_registry() -> Optional[ImageRegistry]:
+    """
+    获取全局图床上传记录
+
+    Returns:
+        ImageRegistry 实例，IMAGE_REGISTRY_ENABLED=false 时返回 None
+    """
+    global _global_registry
+    import config
+
+    if not config.IMAGE_REGISTRY_ENABLED:
+        return None
+
+    if _global_registry is None:
+        with _global_registry_lock:
+            if _global_registry is None:
+                _global_registry = ImageRegistry(
+                    config.IMAGE_REGISTRY_FILE,
+                    ttl=config.IMAGE_REGISTRY_TTL_HOURS * 3600 if config.IMAGE_REGISTRY_TTL_HOURS > 0 else None,
+                    phash_distance=config.IMAGE_PHASH_MAX_DISTANCE
+                )
+    return _global_registry
@@ -0,0 +1,203 @@
+"""__LAYOUT__ 数据定位 - 用 str.find 定位脚本边界，避免对整页HTML运行正则"""
+
+import json
+from typing import Any, Dict, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库
+    orjson = None
+
+
+# 脚本节点标记（页面中 id 属性写在 type 之前，但定位时不依赖属性顺序）
+LAYOUT_ID = 'id="__LAYOUT__"'
+SCRIPT_END = "</script>"
+
+# 当前使用的 JSON 解码器名称（便于在日志和性能测试中区分）
+JSON_DECODER = "orjson" if orjson is not None else "json"
+
+# 从指定位置解码单个 JSON 值（用于只解码需要的子树）
+_raw_decoder = json.JSONDecoder()
+
+
+def find_layout_span(html_content: Union[str, bytes]) -> Optional[Tuple[int, int]]:
+    """
+    定位 __LAYOUT__ 脚本内容在页面中的起止位置
+
+    Args:
+        html_content: 页面HTML（str 或 bytes）
+
+    Returns:
+        (起始位置, 结束位置)，未找到时返回 None
+    """
+    is_bytes = isinstance(html_content, (bytes, bytearray))
+    marker = LAYOUT_ID.encode() if is_bytes else LAYOUT_ID
+    tag_close = b">" if is_bytes else ">"
+    script_end = SCRIPT_END.encode() if is_bytes else SCRIPT_END
+
+    marker_pos = html_content.find(marker)
+    if marker_pos == -1:
+        return None
+
+    start = html_content.find(tag_close, marker_pos + len(marker))
+    if start == -1:
+        return None
+    start += 1
+
+    end = html_content.find(script_end, start)
+    if end == -1:
+        return None
+
+    return start, end
+
+
+def extract_layout_text(html_content: Union[str, bytes]) -> Optional[Union[str, bytes]]:
+    """
+    提取 __LAYOUT__ 脚本中的原始 JSON 文本
+
+    Args:
+        html_content: 页面HTML（str 或 bytes）
+
+    Returns:
+        JSON 文本，未找到时返回 None
+    """
+    span = find_layout_span(html_content)
+    if span is None:
+        return None
+    return html_content[span[0]:span[1]]
+
+
+def loads(text: Union[str, bytes]) -> Any:
+    """
+    解析 JSON（已安装 orjson 时使用 orjson）
+
+    Args:
+        text: JSON 文本
+
+    Returns:
+        解析结果
+
+    Raises:
+        ValueError: JSON 格式错误
+    """
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def load_layout(html_content: Union[str, bytes]) -> Optional[Dict[str, Any]]:
+    """
+    定位并解析页面中的 __LAYOUT__ JSON
+
+    Args:
+        html_content: 页面HTML（str 或 bytes）
+
+    Returns:
+        解析后的 JSON，未找到 __LAYOUT__ 时返回 None
+
+    Raises:
+        ValueError: JSON 格式错误
+    """
+    text = extract_layout_text(html_content)
+    if text is None:
+        return None
+    return loads(text)
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    """跳过空白字符"""
+    while pos < len(text) and text[pos] in " \t\r\n":
+        pos += 1
+    return pos
+
+
+def find_ref_uuid(layout_text: str, ref_prefix: str) -> Optional[str]:
+    """
+    在 JSON 文本中查找 resolveParamRefs 里以指定前缀开头的引用对应的 UUID
+
+    只扫描文本，不解码整个 JSON。
+
+    Args:
+        layout_text: __LAYOUT__ JSON 文本
+        ref_prefix: 引用键前缀（如 'pdp_product_data'）
+
+    Returns:
+        UUID，未找到时返回 None
+    """
+    needle = f'"{ref_prefix}'
+    pos = layout_text.find(needle)
+    while pos != -1:
+        key_end = layout_text.find('"', pos + len(needle))
+        if key_end == -1:
+            return None
+        colon = _skip_whitespace(layout_text, key_end + 1)
+        # 只接受作为键出现、值为字符串的位置
+        if colon < len(layout_text) and layout_text[colon] == ":":
+            value_start = _skip_whitespace(layout_text, colon + 1)
+            if value_start < len(layout_text) and layout_text[value_start] == '"':
+                value_end = layout_text.find('"', value_start + 1)
+                if value_end != -1:
+                    return layout_text[value_start + 1:value_end]
+        pos = layout_text.find(needle, key_end + 1)
+    return None
+
+
+def decode_resolved_value(layout_text: str, uuid: str) -> Optional[Any]:
+    """
+    只解码 resolveParamValues 中指定 UUID 对应的子树
+
+    Args:
+        layout_text: __LAYOUT__ JSON 文本
+        uuid: 引用的 UUID
+
+    Returns:
+        解码后的值，未找到时返回 None
+
+    Raises:
+        ValueError: 子树 JSON 格式错误
+    """
+    values_pos = layout_text.find('"resolveParamValues"')
+    if values_pos == -1:
+        return None
+
+    needle = f'"{uuid}"'
+    pos = layout_text.find(needle, values_pos)
+    while pos != -1:
+        colon = _skip_whitespace(layout_text, pos + len(needle))
+        if colon < len(layout_text) and layout_text[colon] == ":":
+            value_start = _skip_whitespace(layout_text, colon + 1)
+            value, _ = _raw_decoder.raw_decode(layout_text, value_start)
+            return value
+        pos = layout_text.find(needle, pos + len(needle))
+    return None
+
+
+def load_resolved_data(html_content: Union[str, bytes], ref_prefix: str) -> Optional[Dict[str, Any]]:
+    """
+    定位页面中某个引用的数据（resolveParamValues[uuid]['data']），不解码整个 __LAYOUT__
+
+    Args:
+        html_content: 页面HTML（str 或 bytes）
+        ref_prefix: 引用键前缀（如 'pdp_product_data'）
+
+    Returns:
+        数据字典，未找到时返回 None（调用方可回退到完整解析）
+    """
+    layout_text = extract_layout_text(html_content)
+    if layout_text is None:
+        return None
+    if isinstance(layout_text, (bytes, bytearray)):
+        layout_text = layout_text.decode("utf-8")
+
+    uuid = find_ref_uuid(layout_text, ref_prefix)
+    if not uuid:
+        return None
+
+    try:
+        wrapper = decode_resolved_value(layout_text, uuid)
+    except ValueError:
+        return None
+
+    if not isinstance(wrapper, dict) or not isinstance(wrapper.get("data"), dict):
+        return None
+    return wrapper["data"]
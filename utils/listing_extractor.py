@@ -0,0 +1,202 @@
+"""列表页数据提取 - 从 __LAYOUT__ JSON 中解析产品卡片和分页信息"""
+
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from bs4 import BeautifulSoup
+
+from utils.layout_locator import load_layout, load_resolved_data
+
+
+# 站点根地址（列表页 JSON 中的产品链接是相对路径）
+SITE_ROOT = "https://www.hollandandbarrett.com"
+
+# 列表页图片尺寸，与浏览器中产品卡片 img 的 src 保持一致
+LISTING_IMAGE_RESOLUTION = 320
+
+
+def extract_layout_json(html_content: str) -> Optional[Dict[str, Any]]:
+    """
+    提取页面中的 __LAYOUT__ JSON
+
+    Args:
+        html_content: 页面HTML
+
+    Returns:
+        解析后的 JSON，未找到或解析失败时返回 None
+    """
+    try:
+        return load_layout(html_content)
+    except ValueError:
+        return None
+
+
+def find_product_list_uuid(widgets: List[Dict]) -> Optional[str]:
+    """
+    递归查找产品列表数据的UUID
+
+    Args:
+        widgets: Widget 列表
+
+    Returns:
+        产品列表数据的 UUID，未找到时返回 None
+    """
+    for widget in widgets:
+        refs = widget.get("resolveParamRefs", {})
+        for key, uuid in refs.items():
+            if key.startswith("product_list"):
+                return uuid
+        if widget.get("children"):
+            uuid = find_product_list_uuid(widget["children"])
+            if uuid:
+                return uuid
+    return None
+
+
+def extract_listing_data(layout_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    从 __LAYOUT__ JSON 中取出产品列表数据（包含 tiles 和 pagination）
+
+    Args:
+        layout_data: __LAYOUT__ JSON
+
+    Returns:
+        产品列表数据，未找到时返回 None
+    """
+    uuid = find_product_list_uuid(layout_data.get("widgets", []))
+    if not uuid:
+        return None
+
+    wrapper = layout_data.get("resolveParamValues", {}).get(uuid) or {}
+    data = wrapper.get("data")
+    if not isinstance(data, dict) or "tiles" not in data:
+        return None
+    return data
+
+
+def tile_to_product(tile: Dict[str, Any]) -> Dict[str, str]:
+    """
+    将 JSON 中的产品卡片转换为与浏览器抓取一致的产品字典
+
+    Args:
+        tile: 产品卡片数据
+
+    Returns:
+        {url, brand, name, price, image}
+    """
+    url = tile.get("url", "")
+    if url.startswith("/"):
+        url = SITE_ROOT + url
+
+    images = tile.get("images") or []
+    image = images[0].replace("{resolution}", str(LISTING_IMAGE_RESOLUTION)) if images else ""
+
+    return {
+        "url": url,
+        "brand": (tile.get("brandName") or "").strip(),
+        "name": (tile.get("title") or tile.get("name") or "").strip(),
+        "price": (tile.get("actualPrice") or "").strip(),
+        "image": image,
+    }
+
+
+def parse_listing_page(html_content: str) -> Optional[Tuple[List[Dict[str, str]], Dict[str, int]]]:
+    """
+    解析列表页HTML
+
+    Args:
+        html_content: 列表页HTML
+
+    Returns:
+        (产品列表, 分页信息 {size, total, current})，页面中没有列表数据时返回 None
+    """
+    # 只解码产品列表子树，失败时回退到完整解析
+    data = load_resolved_data(html_content, "product_list")
+    if data is None or "tiles" not in data:
+        layout_data = extract_layout_json(html_content)
+        if not layout_data:
+            return None
+
+        data = extract_listing_data(layout_data)
+        if data is None:
+            return None
+
+    products = [tile_to_product(tile) for tile in data.get("tiles", [])]
+    pagination = data.get("pagination") or {}
+    return products, {
+        "size": int(pagination.get("size", len(products))),
+        "total": int(pagination.get("total", 1)),
+        "current": int(pagination.get("current", 1)),
+    }
+
+
+def build_page_url(base_url: str, page: int) -> str:
+    """
+    构造指定页码的列表页URL（?page=N，保留其他查询参数）
+
+    Args:
+        base_url: 列表页URL
+        page: 页码（从1开始，第1页不带 page 参数）
+
+    Returns:
+        页面URL
+    """
+    parts = urlsplit(base_url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != "page"]
+    if page > 1:
+        query.append(("page", str(page)))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), parts.fragment))
+
+
+def _select_text(card, css_selector: str) -> str:
+    """获取卡片内元素的文本，元素不存在时返回空字符串"""
+    element = card.select_one(css_selector)
+    return element.get_text(strip=True) if element else ""
+
+
+def _absolute_url(url: str) -> str:
+    """相对链接按站点根地址补全，空链接保持为空"""
+    return urljoin(SITE_ROOT, url) if url else ""
+
+
+def parse_listing_cards_html(html_content: str) -> List[Dict[str, str]]:
+    """
+    一次性解析页面HTML中的产品卡片（页面没有 __LAYOUT__ 列表数据时的备用方案）
+
+    使用与浏览器抓取相同的 data-test 选择器。HTML 中的相对链接按站点根地址补全，
+    与浏览器 get_attribute 返回的绝对地址一致。
+
+    Args:
+        html_content: 列表页HTML
+
+    Returns:
+        产品列表 [{url, brand, name, price, image}]
+    """
+    soup = BeautifulSoup(html_content, "html.parser")
+    products = []
+    for card in soup.select('[data-test="product-card"]'):
+        image_element = card.select_one('[data-test="product-image"]')
+        products.append({
+            "url": _absolute_url(card.get("href", "")),
+            "brand": _select_text(card, '[data-test="product-card-brand-name"]'),
+            "name": _select_text(card, '[data-test="product-card-title"]'),
+            "price": _select_text(card, '[data-test="product-card-price"]'),
+            "image": _absolute_url(image_element.get("src", "")) if image_element else "",
+        })
+    return products
+
+
+def extract_listing_products(html_content: str) -> List[Dict[str, str]]:
+    """
+    从列表页HTML中提取产品（优先解析 __LAYOUT__ JSON，失败时解析产品卡片）
+
+    Args:
+        html_content: 列表页HTML
+
+    Returns:
+        产品列表 [{url, brand, name, price, image}]
+    """
+    result = parse_listing_page(html_content)
+    if result is not None and result[0]:
+        return result[0]
+    return parse_listing_cards_html(html_content)
@@ -1,14 +1,17 @@
 """多页爬虫工具 - 支持分页爬取和断点续传"""
 
 import json
+import os
 import time
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from utils.logger import get_logger
+from utils.page_ready import wait_for_invisibility, wait_for_staleness
+import config
 
 
 class MultiPageScraper:
@@ -23,6 +26,8 @@ class MultiPageScraper:
         """
         self.driver = driver
         self.progress_file = Path("data/output/scrape_progress.json")
+        # 每页追加一行的进度日志，中断时合并为快照
+        self.journal_file = self.progress_file.with_suffix(".jsonl")
         self.logger = get_logger()
 
     def has_next_page(self) -> bool:
@@ -107,7 +112,7 @@ class MultiPageScraper:
                     if button.is_displayed():
                         button.click()
                         print("  → 已关闭 Cookie 弹窗")
-                        time.sleep(1)
+                        wait_for_invisibility(self.driver, button)
                         return True
                 except:
                     continue
@@ -141,7 +146,9 @@ class MultiPageScraper:
 
             # 滚动到按钮位置
             self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", next_button)
-            time.sleep(1)
+
+            # 记录当前页第一个产品卡片，用于判断列表是否已重新渲染
+            old_cards = self.driver.find_elements(By.CSS_SELECTOR, '[data-test="product-card"]')
 
             # 使用 JavaScript 点击(避免被遮挡)
             try:
@@ -153,8 +160,9 @@ class MultiPageScraper:
             
             print(f"\n→ 点击下一页按钮...")
 
-            # 等待页面加载
-            time.sleep(3)
+            # 等待旧的产品卡片被替换（页面跳转或列表重新渲染）
+            if old_cards:
+                wait_for_staleness(self.driver, old_cards[0], timeout=config.PAGE_READY_TIMEOUT)
 
             # 等待产品卡片重新加载 - 使用正确的选择器
             WebDriverWait(self.driver, 10).until(
@@ -174,42 +182,105 @@ class MultiPageScraper:
             print(f"✗ 跳转下一页失败: {e}")
             return False
 
+    def append_progress(self, base_url: str, page: int, products: List[Dict]):
+        """
+        追加一页的爬取进度（每页一行 JSON，写入成本与已爬取页数无关）
+
+        Args:
+            base_url: 列表页URL
+            page: 页码
+            products: 该页的产品数据
+        """
+        record = {
+            "base_url": base_url,
+            "page": page,
+            "products": products,
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+        }
+        try:
+            self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.journal_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            print(f"  → 保存进度失败: {e}")
+
     def save_progress(self, data: Dict):
         """
-        保存爬取进度
+        保存进度快照（先写临时文件再替换，中断时不会损坏已有快照）
 
         Args:
             data: 进度数据
         """
         try:
             self.progress_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.progress_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            temp_file = self.progress_file.with_name(f"{self.progress_file.name}.tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(temp_file, self.progress_file)
         except Exception as e:
             print(f"  → 保存进度失败: {e}")
 
     def load_progress(self) -> Optional[Dict]:
         """
-        加载爬取进度
+        加载爬取进度（快照 + 进度日志中之后追加的页面）
 
         Returns:
             Dict: 进度数据，不存在返回 None
         """
+        progress = None
         try:
             if self.progress_file.exists():
                 with open(self.progress_file, "r", encoding="utf-8") as f:
-                    return json.load(f)
+                    progress = json.load(f)
         except Exception as e:
             print(f"  → 加载进度失败: {e}")
-        return None
 
-    def clear_progress(self):
-        """清除进度文件"""
         try:
-            if self.progress_file.exists():
-                self.progress_file.unlink()
+            if self.journal_file.exists():
+                with open(self.journal_file, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except ValueError:
+                            # 最后一行可能在写入时中断，之前的记录仍然有效
+                            print("  → 跳过不完整的进度记录")
+                            break
+
+                        if progress is None or progress.get("base_url") != record["base_url"]:
+                            progress = {"base_url": record["base_url"], "pages_scraped": 0, "products": []}
+                        progress["products"].extend(record["products"])
+                        progress["last_page"] = record["page"]
+                        progress["pages_scraped"] += 1
+                        progress["timestamp"] = record["timestamp"]
         except Exception as e:
-            print(f"  → 清除进度失败: {e}")
+            print(f"  → 加载进度失败: {e}")
+
+        if progress is not None:
+            progress["total_products"] = len(progress.get("products", []))
+        return progress
+
+    def compact_progress(self):
+        """将进度日志合并为一个快照文件"""
+        if not self.journal_file.exists():
+            return
+        progress = self.load_progress()
+        if progress is not None:
+            self.save_progress(progress)
+        try:
+            self.journal_file.unlink()
+        except Exception as e:
+            print(f"  → 合并进度失败: {e}")
+
+    def clear_progress(self):
+        """清除进度文件"""
+        for path in (self.progress_file, self.journal_file):
+            try:
+                if path.exists():
+                    path.unlink()
+            except Exception as e:
+                print(f"  → 清除进度失败: {e}")
 
     def estimate_total_pages(self) -> Optional[int]:
         """
@@ -307,6 +378,10 @@ def scrape_all_pages(
                 current_page = progress.get("last_page", 1) + 1
                 print(f"✓ 从第 {current_page} 页继续爬取")
 
+    # 不继续时清除旧进度，避免新页面追加到旧的进度日志后
+    if enable_resume and current_page == start_page:
+        scraper.clear_progress()
+
     print(f"\n{'=' * 70}")
     print(f"开始多页爬取")
     print(f"{'=' * 70}")
@@ -324,6 +399,7 @@ def scrape_all_pages(
         url = base_url
 
     page_count = 0
+    interrupted = False
 
     try:
         while True:
@@ -349,16 +425,9 @@ def scrape_all_pages(
             print(f"✓ 第 {current_page} 页爬取完成，获得 {len(products)} 个产品")
             print(f"✓ 累计: {len(all_products)} 个产品")
 
-            # 保存进度
+            # 保存进度（只追加本页产品）
             if enable_resume:
-                scraper.save_progress({
-                    "base_url": base_url,
-                    "last_page": current_page,
-                    "pages_scraped": page_count,
-                    "total_products": len(all_products),
-                    "products": all_products,
-                    "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-                })
+                scraper.append_progress(base_url, current_page, products)
 
             # 尝试跳转到下一页
             if not scraper.go_to_next_page():
@@ -372,13 +441,18 @@ def scrape_all_pages(
             time.sleep(2)
 
     except KeyboardInterrupt:
+        interrupted = True
         print(f"\n\n⚠️  用户中断爬取")
         print(f"✓ 已保存进度，下次可继续")
         print(f"✓ 已爬取 {page_count} 页，共 {len(all_products)} 个产品")
 
-    # 清除进度文件（如果正常完成）
     if enable_resume:
-        scraper.clear_progress()
+        if interrupted:
+            # 中断时将进度日志合并为快照，下次从快照继续
+            scraper.compact_progress()
+        else:
+            # 清除进度文件（如果正常完成）
+            scraper.clear_progress()
 
     print(f"\n{'=' * 70}")
     print(f"多页爬取完成")
@@ -388,3 +462,137 @@ def scrape_all_pages(
     print(f"{'=' * 70}")
 
     return all_products
+
+
+def scrape_all_pages_direct(
+    base_url: str,
+    max_pages: Optional[int] = None,
+    max_workers: int = 8,
+    retry_times: int = 2,
+    fetcher=None,
+    fallback_page_func: Optional[Callable[[str], Optional[List[Dict]]]] = None
+) -> Optional[List[Dict]]:
+    """
+    直接按 ?page=N 并发请求所有分页（不启动浏览器，不点击“下一页”）
+
+    先请求第1页，从 __LAYOUT__ JSON 中读取总页数，然后并发请求其余页面，
+    按页码顺序合并产品并按URL去重。重试后仍失败的页面交给 fallback_page_func
+    （如浏览器打开该页）补爬；仍有页面缺失时返回 None，不返回不完整的产品列表。
+
+    Args:
+        base_url: 列表页URL
+        max_pages: 最大爬取页数，None 表示爬取所有页
+        max_workers: 并发请求数
+        retry_times: 单页失败重试次数
+        fetcher: HttpFetcher 实例，None 表示使用全局实例
+        fallback_page_func: 补爬单个分页的函数，参数为分页URL，返回产品列表（失败时返回空列表或 None）
+
+    Returns:
+        List[Dict]: 所有产品数据；第1页无法获取或解析、或有分页补爬后仍然失败时返回 None
+        （调用方可回退到浏览器翻页）
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    from utils.http_fetcher import get_http_fetcher
+    from utils.listing_extractor import build_page_url, parse_listing_page
+
+    logger = get_logger()
+    fetcher = fetcher or get_http_fetcher()
+
+    def fetch_page(page: int) -> Optional[List[Dict]]:
+        url = build_page_url(base_url, page)
+        for attempt in range(1, retry_times + 1):
+            html_content = fetcher.fetch_layout_page(url)
+            result = parse_listing_page(html_content) if html_content else None
+            if result is not None:
+                return result[0]
+            if attempt < retry_times:
+                logger.debug(f"第 {page} 页获取失败，重试 ({attempt}/{retry_times})")
+        return None
+
+    start_time = time.time()
+    print(f"\n{'=' * 70}")
+    print("开始多页爬取（直接分页请求）")
+    print(f"{'=' * 70}")
+
+    # 第1页：获取产品和总页数
+    first_html = fetcher.fetch_layout_page(build_page_url(base_url, 1))
+    first_result = parse_listing_page(first_html) if first_html else None
+    if first_result is None:
+        print("✗ 无法从第 1 页解析列表数据")
+        return None
+
+    first_products, pagination = first_result
+    total_pages = pagination["total"]
+    if max_pages:
+        total_pages = min(total_pages, max_pages)
+
+    print(f"总页数: {pagination['total']}（本次爬取 {total_pages} 页）")
+    print(f"并发数: {max_workers}")
+    print(f"{'=' * 70}")
+    print(f"✓ 第 1 页: {len(first_products)} 个产品")
+
+    page_products = {1: first_products}
+    failed_pages = []
+
+    if total_pages > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            future_to_page = {
+                executor.submit(fetch_page, page): page
+                for page in range(2, total_pages + 1)
+            }
+            for future in as_completed(future_to_page):
+                page = future_to_page[future]
+                try:
+                    products = future.result()
+                except Exception as e:
+                    logger.error(f"第 {page} 页爬取异常: {e}")
+                    products = None
+
+                if products is None:
+                    failed_pages.append(page)
+                    print(f"✗ 第 {page} 页获取失败")
+                else:
+                    page_products[page] = products
+                    print(f"✓ 第 {page} 页: {len(products)} 个产品")
+
+    # 直接请求失败的分页交给备用方式补爬
+    if failed_pages and fallback_page_func is not None:
+        for page in sorted(failed_pages):
+            print(f"→ 第 {page} 页改用备用方式爬取")
+            try:
+                products = fallback_page_func(build_page_url(base_url, page))
+            except Exception as e:
+                logger.error(f"第 {page} 页备用爬取异常: {e}")
+                products = None
+            if products:
+                page_products[page] = products
+                failed_pages.remove(page)
+                print(f"✓ 第 {page} 页: {len(products)} 个产品")
+
+    # 按页码顺序合并，去除跨页重复的产品
+    all_products = []
+    seen_urls = set()
+    for page in sorted(page_products):
+        for product in page_products[page]:
+            if product["url"] in seen_urls:
+                continue
+            seen_urls.add(product["url"])
+            all_products.append(product)
+
+    elapsed = time.time() - start_time
+    print(f"\n{'=' * 70}")
+    print("多页爬取完成")
+    print(f"{'=' * 70}")
+    print(f"总页数: {len(page_products)}")
+    print(f"总产品: {len(all_products)}")
+    if failed_pages:
+        print(f"失败页: {sorted(failed_pages)}")
+    print(f"耗时: {elapsed:.1f}秒")
+    print(f"{'=' * 70}")
+
+    if failed_pages:
+        # 产品列表不完整，由调用方回退到完整的浏览器翻页
+        print(f"✗ {len(failed_pages)} 个分页无法获取，不使用不完整的产品列表")
+        return None
+
+    return all_products
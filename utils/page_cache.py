@@ -0,0 +1,404 @@
+"""页面缓存 - 按URL缓存压缩后的原始HTML（或图片等二进制内容），支持过期时间、容量上限和条件请求"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Optional
+
+from utils.logger import get_logger
+
+
+class PageCache:
+    """
+    磁盘页面缓存（线程安全）
+
+    每个URL对应两个文件（按URL哈希分目录存放）:
+        <key>.html.gz  gzip 压缩的内容
+        <key>.json     元数据（url, fetched_at, etag, last_modified, content_hash, size 及调用方附加的字段）
+
+    过期条目不会立即删除：带 ETag / Last-Modified 的条目可用于条件请求，
+    服务器返回 304 时直接复用缓存内容。
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        ttl: Optional[float] = 24 * 3600,
+        max_size_mb: Optional[float] = 500,
+        compress_level: int = 6,
+        suffix: str = ".html.gz"
+    ):
+        """
+        初始化页面缓存
+
+        Args:
+            cache_dir: 缓存目录
+            ttl: 缓存有效期（秒），过期后需要重新验证，None 表示永不过期
+            max_size_mb: 缓存总大小上限（MB），超过后按抓取时间从旧到新淘汰，None 表示不限制
+            compress_level: gzip 压缩级别（图片等已压缩的内容可设为 0）
+            suffix: 内容文件后缀
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.max_size_bytes = max_size_mb * 1024 * 1024 if max_size_mb else None
+        self.compress_level = compress_level
+        self.suffix = suffix
+        self.logger = get_logger()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._not_modified = 0
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._total_size = sum(path.stat().st_size for path in self.cache_dir.glob(f"*/*{suffix}"))
+
+    @staticmethod
+    def _key(url: str) -> str:
+        """URL 对应的缓存键"""
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _paths(self, url: str):
+        """URL 对应的 (内容文件, 元数据文件) 路径"""
+        key = self._key(url)
+        directory = self.cache_dir / key[:2]
+        return directory / f"{key}{self.suffix}", directory / f"{key}.json"
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        """先写临时文件再替换，避免并发读取到半个文件（每次写入使用独立的临时文件，多个线程可同时写同一URL）"""
+        temp_file = tempfile.NamedTemporaryFile(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp", delete=False)
+        try:
+            with temp_file:
+                temp_file.write(data)
+            os.replace(temp_file.name, path)
+        except BaseException:
+            Path(temp_file.name).unlink(missing_ok=True)
+            raise
+
+    def _is_fresh(self, meta: Dict[str, Any]) -> bool:
+        """判断缓存是否仍在有效期内"""
+        if self.ttl is None:
+            return True
+        return time.time() - meta.get("fetched_at", 0) < self.ttl
+
+    def get_bytes_entry(self, url: str, allow_stale: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存条目（二进制内容 + 元数据）
+
+        Args:
+            url: 资源URL
+            allow_stale: 是否返回已过期的条目（用于发送条件请求）
+
+        Returns:
+            {url, content, fetched_at, etag, last_modified, content_hash, fresh, ...}，未命中时返回 None
+        """
+        content_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            fresh = self._is_fresh(meta)
+            content = gzip.decompress(content_path.read_bytes()) if fresh or allow_stale else None
+        except (OSError, ValueError, EOFError):
+            meta, fresh, content = None, False, None
+
+        # 只有未过期的条目计为命中（过期条目需要重新验证）
+        with self._lock:
+            if fresh:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+        if content is None:
+            return None
+        return {**meta, "content": content, "fresh": fresh}
+
+    def get_entry(self, url: str, allow_stale: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        读取缓存的页面条目（含元数据）
+
+        Args:
+            url: 页面URL
+            allow_stale: 是否返回已过期的条目（用于发送条件请求）
+
+        Returns:
+            {url, html, fetched_at, etag, last_modified, content_hash, fresh}，未命中时返回 None
+        """
+        entry = self.get_bytes_entry(url, allow_stale)
+        if entry is None:
+            return None
+        try:
+            entry["html"] = entry.pop("content").decode("utf-8")
+        except UnicodeDecodeError:
+            return None
+        return entry
+
+    def get(self, url: str) -> Optional[str]:
+        """
+        读取未过期的缓存页面
+
+        Args:
+            url: 页面URL
+
+        Returns:
+            页面HTML，未命中或已过期时返回 None
+        """
+        entry = self.get_entry(url)
+        return entry["html"] if entry else None
+
+    def put(
+        self,
+        url: str,
+        html_content: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ):
+        """
+        写入页面缓存
+
+        Args:
+            url: 页面URL
+            html_content: 页面HTML
+            etag: 响应的 ETag
+            last_modified: 响应的 Last-Modified
+        """
+        self.put_bytes(url, html_content.encode("utf-8"), etag, last_modified)
+
+    def put_bytes(
+        self,
+        url: str,
+        content: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ):
+        """
+        写入二进制内容
+
+        Args:
+            url: 资源URL
+            content: 响应内容
+            etag: 响应的 ETag
+            last_modified: 响应的 Last-Modified
+        """
+        content_path, meta_path = self._paths(url)
+        compressed = gzip.compress(content, compresslevel=self.compress_level)
+        meta = {
+            "url": url,
+            "fetched_at": time.time(),
+            "etag": etag,
+            "last_modified": last_modified,
+            "content_hash": hashlib.sha256(content).hexdigest(),
+            "size": len(compressed),
+        }
+
+        try:
+            content_path.parent.mkdir(parents=True, exist_ok=True)
+            old_size = content_path.stat().st_size if content_path.exists() else 0
+            self._write_atomic(content_path, compressed)
+            self._write_atomic(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+        except OSError as e:
+            self.logger.warning(f"写入页面缓存失败: {e}")
+            return
+
+        with self._lock:
+            self._total_size += len(compressed) - old_size
+            over_limit = self.max_size_bytes is not None and self._total_size > self.max_size_bytes
+
+        if over_limit:
+            self.evict()
+
+    def update_meta(self, url: str, **fields):
+        """
+        更新缓存条目的元数据（如记录由该内容生成的下游结果）
+
+        Args:
+            url: 资源URL
+            **fields: 要写入元数据的字段
+        """
+        _, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            meta.update(fields)
+            self._write_atomic(meta_path, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+        except (OSError, ValueError):
+            pass
+
+    def touch(self, url: str):
+        """
+        刷新缓存条目的抓取时间（条件请求返回 304 时调用）
+
+        Args:
+            url: 资源URL
+        """
+        self.update_meta(url, fetched_at=time.time())
+
+    def mark_not_modified(self, url: str):
+        """
+        记录一次 304 响应：缓存内容仍然有效，刷新抓取时间
+
+        Args:
+            url: 资源URL
+        """
+        self.touch(url)
+        with self._lock:
+            self._not_modified += 1
+
+    def _remove(self, html_path: Path, meta_path: Path) -> int:
+        """删除一个缓存条目，返回释放的字节数"""
+        freed = 0
+        for path in (html_path, meta_path):
+            try:
+                if path is html_path:
+                    freed = path.stat().st_size
+                path.unlink()
+            except OSError:
+                pass
+        return freed
+
+    def evict(self) -> int:
+        """
+        淘汰无法重新验证的过期条目（没有 ETag / Last-Modified），仍超过容量上限时
+        按抓取时间从旧到新淘汰，直到降到上限的 90%
+
+        Returns:
+            int: 删除的条目数
+        """
+        entries = []
+        for meta_path in self.cache_dir.glob("*/*.json"):
+            html_path = meta_path.with_name(meta_path.name[:-len(".json")] + self.suffix)
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                size = html_path.stat().st_size
+            except (OSError, ValueError):
+                self._remove(html_path, meta_path)
+                continue
+            entries.append((meta.get("fetched_at", 0), size, html_path, meta_path, meta))
+
+        removed = 0
+        total_size = 0
+        kept = []
+        for entry in entries:
+            meta = entry[4]
+            if self._is_fresh(meta) or meta.get("etag") or meta.get("last_modified"):
+                kept.append(entry)
+                total_size += entry[1]
+            else:
+                self._remove(entry[2], entry[3])
+                removed += 1
+
+        if self.max_size_bytes is not None and total_size > self.max_size_bytes:
+            target = self.max_size_bytes * 0.9
+            for _, _, html_path, meta_path, _ in sorted(kept, key=lambda entry: entry[0]):
+                if total_size <= target:
+                    break
+                total_size -= self._remove(html_path, meta_path)
+                removed += 1
+
+        with self._lock:
+            self._total_size = total_size
+
+        if removed:
+            self.logger.info(f"🧹 页面缓存淘汰 {removed} 个条目（剩余 {total_size / 1024 / 1024:.1f}MB）")
+        return removed
+
+    def clear(self):
+        """清空缓存"""
+        for path in self.cache_dir.glob("*/*"):
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        with self._lock:
+            self._total_size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计"""
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "not_modified": self._not_modified,
+                "size_mb": self._total_size / 1024 / 1024,
+            }
+
+
+def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """
+    根据缓存条目构建条件请求头
+
+    Args:
+        entry: get_entry / get_bytes_entry 返回的缓存条目，None 表示无缓存
+
+    Returns:
+        包含 If-None-Match / If-Modified-Since 的请求头（条目没有验证信息时为空字典）
+    """
+    headers = {}
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+# 全局缓存实例
+_global_cache: Optional[PageCache] = None
+_global_cache_lock = Lock()
+
+
+def get_page_cache() -> Optional[PageCache]:
+    """
+    获取全局页面缓存（根据配置文件创建）
+
+    Returns:
+        PageCache 实例，PAGE_CACHE_ENABLED=false 时返回 None
+    """
+    global _global_cache
+    import config
+
+    if not config.PAGE_CACHE_ENABLED:
+        return None
+
+    if _global_cache is None:
+        with _global_cache_lock:
+            if _global_cache is None:
+                _global_cache = PageCache(
+                    cache_dir=config.PAGE_CACHE_DIR,
+                    ttl=config.PAGE_CACHE_TTL_HOURS * 3600 if config.PAGE_CACHE_TTL_HOURS > 0 else None,
+                    max_size_mb=config.PAGE_CACHE_MAX_MB or None
+                )
+    return _global_cache
+
+
+# 全局图片缓存实例
+_global_image_cache: Optional[PageCache] = None
+
+
+def get_image_cache() -> Optional[PageCache]:
+    """
+    获取全局图片缓存（保存原图及其 ETag / Last-Modified，用于条件请求）
+
+    Returns:
+        PageCache 实例，IMAGE_CACHE_ENABLED=false 时返回 None
+    """
+    global _global_image_cache
+    import config
+
+    if not config.IMAGE_CACHE_ENABLED:
+        return None
+
+    if _global_image_cache is None:
+        with _global_cache_lock:
+            if _global_image_cache is None:
+                _global_image_cache = PageCache(
+                    cache_dir=config.IMAGE_CACHE_DIR,
+                    ttl=config.IMAGE_CACHE_TTL_HOURS * 3600 if config.IMAGE_CACHE_TTL_HOURS > 0 else None,
+                    max_size_mb=config.IMAGE_CACHE_MAX_MB or None,
+                    # 图片本身已压缩，只保留 gzip 封装
+                    compress_level=0,
+                    suffix=".img.gz"
+                )
+    return _global_image_cache
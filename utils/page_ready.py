@@ -0,0 +1,265 @@
+"""页面就绪检测 - 用事件驱动的等待代替固定 sleep，并统计每类等待的耗时"""
+
+import time
+from threading import Lock
+from typing import Dict, Optional
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from utils.logger import get_logger
+
+
+# document.readyState 的先后顺序
+READY_STATE_ORDER = {"loading": 0, "interactive": 1, "complete": 2}
+
+# 轮询间隔（秒），WebDriverWait 默认 0.5 秒，对本地 DOM 查询来说太粗
+POLL_FREQUENCY = 0.1
+
+
+class ReadinessStats:
+    """就绪等待的耗时统计（线程安全）"""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, elapsed: float, ready: bool):
+        """
+        记录一次等待
+
+        Args:
+            name: 等待类型名称
+            elapsed: 耗时（秒）
+            ready: 是否在超时前就绪
+        """
+        with self._lock:
+            stat = self._stats.setdefault(
+                name, {"count": 0, "timeouts": 0, "total": 0.0, "max": 0.0}
+            )
+            stat["count"] += 1
+            stat["total"] += elapsed
+            stat["max"] = max(stat["max"], elapsed)
+            if not ready:
+                stat["timeouts"] += 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        获取统计汇总
+
+        Returns:
+            {等待类型: {count, timeouts, avg, max, total}}
+        """
+        with self._lock:
+            return {
+                name: {
+                    "count": stat["count"],
+                    "timeouts": stat["timeouts"],
+                    "avg": stat["total"] / stat["count"] if stat["count"] else 0.0,
+                    "max": stat["max"],
+                    "total": stat["total"],
+                }
+                for name, stat in self._stats.items()
+            }
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._stats.clear()
+
+
+# 全局统计实例
+_global_stats = ReadinessStats()
+
+
+def get_readiness_stats() -> ReadinessStats:
+    """获取全局就绪等待统计"""
+    return _global_stats
+
+
+def log_readiness_summary(stats: Optional[ReadinessStats] = None):
+    """
+    输出就绪等待的耗时统计
+
+    Args:
+        stats: 统计实例，None 表示使用全局统计
+    """
+    summary = (stats or _global_stats).summary()
+    if not summary:
+        return
+
+    logger = get_logger()
+    lines = ["页面就绪等待统计:"]
+    for name, stat in sorted(summary.items()):
+        lines.append(
+            f"  - {name}: {stat['count']} 次, 平均 {stat['avg']:.2f}s, "
+            f"最长 {stat['max']:.2f}s, 超时 {stat['timeouts']} 次"
+        )
+    logger.info("\n".join(lines))
+
+
+def _wait(driver, name: str, condition, timeout: float, stats: Optional[ReadinessStats]) -> bool:
+    """
+    轮询等待条件成立并记录耗时
+
+    Args:
+        driver: WebDriver 实例
+        name: 等待类型名称（用于统计）
+        condition: 接收 driver 的判断函数
+        timeout: 超时时间（秒）
+        stats: 统计实例，None 表示使用全局统计
+
+    Returns:
+        bool: 超时前是否就绪
+    """
+    start_time = time.monotonic()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(condition)
+        ready = True
+    except TimeoutException:
+        ready = False
+    (stats or _global_stats).record(name, time.monotonic() - start_time, ready)
+    return ready
+
+
+def _ready_state_reached(driver, state: str) -> bool:
+    """判断 document.readyState 是否已达到指定状态"""
+    current = driver.execute_script("return document.readyState")
+    return READY_STATE_ORDER.get(current, -1) >= READY_STATE_ORDER[state]
+
+
+def wait_for_ready_state(
+    driver,
+    state: str = "interactive",
+    timeout: float = 10,
+    stats: Optional[ReadinessStats] = None
+) -> bool:
+    """
+    等待 document.readyState 达到指定状态
+
+    Args:
+        driver: WebDriver 实例
+        state: 目标状态 ('interactive' 或 'complete')
+        timeout: 超时时间（秒）
+        stats: 统计实例，None 表示使用全局统计
+
+    Returns:
+        bool: 超时前是否就绪
+    """
+    return _wait(
+        driver,
+        f"readyState:{state}",
+        lambda d: _ready_state_reached(d, state),
+        timeout,
+        stats
+    )
+
+
+def wait_for_layout(driver, timeout: float = 10, stats: Optional[ReadinessStats] = None) -> bool:
+    """
+    等待 __LAYOUT__ 数据节点解析完成
+
+    __LAYOUT__ 是服务端内联的脚本节点，节点存在且文档不再处于 loading 状态时
+    其内容就是完整的，无需等待图片等资源加载。
+
+    Args:
+        driver: WebDriver 实例
+        timeout: 超时时间（秒）
+        stats: 统计实例，None 表示使用全局统计
+
+    Returns:
+        bool: 超时前是否就绪
+    """
+    script = (
+        "return document.readyState !== 'loading' "
+        "&& document.getElementById('__LAYOUT__') !== null"
+    )
+    return _wait(driver, "layout", lambda d: d.execute_script(script), timeout, stats)
+
+
+def wait_for_selector(
+    driver,
+    css_selector: str,
+    timeout: float = 10,
+    stats: Optional[ReadinessStats] = None
+) -> bool:
+    """
+    等待匹配 CSS 选择器的元素出现
+
+    Args:
+        driver: WebDriver 实例
+        css_selector: CSS 选择器
+        timeout: 超时时间（秒）
+        stats: 统计实例，None 表示使用全局统计
+
+    Returns:
+        bool: 超时前是否就绪
+    """
+    script = "return document.querySelector(arguments[0]) !== null"
+    return _wait(
+        driver,
+        f"selector:{css_selector}",
+        lambda d: d.execute_script(script, css_selector),
+        timeout,
+        stats
+    )
+
+
+def wait_for_staleness(driver, element, timeout: float = 10, stats: Optional[ReadinessStats] = None) -> bool:
+    """
+    等待元素从 DOM 中移除（用于判断页面已跳转或列表已重新渲染）
+
+    Args:
+        driver: WebDriver 实例
+        element: 旧页面中的元素
+        timeout: 超时时间（秒）
+        stats: 统计实例，None 表示使用全局统计
+
+    Returns:
+        bool: 超时前是否已移除
+    """
+    return _wait(driver, "staleness", EC.staleness_of(element), timeout, stats)
+
+
+def wait_for_invisibility(driver, element, timeout: float = 3, stats: Optional[ReadinessStats] = None) -> bool:
+    """
+    等待元素隐藏（用于确认弹窗已关闭）
+
+    Args:
+        driver: WebDriver 实例
+        element: 元素
+        timeout: 超时时间（秒）
+        stats: 统计实例，None 表示使用全局统计
+
+    Returns:
+        bool: 超时前是否已隐藏
+    """
+    return _wait(driver, "invisibility", EC.invisibility_of_element(element), timeout, stats)
+
+
+def wait_for_clickable(driver, xpath: str, timeout: float = 5, stats: Optional[ReadinessStats] = None):
+    """
+    等待匹配 XPath 的元素可点击
+
+    多个候选选择器可用 " | " 合并成一个 XPath，只需等待一次。
+
+    Args:
+        driver: WebDriver 实例
+        xpath: XPath 表达式
+        timeout: 超时时间（秒）
+        stats: 统计实例，None 表示使用全局统计
+
+    Returns:
+        可点击的元素，超时返回 None
+    """
+    start_time = time.monotonic()
+    try:
+        element = WebDriverWait(driver, timeout, poll_frequency=POLL_FREQUENCY).until(
+            EC.element_to_be_clickable((By.XPATH, xpath))
+        )
+    except TimeoutException:
+        element = None
+    (stats or _global_stats).record("clickable", time.monotonic() - start_time, element is not None)
+    return element
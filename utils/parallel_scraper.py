@@ -1,17 +1,23 @@
 """并行爬取工具 - 使用多线程加速详情页爬取"""
 
 import time
-import random
 import json
 from pathlib import Path
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock, Semaphore
-from typing import List, Dict, Callable, Any
+import multiprocessing
+from collections.abc import Sized
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from itertools import chain, islice
+from threading import Lock
+from typing import List, Dict, Callable, Any, Iterable, Iterator, Optional
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 from utils.logger import get_logger
+from utils.concurrency_controller import AdaptiveConcurrency
+from utils.driver_pool import DriverPool
+from utils.rate_limiter import RateLimiter, get_rate_limiter, host_of
 
 
 class ParallelScraper:
@@ -22,7 +28,13 @@ class ParallelScraper:
         max_workers: int = 4,
         retry_times: int = 3,
         request_delay: tuple = (1, 3),
-        enable_headless: bool = True
+        enable_headless: bool = True,
+        fetch_engine: str = "selenium",
+        driver_max_pages: int = 100,
+        driver_max_memory_mb: float = None,
+        parse_workers: int = 0,
+        concurrency: AdaptiveConcurrency = None,
+        rate_limiter: RateLimiter = None
     ):
         """
         初始化并行爬取器
@@ -32,19 +44,46 @@ class ParallelScraper:
             retry_times: 失败重试次数，默认3次
             request_delay: 请求延迟范围(最小, 最大)秒，默认(1, 3)
             enable_headless: 是否启用无头模式，默认True
+            fetch_engine: 抓取引擎，"http" 表示首次尝试不创建浏览器（driver 传 None），
+                          失败后的重试才回退到 Selenium（至少重试一次）；"selenium" 表示始终使用浏览器
+            driver_max_pages: 单个浏览器最多处理的页面数，超过后回收重建
+            driver_max_memory_mb: 浏览器内存上限（MB），超过后回收重建，None 表示不检查
+            parse_workers: 解析进程数，> 0 且提供了 fetch_func/parse_func 时，
+                           抓取线程只负责获取HTML，解析交给独立的进程池，0 表示在抓取线程内解析
+            concurrency: 并发控制器，None 表示固定 max_workers 并发和 request_delay 随机延迟；
+                         自适应控制器的 max_limit 决定线程数和浏览器池大小
+            rate_limiter: 按主机限速的令牌桶，None 表示不限速
         """
         self.max_workers = max_workers
         self.retry_times = retry_times
         self.request_delay = request_delay
         self.enable_headless = enable_headless
+        self.fetch_engine = fetch_engine
         self.logger = get_logger()
         self.lock = Lock()  # 用于保护共享资源
-        self.rate_limiter = Semaphore(max_workers)  # 限流控制
+        # 并发控制：限制在途请求数和请求间隔
+        self.concurrency = concurrency or AdaptiveConcurrency(
+            initial_limit=max_workers,
+            request_delay=request_delay,
+            adaptive=False
+        )
+        self.max_workers = max(max_workers, self.concurrency.max_limit)
+        self.rate_limiter = rate_limiter or RateLimiter(0)
         self.failed_items = []  # 记录失败的产品
+        self._driver_path = None  # ChromeDriver 路径（只安装/解析一次）
+        self.parse_workers = parse_workers
+        self._parse_executor: Optional[ProcessPoolExecutor] = None
+        # 浏览器池：每个工作线程最多占用一个预热的浏览器，跨产品复用
+        self.driver_pool = DriverPool(
+            create_driver=self._create_driver,
+            size=self.max_workers,
+            max_pages=driver_max_pages,
+            max_memory_mb=driver_max_memory_mb
+        )
 
     def _create_driver(self) -> webdriver.Chrome:
         """
-        为每个线程创建独立的WebDriver实例
+        创建新的WebDriver实例（由浏览器池调用）
 
         Returns:
             webdriver.Chrome: Chrome WebDriver实例
@@ -73,7 +112,11 @@ class ParallelScraper:
         # 设置页面加载策略
         options.page_load_strategy = 'normal'
 
-        service = Service(ChromeDriverManager().install())
+        with self.lock:
+            if self._driver_path is None:
+                self._driver_path = ChromeDriverManager().install()
+
+        service = Service(self._driver_path)
         driver = webdriver.Chrome(service=service, options=options)
 
         # 设置超时时间
@@ -87,241 +130,496 @@ class ParallelScraper:
         item_data: Dict,
         scrape_func: Callable,
         item_index: int,
-        total_items: int
-    ) -> Dict:
+        total_items: Any,
+        fetch_func: Callable = None,
+        parse_func: Callable = None,
+        start_attempt: int = 1
+    ) -> Any:
         """
         爬取单个项目（在单独的线程中运行，带重试机制）
 
+        有解析进程池时，抓取到HTML后把解析提交到进程池并立即返回，线程可以马上抓取下一个URL，
+        解析结果由 iter_items_parallel 汇总（HTTP 抓取解析为空时由它回退到 Selenium）。
+
         Args:
             item_data: 项目数据
-            scrape_func: 爬取函数
+            scrape_func: 爬取函数（提供 fetch_func/parse_func 时不使用）
             item_index: 当前索引
-            total_items: 总数
+            total_items: 总数（惰性输入时为 "?"）
+            fetch_func: 抓取阶段函数，接收(driver, url)，返回HTML
+            parse_func: 解析阶段函数，接收HTML，返回详情字典
+            start_attempt: 起始尝试次数（解析为空回退到 Selenium 时从第 2 次开始）
 
         Returns:
-            Dict: 更新后的项目数据
+            Dict: 更新后的项目数据；解析已提交到进程池时为 (解析 Future, 尝试次数)
         """
-        driver = None
         url = item_data.get("url", "")
+        # HTTP 引擎未获取到详情时，无论 retry_times 是多少都至少回退一次 Selenium
+        max_attempts = max(self.retry_times, 2) if self.fetch_engine == "http" else self.retry_times
 
-        # 使用信号量控制并发请求速率
-        with self.rate_limiter:
-            # 添加随机延迟，避免请求过快
-            delay = random.uniform(*self.request_delay)
-            time.sleep(delay)
+        # 重试机制（每次尝试占用一个并发槽位，由并发控制器决定在途请求数和请求间隔）
+        for attempt in range(start_attempt, max_attempts + 1):
+            driver = None
+            try:
+                if attempt > start_attempt:
+                    time.sleep(2)  # 重试前等待
 
-            # 重试机制
-            for attempt in range(1, self.retry_times + 1):
-                try:
-                    # 如果不是第一次尝试，先关闭之前的driver
-                    if driver:
-                        try:
-                            driver.quit()
-                        except:
-                            pass
-                        time.sleep(2)  # 重试前等待
+                # HTTP 引擎首次尝试不启动浏览器，重试时回退到 Selenium
+                use_driver = self.fetch_engine != "http" or attempt > 1
+
+                # 按主机限速（在占用并发槽位之前等待，等待时间不计入请求延迟）
+                self.rate_limiter.acquire(host_of(url))
 
-                    # 创建新的driver
-                    driver = self._create_driver()
+                with self.concurrency.slot() as slot:
+                    # 占用槽位后再取浏览器，并发数降低时不会启动多余的浏览器
+                    if use_driver:
+                        driver = self.driver_pool.acquire()
 
                     # 执行爬取
                     if attempt > 1:
                         self.logger.warning(
-                            f"[{item_index}/{total_items}] 重试 {attempt}/{self.retry_times}: {url}"
+                            f"[{item_index}/{total_items}] 重试 {attempt}/{max_attempts}: {url}"
                         )
                     else:
                         self.logger.info(f"[{item_index}/{total_items}] 开始爬取: {url}")
 
-                    details = scrape_func(driver, url)
+                    if parse_func is None:
+                        details = scrape_func(driver, url)
+                        # 未获取到详情（如反爬占位页）计为失败
+                        slot.success = bool(details)
+                    else:
+                        html_content = fetch_func(driver, url)
+                        slot.success = bool(html_content)
 
-                    # 合并数据
-                    result = {**item_data, **details}
+                # 成功完成的浏览器归还到池中复用（两阶段模式下在解析前归还）
+                if driver is not None:
+                    self.driver_pool.release(driver)
+                    driver = None
 
-                    self.logger.info(
-                        f"[{item_index}/{total_items}] ✓ 完成: {item_data.get('name', 'Unknown')[:40]}"
-                    )
+                if parse_func is not None:
+                    if html_content and self._parse_executor is not None:
+                        return self._parse_executor.submit(parse_func, html_content), attempt
+                    details = parse_func(html_content) if html_content else {}
 
-                    return result
+                if not details and not use_driver:
+                    raise ValueError("HTTP 抓取未获取到详情数据，回退到 Selenium")
 
-                except Exception as e:
-                    error_msg = str(e)
-                    if attempt < self.retry_times:
-                        self.logger.warning(
-                            f"[{item_index}/{total_items}] 失败 (尝试 {attempt}/{self.retry_times}): "
-                            f"{error_msg[:100]}"
-                        )
-                    else:
-                        self.logger.error(
-                            f"[{item_index}/{total_items}] ✗ 最终失败: {error_msg[:100]}"
-                        )
-                        # 记录失败信息
-                        with self.lock:
-                            self.failed_items.append({
-                                "item_data": item_data,
-                                "error": error_msg[:200],
-                                "timestamp": datetime.now().isoformat(),
-                                "url": url
-                            })
-
-                finally:
-                    # 确保driver被关闭
-                    if driver and attempt == self.retry_times:
-                        try:
-                            driver.quit()
-                        except:
-                            pass
+                # 合并数据
+                result = {**item_data, **details}
 
-            # 所有重试都失败，返回原始数据
-            return item_data
+                self.logger.info(
+                    f"[{item_index}/{total_items}] ✓ 完成: {item_data.get('name', 'Unknown')[:40]}"
+                )
 
-    def scrape_items_parallel(
+                return result
+
+            except Exception as e:
+                # 出错的浏览器可能处于异常状态，不再复用
+                if driver is not None:
+                    self.driver_pool.discard(driver)
+
+                error_msg = str(e)
+                if attempt < max_attempts:
+                    self.logger.warning(
+                        f"[{item_index}/{total_items}] 失败 (尝试 {attempt}/{max_attempts}): "
+                        f"{error_msg[:100]}"
+                    )
+                else:
+                    self.logger.error(
+                        f"[{item_index}/{total_items}] ✗ 最终失败: {error_msg[:100]}"
+                    )
+                    self._record_failure(item_data, error_msg)
+
+        # 所有重试都失败，返回原始数据
+        return item_data
+
+    def _record_failure(self, item_data: Dict, error_msg: str):
+        """记录最终失败的项目"""
+        with self.lock:
+            self.failed_items.append({
+                "item_data": item_data,
+                "error": error_msg[:200],
+                "timestamp": datetime.now().isoformat(),
+                "url": item_data.get("url", "")
+            })
+
+    def _create_parse_executor(self) -> ProcessPoolExecutor:
+        """
+        创建解析进程池
+
+        使用 spawn 方式启动子进程：抓取线程和浏览器已在运行时 fork 进程并不安全。
+        """
+        return ProcessPoolExecutor(
+            max_workers=self.parse_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+    def iter_items_parallel(
         self,
-        items: List[Dict],
-        scrape_func: Callable,
+        items: Iterable[Dict],
+        scrape_func: Callable = None,
         max_items: int = None,
-        batch_size: int = None,
-        batch_callback: Callable = None
-    ) -> List[Dict]:
+        fetch_func: Callable = None,
+        parse_func: Callable = None,
+        window: int = None
+    ) -> Iterator[Dict]:
         """
-        并行爬取多个项目
+        并行爬取多个项目，按完成顺序逐个产出结果
+
+        items 可以是惰性的可迭代对象（如生成器），同一时间只有 window 个项目在执行或排队，
+        每完成一个再从 items 中取下一个，整个目录不会一次性加载到内存中。
 
         Args:
-            items: 要爬取的项目列表
+            items: 要爬取的项目（列表或任意可迭代对象）
             scrape_func: 单个项目的爬取函数，接收(driver, url)参数
             max_items: 最大爬取数量，None表示全部
-            batch_size: 分批大小，每爬取N个就调用回调函数，None表示不分批
-            batch_callback: 分批回调函数，接收(batch_results, batch_num)参数
+            fetch_func: 抓取阶段函数，接收(driver, url)参数，返回HTML
+            parse_func: 解析阶段函数，接收HTML，返回详情字典（需为模块级函数）
+            window: 同时提交到线程池的最大项目数，None 表示线程数的 2 倍
 
-        Returns:
-            List[Dict]: 爬取后的数据列表
+        Yields:
+            Dict: 爬取后的项目数据（失败时为原始数据）
         """
-        # 确定要爬取的数量
-        items_to_scrape = items[:max_items] if max_items else items
-        total_items = len(items_to_scrape)
-
+        if parse_func is not None and fetch_func is None:
+            raise ValueError("使用 parse_func 时必须同时提供 fetch_func")
+        if parse_func is None and scrape_func is None:
+            raise ValueError("必须提供 scrape_func 或 fetch_func/parse_func")
+
+        # 已知长度时显示总数和预计剩余时间，惰性输入时总数未知
+        total_items = None
+        if isinstance(items, Sized):
+            total_items = min(len(items), max_items) if max_items else len(items)
+        iterator = iter(items)
+        if max_items:
+            iterator = islice(iterator, max_items)
+
+        first_item = next(iterator, None)
+        if first_item is None:
+            return
+        iterator = chain([first_item], iterator)
+
+        window = window or self.max_workers * 2
+        total_label = total_items if total_items is not None else "?"
+        use_process_pool = parse_func is not None and self.parse_workers > 0
         self.logger.info(
-            f"开始并行爬取 {total_items} 个项目\n"
+            f"开始并行爬取 {total_label} 个项目\n"
             f"  - 线程数: {self.max_workers}\n"
+            f"  - 最大在途项目数: {window}\n"
+            f"  - 解析进程数: {self.parse_workers if use_process_pool else '无（在抓取线程内解析）'}\n"
             f"  - 重试次数: {self.retry_times}\n"
-            f"  - 请求延迟: {self.request_delay[0]}-{self.request_delay[1]}秒"
+            f"  - 请求延迟: {self.request_delay[0]}-{self.request_delay[1]}秒\n"
+            f"  - 自适应并发: "
+            f"{f'初始 {self.concurrency.limit}，范围 {self.concurrency.min_limit}-{self.concurrency.max_limit}' if self.concurrency.adaptive else '关闭'}"
         )
 
         start_time = time.time()
-        results = []
-        batch_results = []  # 临时批次结果
+        submitted_count = 0
         completed_count = 0
         success_count = 0
         failed_count = 0
-        batch_num = 0  # 当前批次号
 
-        # 使用线程池并行执行
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # 提交所有任务
-            future_to_item = {
-                executor.submit(
+        # 解析进程池先于抓取线程启动，最后关闭
+        parse_executor = self._create_parse_executor() if use_process_pool else nullcontext()
+
+        # 使用线程池并行执行（线程池结束后关闭池中所有浏览器）
+        with parse_executor, self.driver_pool, ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            self._parse_executor = parse_executor if use_process_pool else None
+            # future -> (项目, 序号, 解析阶段的尝试次数)，抓取任务的尝试次数为 None
+            future_to_item = {}
+
+            def submit(item, item_index=None, start_attempt=1):
+                nonlocal submitted_count
+                if item_index is None:
+                    submitted_count += 1
+                    item_index = submitted_count
+                future = executor.submit(
                     self._scrape_single_item,
                     item,
                     scrape_func,
-                    idx + 1,
-                    total_items
-                ): item
-                for idx, item in enumerate(items_to_scrape)
-            }
-
-            # 收集结果
-            for future in as_completed(future_to_item):
-                try:
-                    result = future.result()
-                    results.append(result)
-                    batch_results.append(result)  # 添加到批次结果
-                    completed_count += 1
-
-                    # 检查是否成功爬取到详情
-                    original_item = future_to_item[future]
-                    if result != original_item and any(
-                        key in result for key in ['highlights', 'description', 'directions']
-                    ):
-                        success_count += 1
-                    else:
-                        failed_count += 1
+                    item_index,
+                    total_label,
+                    fetch_func,
+                    parse_func,
+                    start_attempt
+                )
+                future_to_item[future] = (item, item_index, None)
 
-                    # 检查是否需要执行批次回调
-                    if batch_size and batch_callback and len(batch_results) >= batch_size:
-                        batch_num += 1
-                        self.logger.info(
-                            f"\n📦 批次 {batch_num}: 已完成 {len(batch_results)} 个产品，正在写入CSV..."
-                        )
-                        batch_callback(batch_results, batch_num)
-                        batch_results = []  # 清空批次结果
-
-                    # 显示进度（每5个显示一次，避免刷屏）
-                    if completed_count % 5 == 0 or completed_count == total_items:
-                        elapsed = time.time() - start_time
-                        avg_time = elapsed / completed_count
-                        remaining = (total_items - completed_count) * avg_time
-
-                        self.logger.info(
-                            f"进度: {completed_count}/{total_items} "
-                            f"({completed_count/total_items*100:.1f}%) - "
-                            f"成功: {success_count}, 失败: {failed_count} - "
-                            f"已用时: {elapsed:.1f}s - "
-                            f"预计剩余: {remaining:.1f}s"
-                        )
+            def resolve(future, item, item_index, parse_attempt):
+                """返回项目的最终结果；项目仍在解析或回退到 Selenium 时返回 None"""
+                if parse_attempt is None:
+                    result = future.result()
+                    if isinstance(result, tuple):
+                        # 抓取线程已返回，解析在进程池中进行，项目继续占用窗口
+                        parse_future, attempt = result
+                        future_to_item[parse_future] = (item, item_index, attempt)
+                        return None
+                    return result
 
+                try:
+                    details = future.result()
+                    error_msg = ""
                 except Exception as e:
-                    self.logger.error(f"任务执行失败: {e}")
-                    failed_count += 1
+                    details = {}
+                    error_msg = f"解析失败: {e}"
 
-            # 处理最后一批（如果有剩余）
-            if batch_size and batch_callback and batch_results:
-                batch_num += 1
-                self.logger.info(
-                    f"\n📦 批次 {batch_num} (最后一批): 已完成 {len(batch_results)} 个产品，正在写入CSV..."
-                )
-                batch_callback(batch_results, batch_num)
+                # 仅第一次 HTTP 抓取不使用浏览器，解析为空时回退到 Selenium
+                if not details and self.fetch_engine == "http" and parse_attempt == 1:
+                    self.logger.warning(
+                        f"[{item_index}/{total_label}] {error_msg[:100] or 'HTTP 抓取未获取到详情数据'}，回退到 Selenium"
+                    )
+                    submit(item, item_index, start_attempt=2)
+                    return None
+
+                if error_msg:
+                    self.logger.error(f"[{item_index}/{total_label}] ✗ 最终失败: {error_msg[:100]}")
+                    self._record_failure(item, error_msg)
+                    return item
 
+                self.logger.info(f"[{item_index}/{total_label}] ✓ 完成: {item.get('name', 'Unknown')[:40]}")
+                return {**item, **details}
+
+            try:
+                for item in islice(iterator, window):
+                    submit(item)
+
+                while future_to_item:
+                    done, _ = wait(future_to_item, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        original_item, item_index, parse_attempt = future_to_item.pop(future)
+
+                        try:
+                            result = resolve(future, original_item, item_index, parse_attempt)
+                            if result is None:
+                                continue
+                        except Exception as e:
+                            self.logger.error(f"任务执行失败: {e}")
+                            result = None
+
+                        # 项目完成后补充新任务，调用方处理结果时线程池保持忙碌
+                        for item in islice(iterator, 1):
+                            submit(item)
+
+                        if result is None:
+                            failed_count += 1
+                            continue
+
+                        completed_count += 1
+
+                        # 检查是否成功爬取到详情
+                        if result != original_item and any(
+                            key in result for key in ['highlights', 'description', 'directions']
+                        ):
+                            success_count += 1
+                        else:
+                            failed_count += 1
+
+                        # 显示进度（每5个显示一次，避免刷屏）
+                        if completed_count % 5 == 0 or completed_count == total_items:
+                            elapsed = time.time() - start_time
+                            if total_items is not None:
+                                avg_time = elapsed / completed_count
+                                remaining = (total_items - completed_count) * avg_time
+                                self.logger.info(
+                                    f"进度: {completed_count}/{total_items} "
+                                    f"({completed_count/total_items*100:.1f}%) - "
+                                    f"成功: {success_count}, 失败: {failed_count} - "
+                                    f"已用时: {elapsed:.1f}s - "
+                                    f"预计剩余: {remaining:.1f}s"
+                                )
+                            else:
+                                self.logger.info(
+                                    f"进度: 已完成 {completed_count} - "
+                                    f"成功: {success_count}, 失败: {failed_count} - "
+                                    f"已用时: {elapsed:.1f}s"
+                                )
+
+                        yield result
+            finally:
+                # 调用方提前停止迭代时，取消尚未开始的任务
+                for future in future_to_item:
+                    future.cancel()
+                self._parse_executor = None
+
+        pool_stats = self.driver_pool.stats()
+        if pool_stats["created"]:
+            self.logger.info(
+                f"浏览器池: 共启动 {pool_stats['created']} 个实例，回收 {pool_stats['recycled']} 个"
+            )
+
+        processed = success_count + failed_count
         elapsed = time.time() - start_time
         self.logger.info(
             f"\n并行爬取完成!\n"
             f"  - 总耗时: {elapsed:.1f}s\n"
-            f"  - 平均速度: {elapsed/total_items:.2f}s/项\n"
-            f"  - 成功: {success_count}/{total_items} ({success_count/total_items*100:.1f}%)\n"
-            f"  - 失败: {failed_count}/{total_items} ({failed_count/total_items*100:.1f}%)"
+            f"  - 平均速度: {elapsed/processed:.2f}s/项\n"
+            f"  - 成功: {success_count}/{processed} ({success_count/processed*100:.1f}%)\n"
+            f"  - 失败: {failed_count}/{processed} ({failed_count/processed*100:.1f}%)"
         )
 
+        if self.concurrency.adaptive:
+            concurrency_stats = self.concurrency.stats()
+            self.logger.info(
+                f"自适应并发: 最终并发 {concurrency_stats['limit']}，请求间隔 {concurrency_stats['delay']}s，"
+                f"请求 {concurrency_stats['requests']} 次（错误 {concurrency_stats['errors']}，"
+                f"限流 {concurrency_stats['throttled']}），"
+                f"增加 {concurrency_stats['increases']} 次 / 降低 {concurrency_stats['decreases']} 次"
+            )
+
         # 保存失败记录
         if self.failed_items:
             self._save_failed_items()
 
+    def scrape_items_parallel(
+        self,
+        items: Iterable[Dict],
+        scrape_func: Callable = None,
+        max_items: int = None,
+        batch_size: int = None,
+        batch_callback: Callable = None,
+        fetch_func: Callable = None,
+        parse_func: Callable = None,
+        result_sink=None,
+        collect_results: bool = True
+    ) -> List[Dict]:
+        """
+        并行爬取多个项目
+
+        提供 fetch_func 和 parse_func 时使用两阶段流水线：抓取线程获取HTML后立即归还浏览器，
+        解析在 parse_workers 个进程中进行（parse_workers 为 0 时在抓取线程内解析）。
+        需要逐个处理结果时使用 iter_items_parallel。
+
+        Args:
+            items: 要爬取的项目列表（或任意可迭代对象）
+            scrape_func: 单个项目的爬取函数，接收(driver, url)参数
+            max_items: 最大爬取数量，None表示全部
+            batch_size: 分批大小，每爬取N个就调用回调函数，None表示不分批
+            batch_callback: 分批回调函数，接收(batch_results, batch_num)参数
+            fetch_func: 抓取阶段函数，接收(driver, url)参数，返回HTML
+            parse_func: 解析阶段函数，接收HTML，返回详情字典（需为模块级函数）
+            result_sink: 结果写入器（ResultSink），每完成一个项目即放入写入队列
+            collect_results: 是否在内存中累积并返回结果，使用写入器时可关闭以节省内存
+
+        Returns:
+            List[Dict]: 爬取后的数据列表（collect_results 为 False 时为空列表）
+        """
+        results = []
+        batch_results = []  # 临时批次结果
+        batch_num = 0  # 当前批次号
+
+        for result in self.iter_items_parallel(
+            items,
+            scrape_func=scrape_func,
+            max_items=max_items,
+            fetch_func=fetch_func,
+            parse_func=parse_func
+        ):
+            if collect_results:
+                results.append(result)
+            if result_sink is not None:
+                result_sink.put(result)  # 由写入线程负责写盘
+            if batch_callback:
+                batch_results.append(result)  # 添加到批次结果
+
+            # 检查是否需要执行批次回调
+            if batch_size and batch_callback and len(batch_results) >= batch_size:
+                batch_num += 1
+                self.logger.info(
+                    f"\n📦 批次 {batch_num}: 已完成 {len(batch_results)} 个产品，正在写入CSV..."
+                )
+                batch_callback(batch_results, batch_num)
+                batch_results = []  # 清空批次结果
+
+        # 处理最后一批（如果有剩余）
+        if batch_size and batch_callback and batch_results:
+            batch_num += 1
+            self.logger.info(
+                f"\n📦 批次 {batch_num} (最后一批): 已完成 {len(batch_results)} 个产品，正在写入CSV..."
+            )
+            batch_callback(batch_results, batch_num)
+
         return results
 
     def _save_failed_items(self):
         """保存失败的产品记录"""
-        failed_file = Path("data/output/failed_products.json")
-        failed_file.parent.mkdir(parents=True, exist_ok=True)
+        save_failed_items(self.failed_items, self.logger)
 
-        # 如果文件已存在，加载并合并
-        existing_failed = []
-        if failed_file.exists():
-            try:
-                with open(failed_file, 'r', encoding='utf-8') as f:
-                    existing_failed = json.load(f)
-            except:
-                pass
 
-        # 合并新失败记录
-        all_failed = existing_failed + self.failed_items
+def save_failed_items(failed_items: List[Dict], logger=None):
+    """
+    将失败的产品记录合并写入失败记录文件
 
-        # 保存到文件
-        with open(failed_file, 'w', encoding='utf-8') as f:
-            json.dump(all_failed, f, ensure_ascii=False, indent=2)
+    Args:
+        failed_items: 失败记录列表
+        logger: 日志记录器，None 表示使用全局日志
+    """
+    logger = logger or get_logger()
+    failed_file = Path("data/output/failed_products.json")
+    failed_file.parent.mkdir(parents=True, exist_ok=True)
+
+    # 如果文件已存在，加载并合并
+    existing_failed = []
+    if failed_file.exists():
+        try:
+            with open(failed_file, 'r', encoding='utf-8') as f:
+                existing_failed = json.load(f)
+        except:
+            pass
+
+    # 合并新失败记录
+    all_failed = existing_failed + failed_items
+
+    # 保存到文件
+    with open(failed_file, 'w', encoding='utf-8') as f:
+        json.dump(all_failed, f, ensure_ascii=False, indent=2)
+
+    logger.info(f"\n✗ {len(failed_items)} 个失败产品已记录到: {failed_file}")
+    logger.info(f"  可使用 'uv run python scripts/retry_failed.py' 重新爬取")
+
+
+def _create_detail_scraper(
+    max_workers: int,
+    retry_times: int,
+    request_delay: tuple,
+    enable_headless: bool,
+    fetch_engine: Optional[str],
+    parse_workers: Optional[int],
+    adaptive: Optional[bool] = None
+) -> ParallelScraper:
+    """根据参数和配置文件创建详情爬取器（None 表示从配置文件读取）"""
+    import config
+    if fetch_engine is None:
+        fetch_engine = config.DETAIL_FETCH_ENGINE
+    if parse_workers is None:
+        parse_workers = config.PARSE_WORKERS
+    if adaptive is None:
+        adaptive = config.ADAPTIVE_CONCURRENCY
+
+    # 自适应时以 max_workers 为初始并发，运行中在 1 到 ADAPTIVE_MAX_WORKERS 之间调整
+    concurrency = AdaptiveConcurrency(
+        initial_limit=max_workers,
+        max_limit=max(config.ADAPTIVE_MAX_WORKERS, max_workers) if adaptive else max_workers,
+        request_delay=request_delay,
+        min_delay=config.ADAPTIVE_MIN_DELAY,
+        adaptive=adaptive,
+        window=config.ADAPTIVE_WINDOW
+    )
 
-        self.logger.info(f"\n✗ {len(self.failed_items)} 个失败产品已记录到: {failed_file}")
-        self.logger.info(f"  可使用 'uv run python scripts/retry_failed.py' 重新爬取")
+    return ParallelScraper(
+        max_workers=max_workers,
+        retry_times=retry_times,
+        request_delay=request_delay,
+        enable_headless=enable_headless,
+        fetch_engine=fetch_engine,
+        driver_max_pages=config.DRIVER_MAX_PAGES,
+        driver_max_memory_mb=config.DRIVER_MAX_MEMORY_MB or None,
+        parse_workers=parse_workers,
+        concurrency=concurrency,
+        rate_limiter=get_rate_limiter("scraper")
+    )
 
 
 def scrape_details_parallel(
-    products: List[Dict],
+    products: Iterable[Dict],
     scrape_detail_func: Callable,
     max_workers: int = 3,
     max_products: int = None,
@@ -329,7 +627,15 @@ def scrape_details_parallel(
     request_delay: tuple = (2, 4),
     enable_headless: bool = True,
     batch_size: int = None,
-    batch_callback: Callable = None
+    batch_callback: Callable = None,
+    fetch_engine: str = None,
+    fetch_func: Callable = None,
+    parse_func: Callable = None,
+    parse_workers: int = None,
+    result_sink=None,
+    collect_results: bool = True,
+    checkpoint=None,
+    adaptive: bool = None
 ) -> List[Dict]:
     """
     并行爬取产品详情的便捷函数
@@ -344,20 +650,82 @@ def scrape_details_parallel(
         enable_headless: 是否启用无头模式
         batch_size: 分批大小，每爬取N个就写入CSV，默认None（不分批）
         batch_callback: 分批回调函数，接收(batch_results, batch_num)
+        fetch_engine: 抓取引擎（"http" / "selenium"），None 表示从配置文件读取
+        fetch_func: 抓取阶段函数（与 parse_func 一起提供时使用两阶段流水线）
+        parse_func: 解析阶段函数（模块级函数，可在子进程中执行）
+        parse_workers: 解析进程数，None 表示从配置文件读取
+        result_sink: 结果写入器（ResultSink），每完成一个产品即放入写入队列
+        collect_results: 是否在内存中累积并返回结果
+        checkpoint: 详情爬取断点（DetailCheckpoint），跳过上次中断前已写出的产品
+        adaptive: 是否自适应调整并发数和请求间隔，None 表示从配置文件读取
 
     Returns:
-        List[Dict]: 包含详情的产品列表
+        List[Dict]: 包含详情的产品列表（不含断点中已完成的产品）
     """
-    scraper = ParallelScraper(
-        max_workers=max_workers,
-        retry_times=retry_times,
-        request_delay=request_delay,
-        enable_headless=enable_headless
+    if checkpoint is not None and checkpoint.completed:
+        products = checkpoint.pending(products)
+        get_logger().info(f"详情断点: 跳过 {len(checkpoint.completed)} 个已完成的产品")
+
+    scraper = _create_detail_scraper(
+        max_workers, retry_times, request_delay, enable_headless, fetch_engine, parse_workers, adaptive
     )
     return scraper.scrape_items_parallel(
         items=products,
         scrape_func=scrape_detail_func,
         max_items=max_products,
         batch_size=batch_size,
-        batch_callback=batch_callback
+        batch_callback=batch_callback,
+        fetch_func=fetch_func,
+        parse_func=parse_func,
+        result_sink=result_sink,
+        collect_results=collect_results
+    )
+
+
+def iter_details_parallel(
+    products: Iterable[Dict],
+    scrape_detail_func: Callable = None,
+    max_workers: int = 3,
+    max_products: int = None,
+    retry_times: int = 3,
+    request_delay: tuple = (2, 4),
+    enable_headless: bool = True,
+    fetch_engine: str = None,
+    fetch_func: Callable = None,
+    parse_func: Callable = None,
+    parse_workers: int = None,
+    window: int = None,
+    adaptive: bool = None
+) -> Iterator[Dict]:
+    """
+    并行爬取产品详情，按完成顺序逐个产出（可串联翻译、图片等后续阶段）
+
+    Args:
+        products: 产品可迭代对象（可为生成器，按需读取）
+        scrape_detail_func: 详情爬取函数
+        max_workers: 最大并发数
+        max_products: 最大产品数
+        retry_times: 失败重试次数
+        request_delay: 请求延迟范围(秒)
+        enable_headless: 是否启用无头模式
+        fetch_engine: 抓取引擎（"http" / "selenium"），None 表示从配置文件读取
+        fetch_func: 抓取阶段函数（与 parse_func 一起提供时使用两阶段流水线）
+        parse_func: 解析阶段函数（模块级函数，可在子进程中执行）
+        parse_workers: 解析进程数，None 表示从配置文件读取
+        window: 最大在途产品数，None 表示线程数的 2 倍
+        adaptive: 是否自适应调整并发数和请求间隔，None 表示从配置文件读取
+
+    Yields:
+        Dict: 包含详情的产品（失败时为原始数据）
+    """
+    scraper = _create_detail_scraper(
+        max_workers, retry_times, request_delay, enable_headless, fetch_engine, parse_workers, adaptive
+    )
+    yield from scraper.iter_items_parallel(
+        products,
+        scrape_func=scrape_detail_func,
+        max_items=max_products,
+        fetch_func=fetch_func,
+        parse_func=parse_func,
+        window=window
     )
@@ -0,0 +1,363 @@
+"""产品数据存储 - SQLite（WAL 模式），各处理阶段只更新自己负责的列，CSV 由视图导出"""
+
+import csv
+import sqlite3
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.logger import get_logger
+
+
+# 列表页字段
+LISTING_COLUMNS = ["brand", "name", "price", "image"]
+# 详情页字段
+DETAIL_COLUMNS = ["highlights", "description", "directions", "ingredients", "nutritional_info", "target_area"]
+# 需要翻译的字段（翻译结果保存在 <字段>_zh 列）
+TRANSLATED_COLUMNS = ["name", "highlights", "description", "directions", "nutritional_info", "ingredients"]
+# 至少包含其中一个字段才认为详情爬取成功
+REQUIRED_DETAIL_COLUMNS = ("highlights", "description", "directions")
+
+# 完整信息 CSV 表头 -> 数据库列
+CSV_COLUMN_MAP = {
+    "产品名称": "name",
+    "产品亮点": "highlights",
+    "产品价格": "price",
+    "产品品牌": "brand",
+    "产品图": "image",
+    "产品描述": "description",
+    "产品类型": "product_type",
+    "作用部位": "target_area",
+    "用法说明": "directions",
+    "营养成分": "nutritional_info",
+    "配料表": "ingredients",
+    "URL": "url",
+}
+
+# 可导出的视图: 视图名 -> (是否使用中文翻译, 是否使用图床图片)
+EXPORT_VIEWS = {
+    "products_complete": (False, False),
+    "products_complete_zh": (True, False),
+    "products_complete_processed": (False, True),
+    "products_complete_zh_processed": (True, True),
+}
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS products (
+    url TEXT PRIMARY KEY,
+    product_type TEXT NOT NULL DEFAULT '',
+    {", ".join(f"{column} TEXT NOT NULL DEFAULT ''" for column in LISTING_COLUMNS + DETAIL_COLUMNS)},
+    detail_status TEXT,
+    detail_updated_at REAL,
+    {", ".join(f"{column}_zh TEXT" for column in TRANSLATED_COLUMNS)},
+    translate_status TEXT,
+    translated_at REAL,
+    hosted_image TEXT,
+    image_status TEXT,
+    image_updated_at REAL
+)
+"""
+
+
+def _view_sql(view_name: str, fieldnames: List[str]) -> str:
+    """生成导出视图的 SQL（列名与完整信息 CSV 表头一致）"""
+    use_zh, use_hosted = EXPORT_VIEWS[view_name]
+    selects = []
+    for header in fieldnames:
+        column = CSV_COLUMN_MAP[header]
+        expression = column
+        if use_zh and column in TRANSLATED_COLUMNS:
+            expression = f"COALESCE({column}_zh, {column})"
+        elif use_hosted and column == "image":
+            expression = "COALESCE(hosted_image, image)"
+        selects.append(f'{expression} AS "{header}"')
+
+    return (
+        f"CREATE VIEW {view_name} AS SELECT {', '.join(selects)} "
+        f"FROM products WHERE detail_status IS NOT NULL ORDER BY rowid"
+    )
+
+
+class ProductStore:
+    """
+    SQLite 产品存储（线程安全）
+
+    每个产品一行，以 URL 为主键。爬取、翻译、图片处理三个阶段分别写入各自的列和状态：
+        detail_status     详情爬取状态（done / failed）
+        translate_status  翻译状态（done 表示 <字段>_zh 列已就绪，源字段变化时自动清空）
+        image_status      图片处理状态（done / failed，原图变化时自动清空）
+    """
+
+    def __init__(self, db_path: Path, fieldnames: Optional[List[str]] = None):
+        """
+        初始化产品存储
+
+        Args:
+            db_path: 数据库文件路径
+            fieldnames: 导出 CSV 的表头顺序，None 表示使用配置文件中的完整信息字段
+        """
+        if fieldnames is None:
+            import config
+            fieldnames = config.CSV_FIELDNAMES_COMPLETE
+
+        self.db_path = Path(db_path)
+        self.fieldnames = fieldnames
+        self.logger = get_logger()
+        self._lock = Lock()
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        # WAL 模式：写入不阻塞读取，每次提交只追加日志而不是重写整个文件
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute(SCHEMA)
+            # 每次打开时重建视图，导出列始终与当前的 CSV 表头一致
+            for view_name in EXPORT_VIEWS:
+                self.conn.execute(f"DROP VIEW IF EXISTS {view_name}")
+                self.conn.execute(_view_sql(view_name, fieldnames))
+
+    def upsert_products(self, products: Iterable[Dict], product_type: str = "", with_details: bool = True) -> int:
+        """
+        批量写入产品（已存在的产品只更新本次提供的字段）
+
+        详情或原图发生变化时，对应的翻译 / 图片处理状态会被清空，下次处理时重新生成。
+
+        Args:
+            products: 产品数据列表（main.py 中的产品字典）
+            product_type: 产品类型
+            with_details: 是否包含详情字段（列表页基本信息传 False）
+
+        Returns:
+            int: 写入的产品数
+        """
+        columns = LISTING_COLUMNS + (DETAIL_COLUMNS if with_details else [])
+        now = time.time()
+        rows = []
+        for product in products:
+            if not product.get("url"):
+                continue
+            row = [product["url"], product_type] + [str(product.get(column) or "") for column in columns]
+            if with_details:
+                succeeded = any(product.get(column) for column in REQUIRED_DETAIL_COLUMNS)
+                row += ["done" if succeeded else "failed", now]
+            rows.append(row)
+
+        if not rows:
+            return 0
+
+        insert_columns = ["url", "product_type"] + columns
+        updates = [f"{column} = excluded.{column}" for column in ["product_type"] + columns]
+        if with_details:
+            insert_columns += ["detail_status", "detail_updated_at"]
+            # 爬取失败时保留上次成功的详情
+            updates = ["product_type = excluded.product_type"] + [
+                f"{column} = excluded.{column}" for column in LISTING_COLUMNS
+            ] + [
+                f"{column} = CASE WHEN excluded.detail_status = 'done' THEN excluded.{column} ELSE {column} END"
+                for column in DETAIL_COLUMNS
+            ] + [
+                "detail_status = CASE WHEN excluded.detail_status = 'done' OR detail_status IS NULL "
+                "THEN excluded.detail_status ELSE detail_status END",
+                "detail_updated_at = excluded.detail_updated_at",
+            ]
+
+        # SET 子句中的列引用的都是更新前的值，可以直接与新值比较
+        unchanged_conditions = []
+        for column in TRANSLATED_COLUMNS:
+            if column in DETAIL_COLUMNS and with_details:
+                unchanged_conditions.append(f"(excluded.detail_status != 'done' OR {column} IS excluded.{column})")
+            elif column in columns:
+                unchanged_conditions.append(f"{column} IS excluded.{column}")
+        updates += [
+            f"translate_status = CASE WHEN {' AND '.join(unchanged_conditions)} THEN translate_status ELSE NULL END",
+            "image_status = CASE WHEN image IS excluded.image THEN image_status ELSE NULL END",
+        ]
+
+        sql = (
+            f"INSERT INTO products ({', '.join(insert_columns)}) "
+            f"VALUES ({', '.join('?' for _ in insert_columns)}) "
+            f"ON CONFLICT(url) DO UPDATE SET {', '.join(updates)}"
+        )
+        with self._lock, self.conn:
+            self.conn.executemany(sql, rows)
+        return len(rows)
+
+    def _select_urls(self, urls: Optional[Iterable[str]], column: str = "url") -> str:
+        """
+        将 URL 列表写入临时表，返回对应的 SQL 过滤条件（需在持有锁时调用）
+
+        Args:
+            urls: URL 列表，None 表示不过滤
+            column: 被过滤的列名
+
+        Returns:
+            以 AND 开头的过滤条件，urls 为 None 时为空字符串
+        """
+        if urls is None:
+            return ""
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS selected_urls (url TEXT PRIMARY KEY)")
+        self.conn.execute("DELETE FROM selected_urls")
+        self.conn.executemany("INSERT OR IGNORE INTO selected_urls VALUES (?)", ((url,) for url in urls))
+        return f" AND {column} IN (SELECT url FROM selected_urls)"
+
+    def pending_translations(self, urls: Optional[Iterable[str]] = None) -> List[sqlite3.Row]:
+        """
+        需要翻译的产品（详情爬取成功且尚未翻译，或源字段已变化）
+
+        Args:
+            urls: 只在这些产品中查找，None 表示全部
+
+        Returns:
+            包含 url 和待翻译字段的行
+        """
+        with self._lock:
+            url_filter = self._select_urls(urls)
+            return self.conn.execute(
+                f"SELECT url, {', '.join(TRANSLATED_COLUMNS)} FROM products "
+                f"WHERE detail_status = 'done' AND translate_status IS NULL{url_filter} ORDER BY rowid"
+            ).fetchall()
+
+    def save_translations(self, translations: List[Tuple[str, Dict[str, str]]]):
+        """
+        写入一批翻译结果，并标记这些产品已翻译
+
+        Args:
+            translations: [(url, {字段: 译文})]，未包含的字段视为无需翻译（导出时使用原文）
+        """
+        now = time.time()
+        assignments = [f"{column}_zh = ?" for column in TRANSLATED_COLUMNS]
+        sql = (
+            f"UPDATE products SET {', '.join(assignments)}, translate_status = 'done', translated_at = ? "
+            f"WHERE url = ?"
+        )
+        with self._lock, self.conn:
+            self.conn.executemany(sql, [
+                [values.get(column) for column in TRANSLATED_COLUMNS] + [now, url]
+                for url, values in translations
+            ])
+
+    def pending_images(self, urls: Optional[Iterable[str]] = None) -> List[sqlite3.Row]:
+        """
+        需要处理图片的产品（有原图且尚未成功处理）
+
+        Args:
+            urls: 只在这些产品中查找，None 表示全部
+
+        Returns:
+            包含 url, name, image 的行
+        """
+        with self._lock:
+            url_filter = self._select_urls(urls)
+            return self.conn.execute(
+                "SELECT url, name, image FROM products "
+                "WHERE detail_status IS NOT NULL AND image != '' "
+                f"AND (image_status IS NULL OR image_status != 'done'){url_filter} ORDER BY rowid"
+            ).fetchall()
+
+    def save_images(self, results: List[Tuple[str, Optional[str]]]):
+        """
+        写入一批图片处理结果
+
+        Args:
+            results: [(url, 图床URL)]，图床URL 为 None 表示处理失败（导出时保留原图）
+        """
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "UPDATE products SET hosted_image = COALESCE(?, hosted_image), image_status = ?, "
+                "image_updated_at = ? WHERE url = ?",
+                [(hosted_url, "done" if hosted_url else "failed", now, url) for url, hosted_url in results]
+            )
+
+    def count(self, urls: Optional[Iterable[str]] = None) -> int:
+        """
+        已爬取详情的产品数
+
+        Args:
+            urls: 只统计这些产品，None 表示全部
+
+        Returns:
+            int: 行数
+        """
+        with self._lock:
+            url_filter = self._select_urls(urls)
+            return self.conn.execute(
+                f"SELECT COUNT(*) FROM products WHERE detail_status IS NOT NULL{url_filter}"
+            ).fetchone()[0]
+
+    def export_csv(self, view_name: str, output_csv: Path, urls: Optional[Iterable[str]] = None) -> int:
+        """
+        将视图导出为 CSV（utf-8-sig，与原有输出文件格式一致）
+
+        Args:
+            view_name: 视图名（见 EXPORT_VIEWS）
+            output_csv: 输出文件路径
+            urls: 只导出这些产品（如本次运行爬取的产品），None 表示全部
+
+        Returns:
+            int: 导出的行数
+        """
+        if view_name not in EXPORT_VIEWS:
+            raise ValueError(f"未知视图: {view_name}")
+
+        output_csv = Path(output_csv)
+        output_csv.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            url_filter = self._select_urls(urls, column='"URL"')
+            cursor = self.conn.execute(f"SELECT * FROM {view_name} WHERE 1{url_filter}")
+            count = 0
+            with open(output_csv, "w", newline="", encoding="utf-8-sig") as f:
+                writer = csv.writer(f)
+                writer.writerow(self.fieldnames)
+                for row in cursor:
+                    writer.writerow(row)
+                    count += 1
+        return count
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def load_urls_from_csv(csv_path: Path, column: str = "URL") -> List[str]:
+    """
+    读取 CSV 中的 URL 列（用于确定本次运行涉及的产品）
+
+    Args:
+        csv_path: CSV 文件路径
+        column: URL 列名
+
+    Returns:
+        URL 列表，文件不存在或没有该列时返回空列表
+    """
+    csv_path = Path(csv_path)
+    if not csv_path.exists():
+        return []
+    with open(csv_path, "r", newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        if column not in (reader.fieldnames or []):
+            return []
+        return [row[column] for row in reader if row.get(column)]
+
+
+def open_product_store() -> Optional[ProductStore]:
+    """
+    根据配置文件打开产品存储
+
+    Returns:
+        ProductStore 实例，PRODUCT_STORE_ENABLED=false 时返回 None
+    """
+    import config
+
+    if not config.PRODUCT_STORE_ENABLED:
+        return None
+    return ProductStore(config.PRODUCT_STORE_DB)
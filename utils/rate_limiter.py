@@ -0,0 +1,165 @@
+"""令牌桶限速 - 按主机或按 API 分桶，支持突发，提供线程和 asyncio 两种接口"""
+
+import asyncio
+import time
+from threading import Lock
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """
+    令牌桶（线程安全）
+
+    每秒补充 rate 个令牌，最多积攒 burst 个；令牌不足时预约下一个令牌并等待，
+    等待在锁外进行，多个线程/协程不会因为等待而互相阻塞。
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数（即长期平均速率）
+            burst: 桶容量（允许的突发请求数）
+        """
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def reserve(self, tokens: int = 1) -> float:
+        """
+        预约令牌
+
+        Args:
+            tokens: 需要的令牌数
+
+        Returns:
+            需要等待的秒数（0 表示立即可用）
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # 令牌可以为负：表示已被预约，后来者依次排在后面
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens: int = 1):
+        """获取令牌（阻塞当前线程直到可用）"""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: int = 1):
+        """获取令牌（协程，等待期间不阻塞事件循环）"""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+def host_of(url: str) -> str:
+    """
+    获取 URL 的主机名（作为按主机限速的键）
+
+    Args:
+        url: 请求URL
+
+    Returns:
+        主机名（含端口）
+    """
+    return urlsplit(url).netloc
+
+
+class RateLimiter:
+    """按键分桶的限速器：每个键（主机名、API 名称）一个独立的令牌桶"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        初始化限速器
+
+        Args:
+            rate: 每个键每秒允许的请求数，<= 0 表示不限速
+            burst: 每个键允许的突发请求数
+        """
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = Lock()
+
+    def bucket(self, key: str = "") -> Optional[TokenBucket]:
+        """
+        获取键对应的令牌桶
+
+        Args:
+            key: 分桶键，空字符串表示共用一个桶
+
+        Returns:
+            TokenBucket，不限速时返回 None
+        """
+        if self.rate <= 0:
+            return None
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+    def acquire(self, key: str = "", tokens: int = 1):
+        """
+        获取令牌（线程接口）
+
+        Args:
+            key: 分桶键
+            tokens: 需要的令牌数
+        """
+        bucket = self.bucket(key)
+        if bucket is not None:
+            bucket.acquire(tokens)
+
+    async def acquire_async(self, key: str = "", tokens: int = 1):
+        """
+        获取令牌（asyncio 接口）
+
+        Args:
+            key: 分桶键
+            tokens: 需要的令牌数
+        """
+        bucket = self.bucket(key)
+        if bucket is not None:
+            await bucket.acquire_async(tokens)
+
+
+# 全局共享的限速器（同一进程内的所有调用方共用一个速率）
+_global_limiters: Dict[str, RateLimiter] = {}
+_global_limiters_lock = Lock()
+
+
+def get_rate_limiter(name: str) -> RateLimiter:
+    """
+    获取全局共享的限速器
+
+    Args:
+        name: 限速器名称（"scraper" 按主机限速详情页抓取，"translate" 翻译 API，
+              "image_upload" 图床上传）
+
+    Returns:
+        RateLimiter 实例（速率和突发数从配置文件读取）
+    """
+    import config
+
+    limits = {
+        "scraper": (config.SCRAPER_RATE_PER_HOST, config.SCRAPER_BURST),
+        "translate": (config.TRANSLATE_RATE, config.TRANSLATE_BURST),
+        "image_upload": (config.IMAGE_UPLOAD_RATE, config.IMAGE_UPLOAD_BURST),
+    }
+    with _global_limiters_lock:
+        limiter = _global_limiters.get(name)
+        if limiter is None:
+            rate, burst = limits[name]
+            limiter = _global_limiters[name] = RateLimiter(rate, burst)
+        return limiter
@@ -0,0 +1,257 @@
+"""结果写入器 - 有界队列 + 独立写入线程，爬取线程只负责把结果放入队列"""
+
+import csv
+import os
+import queue
+import time
+from pathlib import Path
+from threading import Event, Thread
+from typing import Callable, Dict, List, Optional
+
+from utils.logger import get_logger
+
+
+# 队列中的控制消息
+_CLOSE = object()
+
+
+class _Checkpoint:
+    """检查点请求：写入线程刷新并落盘后设置 done"""
+
+    def __init__(self):
+        self.done = Event()
+
+
+class ResultSink:
+    """
+    后台写入器基类
+
+    put() 把结果放入有界队列（队列满时阻塞，对爬取线程形成背压），写入线程累积到
+    flush_rows 条或距上次刷新超过 flush_interval 秒时写出一批；每 checkpoint_every 次
+    刷新（以及 checkpoint() / close() 时）执行一次落盘（fsync）。
+
+    子类实现 _open / _write / _flush / _close。
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 1000,
+        flush_rows: int = 100,
+        flush_interval: float = 5.0,
+        checkpoint_every: int = 10,
+        on_flush: Optional[Callable[[List[Dict]], None]] = None
+    ):
+        """
+        初始化写入器
+
+        Args:
+            queue_size: 队列容量
+            flush_rows: 累积多少条结果写出一批
+            flush_interval: 最长多少秒写出一批
+            checkpoint_every: 每多少次刷新执行一次落盘
+            on_flush: 每批写出后在写入线程中调用的回调，接收该批结果（如记录增量状态）
+        """
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.checkpoint_every = checkpoint_every
+        self.on_flush = on_flush
+        self.logger = get_logger()
+        self.written = 0
+        # 最近一次刷新后输出文件的字节数（CSV 写入器使用，用于断点恢复）
+        self.offset: Optional[int] = None
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> "ResultSink":
+        """启动写入线程"""
+        if self._thread is None:
+            self._open()
+            self._thread = Thread(target=self._run, name=type(self).__name__, daemon=True)
+            self._thread.start()
+        return self
+
+    def _raise_if_failed(self):
+        """写入线程出错时在调用方线程重新抛出"""
+        if self._error is not None:
+            raise RuntimeError(f"结果写入失败: {self._error}") from self._error
+
+    def put(self, item: Dict):
+        """
+        放入一条结果（队列满时阻塞）
+
+        Args:
+            item: 结果数据
+        """
+        self._raise_if_failed()
+        self._queue.put(item)
+
+    def checkpoint(self):
+        """写出所有已放入的结果并落盘，返回时数据已持久化"""
+        self._raise_if_failed()
+        request = _Checkpoint()
+        self._queue.put(request)
+        request.done.wait()
+        self._raise_if_failed()
+
+    def close(self):
+        """写出剩余结果、落盘并停止写入线程"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(_CLOSE)
+            self._thread.join()
+        self._raise_if_failed()
+
+    def _run(self):
+        """写入线程主循环"""
+        pending: List[Dict] = []
+        last_flush = time.monotonic()
+        flush_count = 0
+
+        def flush(sync: bool):
+            nonlocal pending, last_flush, flush_count
+            if pending:
+                self._write(pending)
+                self.written += len(pending)
+                flush_count += 1
+                if self.checkpoint_every and flush_count % self.checkpoint_every == 0:
+                    sync = True
+            self._flush(sync)
+            if pending and self.on_flush is not None:
+                self.on_flush(pending)
+            pending = []
+            last_flush = time.monotonic()
+
+        try:
+            while True:
+                timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    if pending:
+                        flush(sync=False)
+                    else:
+                        last_flush = time.monotonic()
+                    continue
+
+                if item is _CLOSE:
+                    flush(sync=True)
+                    break
+                if isinstance(item, _Checkpoint):
+                    flush(sync=True)
+                    item.done.set()
+                    continue
+
+                pending.append(item)
+                if len(pending) >= self.flush_rows:
+                    flush(sync=False)
+        except BaseException as e:
+            self._error = e
+            self.logger.error(f"结果写入线程出错: {e}")
+            # 释放所有等待中的调用方，避免 put() / checkpoint() 永久阻塞
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(item, _Checkpoint):
+                    item.done.set()
+        finally:
+            self._close()
+
+    def _open(self):
+        """打开输出（在调用方线程中执行，错误直接抛出）"""
+
+    def _write(self, items: List[Dict]):
+        """写出一批结果"""
+        raise NotImplementedError
+
+    def _flush(self, sync: bool):
+        """刷新缓冲区，sync=True 时落盘"""
+
+    def _close(self):
+        """关闭输出"""
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class CsvSink(ResultSink):
+    """CSV 写入器：整个运行期间只打开一次文件"""
+
+    def __init__(
+        self,
+        output_csv: Path,
+        fieldnames: List[str],
+        row_builder: Optional[Callable[[Dict], Dict]] = None,
+        append: bool = False,
+        **kwargs
+    ):
+        """
+        初始化 CSV 写入器
+
+        Args:
+            output_csv: 输出文件路径
+            fieldnames: CSV 表头
+            row_builder: 将结果转换为 CSV 行的函数，None 表示直接写入结果字典
+            append: 是否追加到已有文件（追加时不写表头）
+            **kwargs: 传给 ResultSink 的参数
+        """
+        super().__init__(**kwargs)
+        self.output_csv = Path(output_csv)
+        self.fieldnames = fieldnames
+        self.row_builder = row_builder
+        self.append = append
+        self._file = None
+        self._writer = None
+
+    def _open(self):
+        self.output_csv.parent.mkdir(parents=True, exist_ok=True)
+        write_header = not (self.append and self.output_csv.exists() and self.output_csv.stat().st_size)
+        self._file = open(self.output_csv, "a" if self.append else "w", newline="", encoding="utf-8-sig")
+        self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, extrasaction="ignore")
+        if write_header:
+            self._writer.writeheader()
+
+    def _write(self, items: List[Dict]):
+        rows = map(self.row_builder, items) if self.row_builder else items
+        self._writer.writerows(rows)
+
+    def _flush(self, sync: bool):
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+        self.offset = os.fstat(self._file.fileno()).st_size
+
+    def _close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ProductStoreSink(ResultSink):
+    """产品数据库写入器：每批结果一次事务写入"""
+
+    def __init__(self, store, product_type: str = "", **kwargs):
+        """
+        初始化数据库写入器
+
+        Args:
+            store: ProductStore 实例
+            product_type: 产品类型
+            **kwargs: 传给 ResultSink 的参数
+        """
+        super().__init__(**kwargs)
+        self.store = store
+        self.product_type = product_type
+
+    def _write(self, items: List[Dict]):
+        # 每次提交即写入 WAL 日志，无需额外落盘
+        self.store.upsert_products(items, self.product_type)
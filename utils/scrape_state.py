@@ -0,0 +1,203 @@
+"""增量爬取状态 - 记录每个产品的列表数据指纹和上次爬取的详情，跳过未变化的产品"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from utils.logger import get_logger
+
+
+# 参与指纹计算的列表页字段（任一字段变化都需要重新爬取详情）
+LISTING_FIELDS = ("brand", "name", "price", "image")
+# 详情页字段（从状态文件中恢复）
+DETAIL_FIELDS = ("highlights", "description", "directions", "ingredients", "nutritional_info", "target_area")
+# 至少包含其中一个字段才认为详情爬取成功（与并行爬取的判断一致）
+REQUIRED_DETAIL_FIELDS = ("highlights", "description", "directions")
+
+STATE_VERSION = 1
+
+
+def product_id(url: str) -> str:
+    """
+    产品标识（URL 路径，忽略查询参数和锚点）
+
+    Args:
+        url: 产品详情页URL
+
+    Returns:
+        产品标识
+    """
+    parts = urlsplit(url)
+    return f"{parts.netloc}{parts.path.rstrip('/')}"
+
+
+def listing_hash(product: Dict) -> str:
+    """
+    计算列表页数据指纹
+
+    Args:
+        product: 列表页产品数据
+
+    Returns:
+        sha256 十六进制字符串
+    """
+    payload = json.dumps([product.get(field, "") for field in LISTING_FIELDS], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ScrapeState:
+    """
+    增量爬取状态存储（JSON 文件，线程安全）
+
+    文件结构:
+        {"version": 1, "products": {产品标识: {url, hash, price, scraped_at, details}}}
+    """
+
+    def __init__(self, state_file: Path, max_age: Optional[float] = 7 * 24 * 3600):
+        """
+        初始化状态存储
+
+        Args:
+            state_file: 状态文件路径
+            max_age: 详情有效期（秒），超过后即使列表数据未变化也重新爬取，None 表示永不过期
+        """
+        self.state_file = Path(state_file)
+        self.max_age = max_age
+        self.logger = get_logger()
+        self._lock = Lock()
+        self.products: Dict[str, Dict] = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        """读取状态文件，文件不存在或损坏时返回空状态"""
+        if not self.state_file.exists():
+            return {}
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"读取增量状态失败，将全量爬取: {e}")
+            return {}
+
+        if data.get("version") != STATE_VERSION:
+            self.logger.warning("增量状态版本不一致，将全量爬取")
+            return {}
+        return data.get("products", {})
+
+    def check(self, product: Dict) -> Optional[str]:
+        """
+        判断产品是否需要重新爬取详情
+
+        Args:
+            product: 列表页产品数据
+
+        Returns:
+            需要爬取的原因（"new" / "changed" / "stale"），无需爬取时返回 None
+        """
+        record = self.products.get(product_id(product.get("url", "")))
+        if record is None:
+            return "new"
+        if record.get("hash") != listing_hash(product):
+            return "changed"
+        if self.max_age is not None and time.time() - record.get("scraped_at", 0) >= self.max_age:
+            return "stale"
+        return None
+
+    def split(self, products: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        将产品分为可复用上次详情的和需要重新爬取的两组
+
+        Args:
+            products: 列表页产品数据
+
+        Returns:
+            (复用的产品（已合并上次的详情）, 需要爬取的产品)
+        """
+        reused = []
+        to_scrape = []
+        reasons = {"new": 0, "changed": 0, "stale": 0}
+
+        for product in products:
+            reason = self.check(product)
+            if reason is None:
+                details = self.products[product_id(product["url"])].get("details", {})
+                reused.append({**product, **details})
+            else:
+                reasons[reason] += 1
+                to_scrape.append(product)
+
+        self.logger.info(
+            f"增量爬取: 共 {len(products)} 个产品，跳过未变化 {len(reused)} 个，"
+            f"需要爬取 {len(to_scrape)} 个（新产品 {reasons['new']}, "
+            f"列表数据变化 {reasons['changed']}, 超过有效期 {reasons['stale']}）"
+        )
+        return reused, to_scrape
+
+    def record(self, product: Dict) -> bool:
+        """
+        记录一次成功的详情爬取
+
+        Args:
+            product: 合并了详情的产品数据
+
+        Returns:
+            bool: 是否已记录（未包含详情数据时不记录）
+        """
+        if not any(product.get(field) for field in REQUIRED_DETAIL_FIELDS):
+            return False
+
+        with self._lock:
+            self.products[product_id(product["url"])] = {
+                "url": product["url"],
+                "hash": listing_hash(product),
+                "price": product.get("price", ""),
+                "scraped_at": time.time(),
+                "details": {field: product[field] for field in DETAIL_FIELDS if field in product},
+            }
+        return True
+
+    def record_many(self, products: List[Dict]) -> int:
+        """
+        批量记录详情爬取结果
+
+        Args:
+            products: 合并了详情的产品数据列表
+
+        Returns:
+            int: 记录的产品数
+        """
+        return sum(self.record(product) for product in products)
+
+    def save(self):
+        """写入状态文件（先写临时文件再替换，中断时不会损坏已有状态）"""
+        with self._lock:
+            payload = json.dumps(
+                {"version": STATE_VERSION, "products": self.products},
+                ensure_ascii=False
+            )
+
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = self.state_file.with_name(f"{self.state_file.name}.tmp")
+        with open(temp_file, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(temp_file, self.state_file)
+
+
+def load_scrape_state() -> ScrapeState:
+    """
+    根据配置文件创建增量爬取状态
+
+    Returns:
+        ScrapeState 实例
+    """
+    import config
+
+    max_age_hours = config.SCRAPE_STATE_MAX_AGE_HOURS
+    return ScrapeState(
+        state_file=config.SCRAPE_STATE_FILE,
+        max_age=max_age_hours * 3600 if max_age_hours > 0 else None
+    )
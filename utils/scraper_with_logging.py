@@ -3,8 +3,8 @@
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import time
 from utils.logger import get_logger
+from utils.page_ready import wait_for_clickable, wait_for_invisibility, wait_for_ready_state
 
 
 def handle_cookie_popup_logged(driver, timeout=5):
@@ -19,15 +19,13 @@ def handle_cookie_popup_logged(driver, timeout=5):
             "//button[@id='onetrust-accept-btn-handler']",
         ]
 
-        for selector in selectors:
-            try:
-                button = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable((By.XPATH, selector)))
-                button.click()
-                logger.info("✓ 已接受 Cookie")
-                time.sleep(1)
-                return True
-            except:
-                continue
+        # 合并为一个 XPath，只等待一次
+        button = wait_for_clickable(driver, " | ".join(selectors), timeout)
+        if button is not None:
+            button.click()
+            logger.info("✓ 已接受 Cookie")
+            wait_for_invisibility(driver, button)
+            return True
 
         logger.debug("未发现 Cookie 弹窗")
         return False
@@ -44,8 +42,9 @@ def scrape_product_list_logged(driver, url):
     logger.info(f"正在访问列表页: {url}")
     try:
         driver.get(url)
-        logger.debug("页面加载完成，等待3秒")
-        time.sleep(3)
+        logger.debug("等待文档解析完成")
+        if not wait_for_ready_state(driver, "interactive"):
+            logger.warning("等待页面就绪超时，继续尝试")
 
         # 处理 Cookie
         handle_cookie_popup_logged(driver)
@@ -1,12 +1,14 @@
 import os
 import pandas as pd
 from openai import OpenAI
-import time
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock
 from tqdm import tqdm
 
+import config
+from utils.batch_translator import BatchTranslator
+from utils.product_store import CSV_COLUMN_MAP, load_urls_from_csv, open_product_store
+from utils.rate_limiter import get_rate_limiter
+
 # ======= 配置区域 =======
 
 # 从环境变量读取 API Key（更安全）
@@ -22,67 +24,99 @@ OUTPUT_CSV = "./data/output/products_complete_zh.csv"
 # 需要翻译的列（其他列保持原样）
 COLUMNS_TO_TRANSLATE = ["产品名称", "产品亮点", "产品描述", "用法说明", "营养成分", "配料表"]
 
+# 翻译结果写入产品数据库的批次大小（按产品计）
+STORE_BATCH_SIZE = 50
+
 # 多线程配置
-MAX_WORKERS = 5  # 最大并发线程数（建议5-10，避免API限流）
-RATE_LIMIT_DELAY = 0.2  # 每个请求之间的最小延迟（秒）
+MAX_WORKERS = 5  # 最大并发请求数（建议5-10，避免API限流）
+# 请求速率由令牌桶控制（配置文件中的 TRANSLATE_RATE / TRANSLATE_BURST，所有线程共享）
+# 每次请求合并的文本条数和 token 预算见配置文件中的 TRANSLATE_BATCH_ITEMS / TRANSLATE_BATCH_TOKENS
 
 
 # ======= 翻译函数 =======
-def translate_text(client, text, rate_limiter, target_lang="中文", max_retries=3):
-    """翻译文本，支持重试"""
-    if pd.isna(text) or not str(text).strip():
-        return text
+def create_translator(client):
+    """创建批量翻译器（相同原文只翻译一次，多条文本合并为一次请求）"""
+    return BatchTranslator(client, get_rate_limiter("translate"), max_workers=MAX_WORKERS)
+
+
+def translate_with_store(client, store, urls, interactive):
+    """
+    翻译产品数据库中尚未翻译（或源字段有变化）的产品，只更新这些行，然后导出中文CSV
+
+    Args:
+        client: OpenAI 客户端
+        store: ProductStore 实例
+        urls: 本次运行的产品URL（来自 INPUT_CSV）
+        interactive: 是否交互式确认
+    """
+    columns = [CSV_COLUMN_MAP[col] for col in COLUMNS_TO_TRANSLATE]
+    pending_rows = store.pending_translations(urls)
+    print(f"\n📖 产品数据库：本次 {len(urls)} 个产品，需要翻译 {len(pending_rows)} 个（其余已翻译且未变化）")
+
+    # 原文 -> 使用该原文的 (产品URL, 列)，记录每个产品剩余的单元格数
+    cells = {}
+    remaining = {}
+    translations = {}
+    for row in pending_rows:
+        url = row["url"]
+        translations[url] = {}
+        remaining[url] = 0
+        for col in columns:
+            value = row[col]
+            if not value or len(value.strip()) < 3:
+                continue
+            cells.setdefault(value, []).append((url, col))
+            remaining[url] += 1
 
-    # 如果文本太短或已经是中文，跳过
-    text_str = str(text).strip()
-    if len(text_str) < 3:
-        return text
+    total_cells = sum(remaining.values())
+    if total_cells and interactive:
+        response = input(f"\n共 {total_cells} 个单元格（{len(cells)} 条不同原文）需要翻译，是否开始？(y/n): ")
+        if response.lower() != "y":
+            print("已取消")
+            return
 
-    # 速率限制
-    with rate_limiter:
-        time.sleep(RATE_LIMIT_DELAY)
+    # 没有需要翻译的单元格的产品直接标记完成
+    finished = [(url, translations[url]) for url, count in remaining.items() if count == 0]
+    translator = create_translator(client)
+
+    with tqdm(total=total_cells, desc="翻译进度", unit="cell") as pbar:
+        def on_translated(results):
+            nonlocal finished
+            for value, translated in results.items():
+                for url, col in cells[value]:
+                    translations[url][col] = translated
+                    remaining[url] -= 1
+                    if remaining[url] == 0:
+                        finished.append((url, translations[url]))
+                pbar.update(len(cells[value]))
+
+            # 分批写入，只更新已完成翻译的产品
+            if len(finished) >= STORE_BATCH_SIZE:
+                store.save_translations(finished)
+                finished = []
+
+        results = translator.translate_many(cells, on_translated)
+
+    if finished:
+        store.save_translations(finished)
+
+    # 翻译失败的产品不标记完成，下次运行重新翻译
+    failed_count = sum(len(cells[value]) for value in cells if value not in results)
+    print(f"\n{'=' * 60}")
+    print(f"✓ 翻译完成（{translator.requests} 次请求）")
+    print(f"   成功: {total_cells - failed_count} 个")
+    print(f"   失败: {failed_count} 个")
+    print(f"{'=' * 60}")
 
-    for attempt in range(max_retries):
-        try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "你是一个专业的翻译助手。翻译规则：\n1. 只翻译产品信息，不解释、不增删\n2. 完全删除所有地址信息（包括街道地址、邮编、城市、国家等）\n3. 保持原有的格式（如分号分隔、换行等）\n4. 如果内容只包含地址，返回空字符串",
-                    },
-                    {
-                        "role": "user",
-                        "content": f"请将以下内容翻译为{target_lang}，并删除所有地址信息：\n{text}",
-                    },
-                ],
-                timeout=60,
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            tqdm.write(f"   ⚠️ 翻译失败 (尝试 {attempt + 1}/{max_retries}): {e}")
-            if attempt < max_retries - 1:
-                time.sleep(3)
-            else:
-                tqdm.write(f"   ✗ 达到最大重试次数，保留原文")
-                return text  # 出错时保留原文
-
-
-def translate_cell(client, rate_limiter, idx, col, value):
-    """翻译单个单元格"""
-    translated = translate_text(client, value, rate_limiter)
-    return (idx, col, translated)
+    exported = store.export_csv("products_complete_zh", OUTPUT_CSV, urls=urls)
+    print(f"✅ 已从数据库导出 {exported} 个产品到: {OUTPUT_CSV}")
 
 
 # ======= 主函数 =======
 def translate_main(interactive=None):
     # 如果未指定，从配置文件读取
     if interactive is None:
-        try:
-            import config
-            interactive = config.INTERACTIVE_MODE
-        except:
-            interactive = True  # 默认为交互式
+        interactive = getattr(config, "INTERACTIVE_MODE", True)  # 默认为交互式
 
     # 检查输入文件是否存在
     if not Path(INPUT_CSV).exists():
@@ -100,6 +134,17 @@ def translate_main(interactive=None):
         print(f"❌ 客户端初始化失败: {e}")
         return
 
+    # 产品数据库中已有本次的产品时，只翻译新增或有变化的行
+    store = open_product_store()
+    if store is not None:
+        try:
+            urls = load_urls_from_csv(INPUT_CSV)
+            if urls and store.count(urls):
+                translate_with_store(client, store, urls, interactive)
+                return
+        finally:
+            store.close()
+
     # 读取 CSV
     print(f"\n📖 读取文件：{INPUT_CSV}")
     df = pd.read_csv(INPUT_CSV)
@@ -113,14 +158,9 @@ def translate_main(interactive=None):
 
     # 询问是否使用多线程
     print(f"\n⚙️  多线程配置：")
-    print(f"   最大并发线程数: {MAX_WORKERS}")
-    print(f"   速率限制延迟: {RATE_LIMIT_DELAY}秒")
-
-    estimated_time_single = len(df) * len(available_cols) * 2
-    estimated_time_multi = (len(df) * len(available_cols) * 2) / MAX_WORKERS
-    print(f"\n⏱️  预计耗时：")
-    print(f"   单线程: {estimated_time_single}秒 ({estimated_time_single / 60:.1f}分钟)")
-    print(f"   多线程: {estimated_time_multi}秒 ({estimated_time_multi / 60:.1f}分钟)")
+    print(f"   最大并发请求数: {MAX_WORKERS}")
+    print(f"   速率限制: {get_rate_limiter('translate').rate or '不限'} 次/秒")
+    print(f"   批量翻译: 每次请求最多 {config.TRANSLATE_BATCH_ITEMS} 条、约 {config.TRANSLATE_BATCH_TOKENS} token")
 
     # 根据交互式模式决定是否询问
     if interactive:
@@ -131,52 +171,39 @@ def translate_main(interactive=None):
     else:
         print(f"\n自动开始翻译（非交互式模式）...")
 
-    # 准备翻译任务
-    tasks = []
+    # 准备翻译任务（原文 -> 使用该原文的单元格）
+    cells = {}
     for col in available_cols:
         for idx, value in enumerate(df[col]):
             if pd.isna(value) or not str(value).strip():
                 continue
             if len(str(value).strip()) < 3:
                 continue
-            tasks.append((idx, col, value))
+            cells.setdefault(str(value), []).append((idx, col))
 
-    total_tasks = len(tasks)
-    print(f"\n🚀 开始多线程翻译...")
-    print(f"   总任务数: {total_tasks}")
-    print(f"   并发线程: {MAX_WORKERS}")
+    total_tasks = sum(len(positions) for positions in cells.values())
+    print(f"\n🚀 开始批量翻译...")
+    print(f"   总任务数: {total_tasks}（去重后 {len(cells)} 条）")
+    print(f"   并发请求: {MAX_WORKERS}")
     print(f"{'=' * 60}\n")
 
-    # 创建速率限制器（线程锁）
-    rate_limiter = Lock()
-
-    # 多线程翻译
-    completed_count = 0
-    failed_count = 0
-
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-        # 提交所有任务
-        future_to_task = {
-            executor.submit(translate_cell, client, rate_limiter, idx, col, value): (idx, col, value)
-            for idx, col, value in tasks
-        }
-
-        # 使用 tqdm 显示进度条
-        with tqdm(total=total_tasks, desc="翻译进度", unit="cell") as pbar:
-            for future in as_completed(future_to_task):
-                try:
-                    row_idx, col_name, translated = future.result()
+    translator = create_translator(client)
+
+    with tqdm(total=total_tasks, desc="翻译进度", unit="cell") as pbar:
+        def on_translated(results):
+            for value, translated in results.items():
+                for row_idx, col_name in cells[value]:
                     df.at[row_idx, col_name] = translated
-                    completed_count += 1
-                except Exception as e:
-                    idx, col, value = future_to_task[future]
-                    failed_count += 1
-                    tqdm.write(f"⚠️  翻译失败: 行{idx} 列{col}")
+                pbar.update(len(cells[value]))
+
+        results = translator.translate_many(cells, on_translated)
 
-                pbar.update(1)
+    # 翻译失败的单元格保留原文
+    failed_count = sum(len(cells[value]) for value in cells if value not in results)
+    completed_count = total_tasks - failed_count
 
     print(f"\n{'=' * 60}")
-    print(f"✓ 翻译完成")
+    print(f"✓ 翻译完成（{translator.requests} 次请求）")
     print(f"   成功: {completed_count} 个")
     print(f"   失败: {failed_count} 个")
     print(f"{'=' * 60}")